@@ -2,14 +2,25 @@
 Standalone Perfume Explorer - FastAPI backend
 Serves perfume data directly from fragrantica_perfumes.json
 """
-from fastapi import FastAPI, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
+from urllib.parse import quote
 import json
 import os
 
+from catalog import get_catalog
+from cooccurrence import KINDS, METRICS, MIN_COUNT, get_cooccurrence
+from embedding import get_embedding
+from export import EXPORT_FORMATS
+from filter_expr import FilterSyntaxError
+from planner import build_plan
+from ranking import SORT_KEYS, get_bayesian, ordered_ids
+from recommend import QueryError, get_recommender
+from similarity import K, get_neighbors
+
 app = FastAPI(title="Perfume Explorer", docs_url=None, redoc_url=None)
 
 app.add_middleware(
@@ -19,137 +30,159 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Serve perfume images and note images
+# Serve perfume images and note images.
+# NOTE_IMAGES_MODE=sprites serves the atlases from build_note_sprites.py instead of one PNG per note.
+NOTE_IMAGES_MODE = os.environ.get("NOTE_IMAGES_MODE", "files")
+NOTE_IMAGES_DIR = "note_sprites" if NOTE_IMAGES_MODE == "sprites" else "perfume_notes"
 app.mount("/images", StaticFiles(directory="perfume_images"), name="images")
-app.mount("/note_images", StaticFiles(directory="perfume_notes"), name="note_images")
+note_images = StaticFiles(directory=NOTE_IMAGES_DIR)
+if NOTE_IMAGES_MODE == "sprites":
+    # Per-note PNGs stay reachable behind the atlases, for when the frontend can't load sprites.json
+    note_images.all_directories.append("perfume_notes")
+app.mount("/note_images", note_images, name="note_images")
 app.mount("/static", StaticFiles(directory="static"), name="static")
+# Responsive thumbnails from build_thumbnails.py
+THUMBS_DIR = "perfume_thumbs"
+THUMBS_MANIFEST = os.path.join(THUMBS_DIR, "manifest.json")
+app.mount("/thumbs", StaticFiles(directory=THUMBS_DIR, check_dir=False), name="thumbs")
+
+
+# Thumbnails and note atlases have content-hashed names, so they can be cached forever
+@app.middleware("http")
+async def immutable_hashed_assets(request, call_next):
+    response = await call_next(request)
+    path = request.url.path
+    hashed = path.startswith("/thumbs/") or (
+        NOTE_IMAGES_MODE == "sprites" and path.startswith("/note_images/") and path.endswith(".webp"))
+    if hashed and response.status_code == 200:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
-DATA_FILE = "fragrantica_perfumes.json"
 
 def load_perfumes():
-    with open(DATA_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Perfumes of the current catalog version (shared — copy before sorting or mutating)"""
+    return get_catalog().perfumes
+
+_thumbs = {"mtime": None, "images": {}}
+
+def load_thumbnails():
+    """Thumbnail manifest keyed by source filename, reloaded when the file changes"""
+    try:
+        mtime = os.path.getmtime(THUMBS_MANIFEST)
+    except OSError:
+        return {}
+    if mtime != _thumbs["mtime"]:
+        with open(THUMBS_MANIFEST, "r", encoding="utf-8") as f:
+            _thumbs["images"] = json.load(f).get("images", {})
+        _thumbs["mtime"] = mtime
+    return _thumbs["images"]
+
+def image_srcset(filename):
+    """{format: srcset string} for an image in perfume_images, or None if not built"""
+    entry = load_thumbnails().get(filename)
+    if not entry:
+        return None
+    return {
+        fmt: ", ".join(f"/thumbs/{quote(v['file'])} {v['width']}w" for v in variants)
+        for fmt, variants in entry["variants"].items()
+    }
+
+def with_image_paths(p):
+    """Copy of a perfume record with image_path / image_srcset for the frontend"""
+    p = dict(p)
+    local = p.get("image_local", "")
+    if local:
+        filename = os.path.basename(local)
+        p["image_path"] = f"/images/{filename}"
+        srcset = image_srcset(filename)
+        if srcset:
+            p["image_srcset"] = srcset
+    return p
+
+def present(catalog, i, sort):
+    """Response record for perfume i; sort=score also returns the weighted rating"""
+    p = with_image_paths(catalog.perfumes[i])
+    if sort == "score":
+        p["score"] = round(float(get_bayesian(catalog).scores[i]), 4)
+    return p
 
 @app.get("/", response_class=HTMLResponse)
 async def root():
     with open("static/index.html", "r", encoding="utf-8") as f:
         return f.read()
 
-@app.get("/api/perfumes")
-async def get_perfumes(
-    search: Optional[str] = Query(None),
-    brand: Optional[str] = Query(None),
-    category: Optional[str] = Query(None),
-    gender: Optional[str] = Query(None),
-    note: Optional[List[str]] = Query(None),
-    season: Optional[List[str]] = Query(None),
-    accord: Optional[List[str]] = Query(None),
-    price: Optional[str] = Query(None),
-    longevity: Optional[List[str]] = Query(None),
-    sillage: Optional[List[str]] = Query(None),
-    sort: str = Query("rating"),
-    order: str = Query("desc"),
-    page: int = Query(1, ge=1),
-    limit: int = Query(24, ge=1, le=1000),
-):
-    perfumes = load_perfumes()
+class PerfumeQuery:
+    """Filter and sort parameters shared by /api/perfumes and /api/export"""
+
+    def __init__(
+        self,
+        search: Optional[str] = Query(None),
+        brand: Optional[str] = Query(None),
+        category: Optional[str] = Query(None),
+        gender: Optional[str] = Query(None),
+        note: Optional[List[str]] = Query(None),
+        season: Optional[List[str]] = Query(None),
+        accord: Optional[List[str]] = Query(None),
+        price: Optional[str] = Query(None),
+        longevity: Optional[List[str]] = Query(None),
+        sillage: Optional[List[str]] = Query(None),
+        filter_: Optional[str] = Query(None, alias="filter"),
+        rating_min: Optional[float] = Query(None),
+        rating_max: Optional[float] = Query(None),
+        votes_min: Optional[int] = Query(None),
+        votes_max: Optional[int] = Query(None),
+        year_min: Optional[int] = Query(None),
+        year_max: Optional[int] = Query(None),
+        sort: str = Query("rating"),
+        order: str = Query("desc"),
+    ):
+        self.search, self.brand, self.category, self.gender = search, brand, category, gender
+        self.note, self.accord, self.filter = note, accord, filter_
+        self.price, self.longevity, self.sillage, self.season = price, longevity, sillage, season
+        self.ranges = {"rating": (rating_min, rating_max), "votes": (votes_min, votes_max),
+                       "year": (year_min, year_max)}
+        self.sort, self.order = sort, order
 
-    # Filters
-    if search:
-        q = search.lower()
-        perfumes = [p for p in perfumes if q in p.get("name", "").lower() or q in p.get("brand", "").lower()]
-    if brand:
-        perfumes = [p for p in perfumes if p.get("brand", "").lower() == brand.lower()]
-    if category:
-        perfumes = [p for p in perfumes if p.get("category", "").lower() == category.lower()]
-    if gender:
-        perfumes = [p for p in perfumes if (p.get("gender") or "").lower() == gender.lower()]
-    if note:
-        note_list = [n.lower() for n in note]
-        perfumes = [p for p in perfumes if all(
-            any(nq in (nn or "").lower() for nn in (p.get("top_notes") or []) + (p.get("middle_notes") or []) + (p.get("base_notes") or []))
-            for nq in note_list
-        )]
-    if accord:
-        accord_list = [a.lower() for a in accord]
-        perfumes = [p for p in perfumes if all(
-            any(aq in acc.lower() for acc in (p.get('main_accords') or []))
-            for aq in accord_list
-        )]
-
-    if price:
-        price_key = price.lower()
-        def get_dominant_price(p):
-            pv = p.get('price_value')
-            if not pv or not isinstance(pv, dict): return None
-            return max(pv.items(), key=lambda x: x[1])[0] if pv else None
-        
-        perfumes = [p for p in perfumes if get_dominant_price(p) == price_key]
+
+def resolve_query(catalog, q):
+    """(plan, ids of all matches in response order) for a PerfumeQuery"""
+    try:
+        plan = build_plan(catalog, search=q.search, brand=q.brand, category=q.category, gender=q.gender,
+                          note=q.note, accord=q.accord, price=q.price, longevity=q.longevity,
+                          sillage=q.sillage, season=q.season, filter_expr=q.filter, ranges=q.ranges)
+    except FilterSyntaxError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ids = plan.execute_ids()
+
+    # Without metric sorts, order by the presorted permutation — no records are touched
+    if not (q.price or q.longevity or q.sillage or q.season) and q.sort in (*SORT_KEYS, "score"):
+        return plan, ordered_ids(catalog, ids, q.sort, q.order == "desc")
+
+    perfumes = list(catalog.perfumes) if ids is None else [catalog.perfumes[i] for i in ids]
+
+    # Ratio-based filters order their matches by the selected metric
+    if q.price:
+        price_key = q.price.lower()
         # Sort by vote count for this price level
         perfumes.sort(key=lambda p: p.get('price_value', {}).get(price_key, 0), reverse=True)
 
-    if longevity:
-        lon_keys = [l.lower() for l in longevity]
-        def get_dominant_longevity(p):
-            lv = p.get('longevity')
-            if not lv or not isinstance(lv, dict): return None
-            return max(lv.items(), key=lambda x: x[1])[0] if lv else None
-        
-        perfumes = [p for p in perfumes if get_dominant_longevity(p) in lon_keys]
+    if q.longevity:
+        lon_keys = [l.lower() for l in q.longevity]
         # Sort by total votes for selected longevity levels
         perfumes.sort(key=lambda p: sum(p.get('longevity', {}).get(k, 0) for k in lon_keys), reverse=True)
 
-    if sillage:
-        sil_keys = [s.lower() for s in sillage]
-        def get_dominant_sillage(p):
-            sv = p.get('sillage')
-            if not sv or not isinstance(sv, dict): return None
-            return max(sv.items(), key=lambda x: x[1])[0] if sv else None
-        
-        perfumes = [p for p in perfumes if get_dominant_sillage(p) in sil_keys]
+    if q.sillage:
+        sil_keys = [s.lower() for s in q.sillage]
         # Sort by total votes for selected sillage levels
         perfumes.sort(key=lambda p: sum(p.get('sillage', {}).get(k, 0) for k in sil_keys), reverse=True)
 
-    if season:
-        season_keys = [s.lower() for s in season]
-        SEASON_GROUP  = {'spring', 'summer', 'fall', 'winter'}
-        DAYTIME_GROUP = {'day', 'night'}
-
-        def get_dominant_values(p):
-            sv = p.get("season")
-            if not sv or not isinstance(sv, dict): return {'seasons': [], 'daytime': []}
-            
-            # Separate season and daytime votes
-            season_votes = {k: v for k, v in sv.items() if k in SEASON_GROUP}
-            daytime_votes = {k: v for k, v in sv.items() if k in DAYTIME_GROUP}
-            
-            result = {'seasons': [], 'daytime': []}
-            
-            # Get dominant seasons (allow multiple if close in votes)
-            if season_votes:
-                sorted_seasons = sorted(season_votes.items(), key=lambda x: x[1], reverse=True)
-                top_votes = sorted_seasons[0][1]
-                threshold = top_votes * 0.65  # 65% threshold for multi-season perfumes
-                result['seasons'] = [s[0] for s in sorted_seasons if s[1] >= threshold]
-            
-            # Get dominant daytime (day/night) - both can be dominant
-            if daytime_votes:
-                # Include any daytime value with votes (day and night can both be dominant)
-                result['daytime'] = [k for k, v in daytime_votes.items() if v > 0]
-            
-            return result
-        
-        def matches_season_filter(p):
-            dominant = get_dominant_values(p)
-            all_dominant = dominant['seasons'] + dominant['daytime']
-            return any(s in all_dominant for s in season_keys)
-        
-        perfumes = [p for p in perfumes if matches_season_filter(p)]
+    if q.season:
+        season_keys = [s.lower() for s in q.season]
         # Sort by total votes for selected seasons
         perfumes.sort(key=lambda p: sum(p.get('season', {}).get(k, 0) for k in season_keys), reverse=True)
 
     # Sort — always apply user's chosen sort, even after ratio-based filters
-    reverse = order == "desc"
+    sort, reverse = q.sort, q.order == "desc"
     if sort == "rating":
         perfumes.sort(key=lambda p: p.get("rating") or 0, reverse=reverse)
     elif sort == "votes":
@@ -160,19 +193,141 @@ async def get_perfumes(
         perfumes.sort(key=lambda p: p.get("brand") or "", reverse=reverse)
     elif sort == "year":
         perfumes.sort(key=lambda p: p.get("release_year") or 0, reverse=reverse)
+    elif sort == "score":
+        scores = get_bayesian(catalog).scores
+        perfumes.sort(key=lambda p: scores[p["id"]], reverse=reverse)
+
+    return plan, [p["id"] for p in perfumes]
+
 
-    total = len(perfumes)
+@app.get("/api/perfumes")
+def get_perfumes(
+    q: PerfumeQuery = Depends(),
+    page: int = Query(1, ge=1),
+    limit: int = Query(24, ge=1, le=1000),
+    explain: bool = Query(False),
+):
+    catalog = get_catalog()
+    plan, ordered = resolve_query(catalog, q)
     start = (page - 1) * limit
-    page_data = perfumes[start:start + limit]
+    page_data = [present(catalog, i, q.sort) for i in ordered[start:start + limit]]
+
+    result = {"total": len(ordered), "page": page, "limit": limit, "perfumes": page_data}
+    if explain:
+        result["explain"] = plan.explain()
+    return result
+
+
+@app.get("/api/export")
+def export_perfumes(q: PerfumeQuery = Depends(), format: str = Query("ndjson")):
+    """Every match of the /api/perfumes filters, streamed as NDJSON or CSV (see export.py)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {list(EXPORT_FORMATS)}")
+    catalog = get_catalog()
+    _, ordered = resolve_query(catalog, q)
+    media_type, ext, encode = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        encode(catalog.perfumes, ordered), media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="perfumes-{catalog.version}.{ext}"',
+                 "X-Total-Count": str(len(ordered))},
+    )
+
+
+@app.get("/api/perfumes/{perfume_id}")
+async def get_perfume(perfume_id: int):
+    catalog = get_catalog()
+    if not 0 <= perfume_id < len(catalog):
+        raise HTTPException(status_code=404, detail="Perfume not found")
+    return with_image_paths(catalog.perfumes[perfume_id])
+
+
+@app.get("/api/perfumes/{perfume_id}/similar")
+def get_similar(perfume_id: int, limit: int = Query(12, ge=1, le=K)):
+    """Precomputed nearest neighbors (see similarity.py), built once per catalog version"""
+    catalog = get_catalog()
+    if not 0 <= perfume_id < len(catalog):
+        raise HTTPException(status_code=404, detail="Perfume not found")
+    neighbors, scores = get_neighbors(catalog)
+    return [
+        {**with_image_paths(catalog.perfumes[j]), "similarity": round(float(s), 4)}
+        for j, s in zip(neighbors[perfume_id][:limit], scores[perfume_id][:limit])
+    ]
+
+
+@app.get("/api/recommend")
+def recommend(
+    note: Optional[List[str]] = Query(None),
+    accord: Optional[List[str]] = Query(None),
+    season: Optional[List[str]] = Query(None),
+    longevity: Optional[List[str]] = Query(None),
+    sillage: Optional[List[str]] = Query(None),
+    exclude_note: Optional[List[str]] = Query(None),
+    exclude_accord: Optional[List[str]] = Query(None),
+    limit: int = Query(24, ge=1, le=100),
+):
+    """Score every perfume against weighted preferences, e.g. note=bergamot:2&note=oud:-1&season=summer"""
+    catalog = get_catalog()
+    rec = get_recommender(catalog)
+    try:
+        weights, unmatched = rec.resolve(note or [], accord or [],
+                                         {"season": season or [], "longevity": longevity or [],
+                                          "sillage": sillage or []})
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not weights:
+        raise HTTPException(status_code=400, detail="No matching note, accord or vote preferences")
+
+    results, candidates = rec.recommend(weights, limit, exclude_note or [], exclude_accord or [])
+    return {
+        "weights": {rec.column_label(src, j): round(float(w), 4) for (src, j), w in weights.items()},
+        "unmatched": unmatched,
+        "candidates": candidates,
+        "perfumes": [
+            {**with_image_paths(catalog.perfumes[i]), "score": round(score, 4), "contributions": contributions}
+            for i, score, contributions in results
+        ],
+    }
+
+
+@app.get("/api/cooccurrence")
+def cooccurrence(
+    kind: str = Query("note"),
+    item: Optional[str] = Query(None),
+    with_kind: Optional[str] = Query(None, alias="with"),
+    metric: str = Query("count"),
+    min_count: int = Query(MIN_COUNT, ge=1),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Notes/accords that appear together with `item` (or the top pairs overall), by count, lift or PMI"""
+    with_kind = with_kind or kind
+    if kind not in KINDS or with_kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"kind and with must be one of {list(KINDS)}")
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {list(METRICS)}")
+    if item is not None and not item.strip():
+        raise HTTPException(status_code=400, detail="item must not be blank (omit it for the top pairs)")
+
+    co = get_cooccurrence(get_catalog())
+    if item is None:
+        return {"kind": kind, "with": with_kind, "metric": metric,
+                "pairs": co.top_pairs(kind, with_kind, metric, min_count, limit)}
+    j = co.lookup(kind, item)
+    if j is None:
+        raise HTTPException(status_code=404, detail=f"No {kind} matching {item!r}")
+    return {"kind": kind, "item": co.labels[kind][j], "count": int(co.counts[kind][j]),
+            "with": with_kind, "metric": metric,
+            "related": co.related(kind, j, with_kind, metric, min_count, limit)}
 
-    # Fix image paths
-    for p in page_data:
-        local = p.get("image_local", "")
-        if local:
-            filename = os.path.basename(local)
-            p["image_path"] = f"/images/{filename}"
 
-    return {"total": total, "page": page, "limit": limit, "perfumes": page_data}
+@app.get("/api/embedding")
+def embedding(request: Request):
+    """2D scent-space layout as a binary typed-array payload (format in embedding.py)"""
+    catalog = get_catalog()
+    etag = f'"{catalog.version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(get_embedding(catalog), media_type="application/octet-stream", headers=headers)
 
 
 @app.get("/api/accords")
@@ -224,4 +379,5 @@ async def get_stats():
         "total_brands": len(brands),
         "total_notes": len(all_notes),
         "avg_rating": round(avg_rating, 2),
+        "note_images": NOTE_IMAGES_MODE,
     }
@@ -5,7 +5,7 @@ Checks: images, notes, longevity, sillage, price_value, main_accords, season, UR
 import json, os, re
 from collections import defaultdict
 
-JSON_PATH  = "fragrantica_perfumes.json"
+JSON_PATH  = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
 IMG_DIR    = "perfume_images"
 NOTE_IMG_DIR = "note_images"
 
@@ -43,8 +43,7 @@ for p in perfumes:
     if not local:
         missing_image_file.append(label)
     else:
-        fpath = local if os.path.isabs(local) else os.path.join(os.path.dirname(JSON_PATH), local)
-        if not os.path.exists(fpath):
+        if not os.path.exists(local):
             missing_image_file.append(f"{label}  [file missing: {local}]")
 
     # ── Image URL ─────────────────────────────────────────────────
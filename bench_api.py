@@ -0,0 +1,269 @@
+"""
+Benchmark suite for the Perfume Explorer API.
+
+Drives the FastAPI app in-process through an ASGI client (one fresh subprocess
+per catalog, so peak RSS is measured per catalog size) or a running uvicorn
+via --url. Reports p50/p95/p99 latency, throughput and peak RSS per query mix
+and stores the results as JSON under bench_results/ for comparing commits.
+
+Usage:
+    python bench_api.py
+    python bench_api.py --catalogs fragrantica_perfumes.json synthetic_catalogs/fragrantica_perfumes_10k.json
+    python bench_api.py --url http://127.0.0.1:5001 --server-pid 12345
+    python bench_api.py --compare bench_results/old.json bench_results/new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+RESULTS_DIR = "bench_results"
+DEFAULT_CATALOGS = ["fragrantica_perfumes.json"]
+REGRESSION_THRESHOLD = 0.10  # 10% slower p50/p95 is flagged by --compare
+
+# name -> request path; "{deep_page}" is filled in from /api/stats
+SCENARIOS = {
+    "default":          "/api/perfumes",
+    "search":           "/api/perfumes?search=noir",
+    "brand_search":     "/api/perfumes?brand=Tom%20Ford&search=noir",
+    "filter_expr":      "/api/perfumes?filter=rose%20OR%20oud%2C%20NOT%20vanilla",
+    "multi_note":       "/api/perfumes?note=bergamot&note=vetiver",
+    "multi_accord":     "/api/perfumes?accord=woody&accord=citrus",
+    "season_longevity": "/api/perfumes?season=summer&season=day&longevity=long_lasting&longevity=eternal",
+    "score_sort":       "/api/perfumes?sort=score",
+    "deep_page":        "/api/perfumes?page={deep_page}",
+    "limit_1000":       "/api/perfumes?limit=1000",
+    "recommend":        "/api/recommend?note=bergamot:2&note=vetiver&note=oud:-1&season=summer&longevity=long_lasting",
+    "stats":            "/api/stats",
+    "brands":           "/api/brands",
+    "accords":          "/api/accords",
+    "notes":            "/api/notes",
+}
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def summarize(latencies, errors, elapsed):
+    s = sorted(latencies)
+    return {
+        "count": len(s),
+        "errors": errors,
+        "p50_ms": round(percentile(s, 50) * 1000, 3) if s else None,
+        "p95_ms": round(percentile(s, 95) * 1000, 3) if s else None,
+        "p99_ms": round(percentile(s, 99) * 1000, 3) if s else None,
+        "mean_ms": round(sum(s) / len(s) * 1000, 3) if s else None,
+        "throughput_rps": round(len(s) / elapsed, 2) if elapsed > 0 else None,
+    }
+
+
+def peak_rss_mb(pid=None):
+    """Peak resident set size of `pid` (or this process) in MB."""
+    if pid is None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+async def run_scenario(client, path, requests, warmup, concurrency, max_seconds):
+    for _ in range(warmup):
+        await client.get(path)
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + max_seconds
+    remaining = requests
+
+    async def one():
+        nonlocal errors
+        t0 = time.perf_counter()
+        r = await client.get(path)
+        latencies.append(time.perf_counter() - t0)
+        if r.status_code != 200:
+            errors += 1
+
+    start = time.perf_counter()
+    while remaining > 0:
+        batch = min(concurrency, remaining)
+        await asyncio.gather(*(one() for _ in range(batch)))
+        remaining -= batch
+        # Slow catalogs stop early once the time budget is spent (min. 5 samples)
+        if time.perf_counter() > deadline and len(latencies) >= 5:
+            break
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_suite(client, args):
+    stats = (await client.get("/api/stats")).json()
+    total = stats["total_perfumes"]
+    deep_page = max(1, (total - 1) // 24)
+
+    scenarios = {}
+    for name, path in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        path = path.format(deep_page=deep_page)
+        scenarios[name] = await run_scenario(client, path, args.requests, args.warmup,
+                                             args.concurrency, args.max_seconds)
+        scenarios[name]["path"] = path
+        print(f"  {name:<18} p50 {scenarios[name]['p50_ms']:>9.2f} ms   "
+              f"p95 {scenarios[name]['p95_ms']:>9.2f} ms   "
+              f"{scenarios[name]['throughput_rps']:>8.1f} req/s", file=sys.stderr)
+    return total, scenarios
+
+
+async def bench_in_process(args):
+    """Worker mode: import app against args.data and benchmark it via ASGI."""
+    import httpx
+    os.environ["PERFUME_DATA_FILE"] = args.data
+    from app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        total, scenarios = await run_suite(client, args)
+    return {"catalog": args.data, "catalog_size": total,
+            "peak_rss_mb": peak_rss_mb(), "scenarios": scenarios}
+
+
+async def bench_remote(args):
+    import httpx
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        total, scenarios = await run_suite(client, args)
+    return {"catalog": args.url, "catalog_size": total,
+            "peak_rss_mb": peak_rss_mb(args.server_pid) if args.server_pid else None,
+            "scenarios": scenarios}
+
+
+def git_info():
+    def git(*cmd):
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return {"commit": git("rev-parse", "--short", "HEAD"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def worker_cmd(args, catalog):
+    cmd = [sys.executable, __file__, "--worker", "--data", catalog,
+           "--requests", str(args.requests), "--warmup", str(args.warmup),
+           "--concurrency", str(args.concurrency), "--max-seconds", str(args.max_seconds)]
+    if args.only:
+        cmd += ["--only", *args.only]
+    return cmd
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+
+    old_runs = {r["catalog_size"]: r for r in old["runs"]}
+    print(f"{old['meta']['git']['commit']} → {new['meta']['git']['commit']}")
+    regressions = 0
+    for run in new["runs"]:
+        base = old_runs.get(run["catalog_size"])
+        if not base:
+            continue
+        print(f"\n📦 {run['catalog_size']:,} perfumes  (peak RSS {base['peak_rss_mb']} → {run['peak_rss_mb']} MB)")
+        for name, cur in run["scenarios"].items():
+            prev = base["scenarios"].get(name)
+            if not prev or not prev["p50_ms"] or not cur["p50_ms"]:
+                continue
+            d50 = cur["p50_ms"] / prev["p50_ms"] - 1
+            d95 = cur["p95_ms"] / prev["p95_ms"] - 1
+            flag = "⚠️ " if max(d50, d95) > REGRESSION_THRESHOLD else "  "
+            regressions += flag != "  "
+            print(f"  {flag}{name:<18} p50 {prev['p50_ms']:>9.2f} → {cur['p50_ms']:>9.2f} ms ({d50:+.0%})   "
+                  f"p95 {prev['p95_ms']:>9.2f} → {cur['p95_ms']:>9.2f} ms ({d95:+.0%})")
+    print(f"\n{regressions} regression(s) above {REGRESSION_THRESHOLD:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalogs", nargs="+", default=DEFAULT_CATALOGS)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--server-pid", type=int, help="read the server's peak RSS from /proc (with --url)")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--max-seconds", type=float, default=30.0, help="time budget per scenario")
+    parser.add_argument("--only", nargs="+", choices=list(SCENARIOS), help="run a subset of scenarios")
+    parser.add_argument("--out", help="results file (default: bench_results/<timestamp>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare))
+
+    if args.worker:
+        print(json.dumps(asyncio.run(bench_in_process(args))))
+        return
+
+    runs = []
+    if args.url:
+        print(f"🌐 {args.url}", file=sys.stderr)
+        runs.append(asyncio.run(bench_remote(args)))
+    else:
+        for catalog in args.catalogs:
+            print(f"📦 {catalog}", file=sys.stderr)
+            out = subprocess.run(worker_cmd(args, catalog), capture_output=True, text=True)
+            if out.returncode != 0:
+                print(out.stderr, file=sys.stderr)
+                sys.exit(out.returncode)
+            sys.stderr.write(out.stderr)
+            run = json.loads(out.stdout)
+            print(f"  peak RSS {run['peak_rss_mb']} MB", file=sys.stderr)
+            runs.append(run)
+
+    git = git_info()
+    result = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git": git,
+            "mode": "remote" if args.url else "in-process",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+        },
+        "runs": runs,
+    }
+    out_path = args.out
+    if not out_path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        out_path = os.path.join(RESULTS_DIR, f"{stamp}-{git['commit'] or 'nogit'}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\n💾 Results saved to {out_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
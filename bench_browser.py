@@ -0,0 +1,143 @@
+"""
+Page load cost of the scraper's browser profiles — bytes, requests, time, memory.
+
+Every URL is rendered once per profile, alternating profiles page by page
+so network drift hits both equally. Each profile gets its own Chrome with a
+different resource policy (selenium_scraper.BLOCK_PATTERNS). Bytes and
+request counts come from Chrome's performance log (Network.loadingFinished
+encodedDataLength, i.e. bytes on the wire), so third-party responses are
+counted too. Time is the full extraction (load, render waits, payloads).
+RSS is the whole Chrome process tree after the page. Every parsed record is
+compared with the first profile's: a field that is set there but empty
+under another profile is reported as lost, so a policy that breaks
+extraction shows up as lost fields rather than as a speed-up. (Values are
+not compared, since vote counts move between loads.)
+
+Pages go through the same rate limiter as a scrape and are not archived.
+
+Usage:
+    python bench_browser.py                                  # 10 URLs from the dataset
+    python bench_browser.py --pages 30 --out bench_results/browser.json
+    python bench_browser.py --profiles full lean no-images --urls https://www.fragrantica.com/perfume/...
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from rate_limit import TokenBucket
+from selenium_scraper import DEFAULT_BLOCK, SeleniumPerfumeScraper
+
+JSON_FILE = "fragrantica_perfumes.json"
+PROFILES = {
+    "full": (),
+    "lean": DEFAULT_BLOCK,
+    "no-images": ("images",),
+    "no-third-party": ("third_party",),
+}
+BENCH_RATE = 0.2  # pages/s across all profiles
+
+
+class LoggingScraper(SeleniumPerfumeScraper):
+    """Scraper with per-page byte accounting from Chrome's network events."""
+
+    def network_totals(self):
+        """(bytes, finished requests, blocked requests) of the last page."""
+        total, finished, blocked = 0, 0, 0
+        for message in self.page_network + self._drain_network_log():
+            if message["method"] == "Network.loadingFinished":
+                total += message["params"].get("encodedDataLength", 0)
+                finished += 1
+            elif message["method"] == "Network.loadingFailed" and message["params"].get("blockedReason"):
+                blocked += 1
+        return total, finished, blocked
+
+
+def summarize(rows):
+    if not rows:
+        return {}
+    return {
+        "pages": len(rows),
+        "mean_kb": round(statistics.mean(r["bytes"] for r in rows) / 1024, 1),
+        "mean_requests": round(statistics.mean(r["requests"] for r in rows), 1),
+        "mean_blocked": round(statistics.mean(r["blocked"] for r in rows), 1),
+        "mean_s": round(statistics.mean(r["seconds"] for r in rows), 2),
+        "median_s": round(statistics.median(r["seconds"] for r in rows), 2),
+        "peak_rss_mb": max((r["rss_mb"] or 0) for r in rows) or None,
+        "pages_with_lost_fields": sum(bool(r["lost"]) for r in rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", nargs="+", help="perfume page URLs (default: a sample of the dataset)")
+    parser.add_argument("--pages", type=int, default=10, help="dataset sample size")
+    parser.add_argument("--profiles", nargs="+", choices=list(PROFILES), default=["full", "lean"])
+    parser.add_argument("--rate", type=float, default=BENCH_RATE, help="page requests per second overall")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    urls = args.urls
+    if not urls:
+        with open(JSON_FILE, encoding="utf-8") as f:
+            urls = [p["url"] for p in json.load(f) if p.get("url")]
+        urls = random.Random(args.seed).sample(urls, min(args.pages, len(urls)))
+
+    limiter = TokenBucket(rate=args.rate)
+    scrapers = {name: LoggingScraper(headless=True, rate_limiter=limiter, archive_dir=None,
+                                     block=PROFILES[name], recycle_pages=None, recycle_rss_mb=None)
+                for name in args.profiles}
+    rows = {name: [] for name in args.profiles}
+    baseline = {}
+
+    print(f"📦 {len(urls)} pages × {len(args.profiles)} profiles: {', '.join(args.profiles)}")
+    try:
+        for i, url in enumerate(urls, 1):
+            print(f"\n[{i}/{len(urls)}] {url.split('/')[-1]}")
+            for name, scraper in scrapers.items():
+                scraper._init_driver()
+                t = time.perf_counter()
+                data = scraper.extract_perfume_details(url, retry=0)
+                seconds = time.perf_counter() - t
+                if data is None:
+                    print(f"  ❌ {name}: failed")
+                    continue
+                total, finished, blocked = scraper.network_totals()
+                baseline.setdefault(url, data)
+                lost = sorted(k for k, v in baseline[url].items() if v and not data.get(k))
+                rows[name].append({"url": url, "bytes": total, "requests": finished, "blocked": blocked,
+                                   "seconds": seconds, "rss_mb": scraper.browser_rss_mb(), "lost": lost})
+                print(f"  {name:<15} {total / 1024:8.0f} KB  {finished:4d} req  {blocked:4d} blocked  "
+                      f"{seconds:5.1f}s" + (f"  ⚠️ lost: {', '.join(lost)}" if lost else ""))
+    finally:
+        for scraper in scrapers.values():
+            scraper.close()
+
+    results = {name: summarize(r) for name, r in rows.items()}
+    print(f"\n{'profile':<15} {'KB/page':>9} {'requests':>9} {'blocked':>8} {'s/page':>7} {'peak RSS':>9}  lost fields")
+    for name, r in results.items():
+        if r:
+            print(f"{name:<15} {r['mean_kb']:>9,.0f} {r['mean_requests']:>9} {r['mean_blocked']:>8} "
+                  f"{r['mean_s']:>7} {str(r['peak_rss_mb']) + ' MB':>9}  {r['pages_with_lost_fields']}")
+
+    base = results.get(args.profiles[0])
+    if base:
+        for name, r in list(results.items())[1:]:
+            if r:
+                print(f"💡 {name} vs {args.profiles[0]}: "
+                      f"{base['mean_kb'] - r['mean_kb']:,.0f} KB and {base['mean_s'] - r['mean_s']:.2f}s saved per page")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"urls": urls, "profiles": {n: list(PROFILES[n]) for n in args.profiles},
+                       "results": results, "pages": rows}, f, indent=2)
+
+    if any(r.get("pages_with_lost_fields") for r in results.values()):
+        sys.exit("❌ Some profiles lost fields the first profile extracted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Correctness and throughput benchmark for perfume_parser.py.
+
+Every fixture in fixtures/ is a saved page in page-archive format
+(<name>.json.gz: url, page_source, payloads) with the record it must parse
+to (<name>.expected.json). The benchmark first checks every fixture against
+its expected record, then parses the corpus repeatedly and reports
+pages/second. It exits non-zero on any mismatch, or when throughput is below
+--min-rate, so a parser change cannot silently break extraction or slow it
+down.
+
+Usage:
+    python bench_parser.py
+    python bench_parser.py --seconds 10 --min-rate 500 --out bench_results/parser.json
+    python bench_parser.py --add-from-archive 20      # snapshot archived pages as new fixtures
+    python bench_parser.py --update-expected          # after an intended output change
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+from perfume_parser import parse_perfume_page
+
+FIXTURE_DIR = "fixtures"
+
+
+def load_fixtures(root=FIXTURE_DIR):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(root, "*.json.gz"))):
+        name = os.path.basename(path)[:-len(".json.gz")]
+        with open(path, "rb") as f:
+            page = json.loads(gzip.decompress(f.read()))
+        expected_path = os.path.join(root, name + ".expected.json")
+        expected = None
+        if os.path.exists(expected_path):
+            with open(expected_path, encoding="utf-8") as f:
+                expected = json.load(f)
+        fixtures.append((name, page, expected))
+    return fixtures
+
+
+def parse(page):
+    return parse_perfume_page(page["url"], page["page_source"], page.get("payloads"))
+
+
+def save_expected(root, name, record):
+    with open(os.path.join(root, name + ".expected.json"), "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+
+
+def add_from_archive(root, count):
+    """Copy the `count` most recently archived pages into the corpus, expected = current output."""
+    from page_archive import get_archive
+    archive = get_archive()
+    added = 0
+    for url, digest in reversed(list(archive.latest().items())):
+        if added >= count:
+            break
+        name = re.sub(r"[^A-Za-z0-9]+", "-", url.split("/perfume/")[-1].removesuffix(".html")).strip("-").lower()
+        path = os.path.join(root, name + ".json.gz")
+        if os.path.exists(path):
+            continue
+        page = archive.get(digest)
+        with open(path, "wb") as f:
+            f.write(gzip.compress(json.dumps(page, ensure_ascii=False, sort_keys=True).encode("utf-8"), mtime=0))
+        save_expected(root, name, parse(page))
+        added += 1
+        print(f"  + {name}")
+    print(f"✅ Added {added} fixtures from the page archive")
+
+
+def check(fixtures):
+    """Names of fixtures whose parsed record differs from the expected one (printed field by field)."""
+    failed = []
+    for name, page, expected in fixtures:
+        if expected is None:
+            print(f"  ⚠️ {name}: no expected record (run with --update-expected)")
+            failed.append(name)
+            continue
+        got = parse(page)
+        diff = sorted(k for k in set(got) | set(expected) if got.get(k) != expected.get(k))
+        if diff:
+            failed.append(name)
+            print(f"  ❌ {name}")
+            for k in diff:
+                print(f"      {k}: expected {str(expected.get(k))[:80]}  got {str(got.get(k))[:80]}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--seconds", type=float, default=3.0, help="time spent in the throughput loop")
+    parser.add_argument("--min-rate", type=float, help="fail below this many pages/second")
+    parser.add_argument("--add-from-archive", type=int, metavar="N")
+    parser.add_argument("--update-expected", action="store_true", help="rewrite expected records from current output")
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    if args.add_from_archive:
+        add_from_archive(args.fixtures, args.add_from_archive)
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"❌ No fixtures in {args.fixtures}/")
+
+    if args.update_expected:
+        for name, page, _ in fixtures:
+            save_expected(args.fixtures, name, parse(page))
+        print(f"✅ Rewrote {len(fixtures)} expected records")
+        fixtures = load_fixtures(args.fixtures)
+
+    total_bytes = sum(len(page["page_source"]) for _, page, _ in fixtures)
+    print(f"📦 {len(fixtures)} fixtures, {total_bytes / len(fixtures) / 1024:.0f} KB average page")
+
+    failed = check(fixtures)
+    print(f"{'✅' if not failed else '❌'} Correctness: {len(fixtures) - len(failed)}/{len(fixtures)} match")
+
+    # Throughput: whole-corpus rounds until the time budget is spent
+    per_page = {name: [] for name, _, _ in fixtures}
+    pages = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < args.seconds:
+        for name, page, _ in fixtures:
+            t = time.perf_counter()
+            parse(page)
+            per_page[name].append(time.perf_counter() - t)
+        pages += len(fixtures)
+    elapsed = time.perf_counter() - t0
+    rate = pages / elapsed
+
+    print(f"⚙️  {rate:,.0f} pages/s, {total_bytes * pages / len(fixtures) / elapsed / 1e6:.1f} MB/s "
+          f"({pages:,} pages in {elapsed:.1f}s)")
+    for name, times in per_page.items():
+        print(f"  {name:<40} {statistics.median(times) * 1000:7.3f} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"fixtures": len(fixtures), "failed": failed, "pages_per_second": round(rate, 1),
+                       "median_ms": {n: round(statistics.median(t) * 1000, 4) for n, t in per_page.items()}},
+                      f, indent=2)
+
+    if failed:
+        sys.exit(1)
+    if args.min_rate and rate < args.min_rate:
+        sys.exit(f"❌ {rate:,.0f} pages/s is below --min-rate {args.min_rate:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark brute-force vs approximate (svd) neighbor tables.
+
+Builds the approximate table for the whole catalog, computes exact neighbors
+for a random sample of rows, and reports build time and recall@k of the
+approximate table against the exact result. Full brute-force time is
+extrapolated from the sample unless --full-brute is given.
+
+Usage:
+    python generate_catalog.py --sizes 100000
+    python bench_similarity.py --data synthetic_catalogs/fragrantica_perfumes_100k.json
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default="fragrantica_perfumes.json")
+    parser.add_argument("-k", type=int, default=12)
+    parser.add_argument("--sample", type=int, default=2000, help="rows checked against exact neighbors")
+    parser.add_argument("--full-brute", action="store_true", help="time brute force on every row")
+    parser.add_argument("--dims", type=int, default=128)
+    parser.add_argument("--oversample", type=int, default=10)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args()
+
+    os.environ["PERFUME_DATA_FILE"] = args.data
+    from catalog import get_catalog
+    from features import get_features
+    from similarity import knn_brute, knn_svd
+
+    t0 = time.perf_counter()
+    catalog = get_catalog(args.data)
+    t1 = time.perf_counter()
+    X = get_features(catalog).matrix
+    t2 = time.perf_counter()
+    n = X.shape[0]
+    print(f"📦 {n:,} perfumes: load {t1 - t0:.1f}s, features {t2 - t1:.1f}s "
+          f"({X.shape[1]:,} columns, {X.nnz / n:.1f} nnz/row)")
+
+    rng = np.random.default_rng(0)
+    sample = np.sort(rng.choice(n, size=min(args.sample, n), replace=False))
+
+    # Exact neighbors of the sampled rows
+    t = time.perf_counter()
+    exact = [set(r) for r in knn_brute(X, args.k, rows=sample)[0]]
+    sample_time = time.perf_counter() - t
+
+    if args.full_brute:
+        t = time.perf_counter()
+        knn_brute(X, args.k)
+        brute_time, brute_note = time.perf_counter() - t, "measured"
+    else:
+        brute_time, brute_note = sample_time * n / len(sample), f"extrapolated from {len(sample):,} rows"
+
+    t = time.perf_counter()
+    approx_neighbors, _ = knn_svd(X, args.k, dims=args.dims, oversample=args.oversample)
+    approx_time = time.perf_counter() - t
+
+    recall = np.mean([len(exact[i] & set(approx_neighbors[r])) / args.k for i, r in enumerate(sample)])
+
+    print(f"  brute  {brute_time:8.1f}s  ({brute_note})")
+    print(f"  svd    {approx_time:8.1f}s  recall@{args.k} {recall:.3f}  "
+          f"({args.dims} dims × {args.oversample} oversample, {brute_time / approx_time:.1f}× faster)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"catalog": args.data, "n": n, "k": args.k,
+                       "brute_seconds": round(brute_time, 2), "brute_note": brute_note,
+                       "svd_seconds": round(approx_time, 2), "svd_recall": round(float(recall), 4),
+                       "dims": args.dims, "oversample": args.oversample}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Pack the perfume_notes/ icons into WebP sprite atlases.
+
+Icons are ordered by how often their note appears in the catalog, so the
+first atlas holds the common notes and most modals only touch one atlas.
+With the default capacity the whole icon set fits in two atlases, which caps
+a modal at two image fetches. The coordinate map is keyed by canonical note
+name (see canonical_note; static/app.js applies the same rule).
+
+Serve the result with NOTE_IMAGES_MODE=sprites, which mounts note_sprites/
+at /note_images in place of the individual PNGs.
+
+Usage:
+    python build_note_sprites.py
+    python build_note_sprites.py --cell 96 --capacity 256
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from PIL import Image
+
+NOTES_DIR = "perfume_notes"
+OUT_DIR = "note_sprites"
+MAP_FILE = os.path.join(OUT_DIR, "sprites.json")
+DATA_FILE = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
+NOTE_FIELDS = ["top_notes", "middle_notes", "base_notes"]
+CELL = 72          # px, the note tooltip renders icons at 72×72
+CAPACITY = 512     # icons per atlas
+WEBP_OPTIONS = {"quality": 82, "method": 6}
+
+
+def canonical_note(name):
+    """Lowercase, drop the characters sanitize_filename strips, collapse spaces/underscores."""
+    name = re.sub(r'[<>:"/\\|?*&]', '', name)
+    return re.sub(r'[\s_]+', ' ', name).strip().lower()
+
+
+def note_frequencies():
+    try:
+        with open(DATA_FILE, encoding="utf-8") as f:
+            perfumes = json.load(f)
+    except OSError:
+        return Counter()
+    return Counter(canonical_note(n) for p in perfumes for field in NOTE_FIELDS for n in (p.get(field) or []) if n)
+
+
+def load_icon(path, cell):
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+        im.thumbnail((cell, cell), Image.LANCZOS)
+    # Center in the cell so every icon has the same box
+    tile = Image.new("RGBA", (cell, cell), (0, 0, 0, 0))
+    tile.paste(im, ((cell - im.width) // 2, (cell - im.height) // 2))
+    return tile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cell", type=int, default=CELL)
+    parser.add_argument("--capacity", type=int, default=CAPACITY)
+    args = parser.parse_args()
+
+    icons = {}
+    for filename in os.listdir(NOTES_DIR):
+        stem, ext = os.path.splitext(filename)
+        if ext.lower() == ".png":
+            icons.setdefault(canonical_note(stem), filename)
+
+    freq = note_frequencies()
+    order = sorted(icons, key=lambda n: (-freq.get(n, 0), n))
+    print(f"🎨 {len(order)} note icons, {sum(1 for n in order if freq.get(n))} used by the catalog")
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    atlases = []
+    notes = {}
+    for a, start in enumerate(range(0, len(order), args.capacity)):
+        chunk = order[start:start + args.capacity]
+        cols = math.ceil(math.sqrt(len(chunk)))
+        rows = math.ceil(len(chunk) / cols)
+        sheet = Image.new("RGBA", (cols * args.cell, rows * args.cell), (0, 0, 0, 0))
+        for i, note in enumerate(chunk):
+            x, y = (i % cols) * args.cell, (i // cols) * args.cell
+            sheet.paste(load_icon(os.path.join(NOTES_DIR, icons[note]), args.cell), (x, y))
+            notes[note] = [a, x, y]
+
+        buf = io.BytesIO()
+        sheet.save(buf, "WEBP", **WEBP_OPTIONS)
+        data = buf.getvalue()
+        name = f"notes-{a}.{hashlib.sha256(data).hexdigest()[:10]}.webp"
+        with open(os.path.join(OUT_DIR, name), "wb") as f:
+            f.write(data)
+        atlases.append({"file": name, "width": sheet.width, "height": sheet.height})
+        print(f"  atlas {a}: {len(chunk)} icons, {sheet.width}×{sheet.height}, {len(data) / 1024:.0f} KB")
+
+    sprite_map = {"cell": args.cell, "atlases": atlases, "notes": notes}
+    tmp = f"{MAP_FILE}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(sprite_map, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, MAP_FILE)
+
+    keep = {a["file"] for a in atlases} | {os.path.basename(MAP_FILE)}
+    for name in os.listdir(OUT_DIR):
+        if name not in keep:
+            os.remove(os.path.join(OUT_DIR, name))
+    print(f"💾 {MAP_FILE} ({os.path.getsize(MAP_FILE) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
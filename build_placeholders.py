@@ -0,0 +1,115 @@
+"""
+Precompute low-quality image placeholders for perfume_images/.
+
+For every perfume with a local image this stores, in the catalog itself:
+  image_width / image_height  — intrinsic size, so cards can reserve layout
+  image_placeholder           — a ~12px wide WebP as a data URI (~200 bytes)
+The frontend paints the placeholder immediately and the real image over it.
+
+Images are hashed and only new or changed ones are re-encoded (results are
+cached in .placeholder_cache.json); encoding runs across all cores.
+
+Usage:
+    python build_placeholders.py
+    PERFUME_DATA_FILE=synthetic_catalogs/fragrantica_perfumes_10k.json python build_placeholders.py
+"""
+import argparse
+import base64
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from build_thumbnails import file_sha256
+
+DATA_FILE = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
+SOURCE_DIR = "perfume_images"
+CACHE_FILE = ".placeholder_cache.json"
+PLACEHOLDER_WIDTH = 12
+WEBP_QUALITY = 40
+
+
+def build_one(filename, source_hash):
+    """(filename, cache entry), or (filename, {"error": ...}) for an unreadable image"""
+    try:
+        with Image.open(os.path.join(SOURCE_DIR, filename)) as im:
+            width, height = im.size
+            h = max(1, round(height * PLACEHOLDER_WIDTH / width))
+            tiny = im.convert("RGB").resize((PLACEHOLDER_WIDTH, h), Image.LANCZOS)
+    except Exception as e:
+        return filename, {"error": f"{type(e).__name__}: {e}"}
+    buf = io.BytesIO()
+    tiny.save(buf, "WEBP", quality=WEBP_QUALITY)
+    uri = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+    return filename, {"sha256": source_hash, "width": width, "height": height, "placeholder": uri}
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with open(DATA_FILE, encoding="utf-8") as f:
+        perfumes = json.load(f)
+
+    filenames = sorted({
+        os.path.basename(p["image_local"]) for p in perfumes
+        if p.get("image_local") and os.path.exists(os.path.join(SOURCE_DIR, os.path.basename(p["image_local"])))
+    })
+
+    cache = load_cache()
+    todo = []
+    for filename in filenames:
+        source_hash = file_sha256(os.path.join(SOURCE_DIR, filename))
+        if cache.get(filename, {}).get("sha256") != source_hash:
+            todo.append((filename, source_hash))
+    print(f"🌫️  {len(filenames)} images, {len(todo)} new or changed")
+
+    failed = []
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for filename, entry in pool.map(build_one, *zip(*todo), chunksize=16):
+                if "error" in entry:
+                    failed.append((filename, entry["error"]))
+                else:
+                    cache[filename] = entry
+        tmp = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False)
+        os.replace(tmp, CACHE_FILE)
+
+    updated = 0
+    for p in perfumes:
+        entry = cache.get(os.path.basename(p.get("image_local") or ""))
+        if not entry:
+            continue
+        fields = {"image_width": entry["width"], "image_height": entry["height"],
+                  "image_placeholder": entry["placeholder"]}
+        if any(p.get(k) != v for k, v in fields.items()):
+            p.update(fields)
+            updated += 1
+
+    if updated:
+        tmp = f"{DATA_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(perfumes, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, DATA_FILE)  # an interrupted run never leaves a truncated dataset
+    print(f"✅ {updated} perfumes updated in {DATA_FILE}")
+    if failed:
+        print(f"⚠️ {len(failed)} images could not be read:")
+        for filename, error in failed:
+            print(f"  ❌ {filename}: {error}")
+
+
+if __name__ == "__main__":
+    main()
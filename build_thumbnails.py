@@ -0,0 +1,160 @@
+"""
+Build responsive WebP/AVIF thumbnails for perfume_images/.
+
+Every source image is resized to a few widths and encoded in modern formats
+with content-hashed filenames (safe to cache forever), and a manifest maps
+each source filename to its variants. app.py reads the manifest to expose
+srcset-ready URLs under /thumbs.
+
+The build is incremental: a source whose SHA-256 matches the manifest and
+whose variants are all on disk is skipped. Work is spread across all cores.
+
+Usage:
+    python build_thumbnails.py
+    python build_thumbnails.py --workers 4 --force
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, features
+
+SOURCE_DIR = "perfume_images"
+OUT_DIR = "perfume_thumbs"
+MANIFEST_FILE = os.path.join(OUT_DIR, "manifest.json")
+WIDTHS = [160, 320, 480]
+# format -> (PIL format name, encoder options)
+FORMATS = {
+    "avif": ("AVIF", {"quality": 55, "speed": 6}),
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+}
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+
+def build_one(filename, source_hash, formats):
+    """Encode every width/format variant for one source image (runs in a worker process)."""
+    stem = os.path.splitext(filename)[0]
+    with Image.open(os.path.join(SOURCE_DIR, filename)) as im:
+        im.load()
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+        width, height = im.size
+
+        variants = {fmt: [] for fmt in formats}
+        # Never upscale: widths above the source collapse onto the source width
+        for w in sorted({min(w, width) for w in WIDTHS}):
+            h = round(height * w / width)
+            resized = im if w == width else im.resize((w, h), Image.LANCZOS)
+            for fmt in formats:
+                pil_format, options = FORMATS[fmt]
+                buf = io.BytesIO()
+                resized.save(buf, pil_format, **options)
+                data = buf.getvalue()
+                out_name = f"{stem}.{w}w.{hashlib.sha256(data).hexdigest()[:10]}.{fmt}"
+                with open(os.path.join(OUT_DIR, out_name), "wb") as f:
+                    f.write(data)
+                variants[fmt].append({"width": w, "file": out_name})
+
+    return filename, {"sha256": source_hash, "width": width, "height": height, "variants": variants}
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "images": {}}
+
+
+def is_current(entry, source_hash, formats):
+    if not entry or entry.get("sha256") != source_hash:
+        return False
+    if sorted(entry["variants"]) != sorted(formats):
+        return False
+    expected = {min(w, entry["width"]) for w in WIDTHS}
+    for fmt in formats:
+        if {v["width"] for v in entry["variants"][fmt]} != expected:
+            return False
+        if not all(os.path.exists(os.path.join(OUT_DIR, v["file"])) for v in entry["variants"][fmt]):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="rebuild every image")
+    args = parser.parse_args()
+
+    formats = available_formats()
+    missing = [f for f in FORMATS if f not in formats]
+    if missing:
+        print(f"⚠️  Pillow has no encoder for: {', '.join(missing)} — skipping")
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    manifest = load_manifest()
+    sources = sorted(f for f in os.listdir(SOURCE_DIR) if not f.startswith("."))
+
+    todo = []
+    images = {}
+    for filename in sources:
+        source_hash = file_sha256(os.path.join(SOURCE_DIR, filename))
+        entry = manifest["images"].get(filename)
+        if not args.force and is_current(entry, source_hash, formats):
+            images[filename] = entry
+        else:
+            todo.append((filename, source_hash))
+
+    print(f"🖼️  {len(sources)} sources, {len(todo)} new or changed, {len(images)} up to date")
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(build_one, filename, source_hash, formats) for filename, source_hash in todo]
+            for i, future in enumerate(futures, 1):
+                try:
+                    filename, entry = future.result()
+                    images[filename] = entry
+                except Exception as e:
+                    print(f"  ❌ {todo[i - 1][0]}: {e}")
+                if i % 100 == 0:
+                    print(f"  {i}/{len(todo)}")
+
+    manifest = {"version": MANIFEST_VERSION, "widths": WIDTHS, "formats": formats,
+                "images": dict(sorted(images.items()))}
+    tmp = MANIFEST_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, MANIFEST_FILE)
+
+    # Drop variants no longer referenced (old hashes, removed sources)
+    referenced = {v["file"] for e in images.values() for vs in e["variants"].values() for v in vs}
+    removed = 0
+    for name in os.listdir(OUT_DIR):
+        if name != os.path.basename(MANIFEST_FILE) and name not in referenced:
+            os.remove(os.path.join(OUT_DIR, name))
+            removed += 1
+
+    total_bytes = sum(os.path.getsize(os.path.join(OUT_DIR, f)) for f in referenced)
+    print(f"✅ {len(images)} images, {len(referenced)} variants ({total_bytes / 1e6:.1f} MB), {removed} stale removed")
+    print(f"💾 Manifest: {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Catalog snapshot loading with per-version caches.
+
+The catalog version is a content hash of the data file. Everything derived
+from the perfumes (feature matrices, neighbor tables, indexes) is cached on
+the Catalog object for as long as the file is unchanged, and heavier artifacts
+can be persisted under CACHE_DIR keyed by version so restarts reuse them.
+"""
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+# Override with PERFUME_DATA_FILE to serve a synthetic catalog (see generate_catalog.py)
+DATA_FILE = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
+CACHE_DIR = os.environ.get("PERFUME_CACHE_DIR", "catalog_cache")
+
+
+class Catalog:
+    """One immutable catalog version. Each perfume gets its list position as `id`."""
+
+    def __init__(self, path, version, perfumes):
+        self.path = path
+        self.version = version
+        self.perfumes = perfumes
+        for i, p in enumerate(perfumes):
+            p["id"] = i
+        self._derived = {}
+        self._locks = {}                 # name -> lock held while that artifact builds
+        self._lock = threading.Lock()    # guards _locks
+
+    def __len__(self):
+        return len(self.perfumes)
+
+    def derived(self, name, builder):
+        """
+        Return builder(self), computed once per catalog version.
+
+        Each name has its own lock, so a slow build (a neighbor table takes
+        minutes at 100k perfumes) only blocks callers of that artifact, and
+        builders may depend on other derived values. Endpoints that can
+        trigger a build are plain `def`s: FastAPI runs them in its
+        threadpool, so a build or a wait on its lock never stalls the event loop.
+        """
+        if name not in self._derived:
+            with self._lock:
+                lock = self._locks.setdefault(name, threading.Lock())
+            with lock:
+                if name not in self._derived:
+                    self._derived[name] = builder(self)
+        return self._derived[name]
+
+    def cache_path(self, name, ext):
+        """Path for a persisted artifact of this version, e.g. catalog_cache/neighbors-<version>.npz"""
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        return os.path.join(CACHE_DIR, f"{name}-{self.version}{ext}")
+
+
+@contextmanager
+def atomic_write(path):
+    """Binary file that replaces `path` only once fully written, so readers never see a partial artifact."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            yield f
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+_loaded = {}
+_load_lock = threading.Lock()
+
+
+def get_catalog(path=None):
+    """Current catalog for `path` (default DATA_FILE), reloaded when the file changes."""
+    path = path or DATA_FILE
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    entry = _loaded.get(path)
+    if entry is None or entry[0] != key:
+        with _load_lock:
+            entry = _loaded.get(path)
+            if entry is None or entry[0] != key:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                version = hashlib.sha256(raw).hexdigest()[:12]
+                entry = (key, Catalog(path, version, json.loads(raw)))
+                _loaded[path] = entry
+    return entry[1]
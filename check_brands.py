@@ -3,6 +3,7 @@ Compare target brand list vs JSON, show per-brand perfume counts,
 and list the 4 perfumes with missing vote fields.
 """
 import json
+import os
 from collections import defaultdict
 
 TARGET_BRANDS = [
@@ -28,7 +29,9 @@ TARGET_BRANDS = [
 
 VOTE_FIELDS = ['longevity', 'sillage', 'price_value', 'season', 'main_accords']
 
-with open("fragrantica_perfumes.json", encoding="utf-8") as f:
+JSON_FILE = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
+
+with open(JSON_FILE, encoding="utf-8") as f:
     data = json.load(f)
 
 # Count per brand in JSON (case-insensitive match)
@@ -0,0 +1,148 @@
+"""
+Note and accord co-occurrence analytics.
+
+Per catalog version, binary perfume×note and perfume×accord incidence
+matrices B are taken from the feature space, and co-occurrence counts are
+one sparse product each:
+    note×note = Bn.T @ Bn     accord×accord = Ba.T @ Ba     note×accord = Bn.T @ Ba
+The products are persisted in catalog_cache/ so restarts skip them. Queries
+read a row (or the non-zeros) of a cached matrix and compute, vectorized:
+    count   perfumes containing both
+    lift    P(x, y) / (P(x) P(y))
+    pmi     log2(lift)
+
+Usage:
+    python cooccurrence.py                      # build for PERFUME_DATA_FILE
+    python cooccurrence.py bergamot --metric lift
+"""
+import argparse
+import os
+
+import numpy as np
+from scipy import sparse
+
+from catalog import atomic_write, get_catalog
+from features import NOTE_TIERS, get_features, norm_name
+
+KINDS = ("note", "accord")
+METRICS = ("count", "lift", "pmi")
+MIN_COUNT = 5   # pairs rarer than this get noisy lift / PMI
+
+
+def _labels(perfumes, kind, vocab):
+    """Original spelling for each normalized name (first one seen)."""
+    fields = list(NOTE_TIERS) if kind == "note" else ["main_accords"]
+    labels = {}
+    for p in perfumes:
+        for f in fields:
+            for x in (p.get(f) or []):
+                if x:
+                    labels.setdefault(norm_name(x), x)
+    return [labels.get(name, name) for name in vocab]
+
+
+class Cooccurrence:
+    def __init__(self, catalog):
+        features = get_features(catalog)
+        self.n = features.n
+        self.vocab = {"note": features.notes, "accord": features.accords}
+        self.index = {kind: {name: j for j, name in enumerate(v)} for kind, v in self.vocab.items()}
+        self.labels = {kind: _labels(catalog.perfumes, kind, v) for kind, v in self.vocab.items()}
+
+        incidence = {
+            "note": (features.note_weights > 0).astype(np.int32).tocsr(),
+            "accord": (features.accord_weights > 0).astype(np.int32).tocsr(),
+        }
+        self.counts = {kind: np.asarray(b.sum(axis=0)).ravel() for kind, b in incidence.items()}
+
+        self.matrices = {}
+        for a, b in (("note", "note"), ("accord", "accord"), ("note", "accord")):
+            path = catalog.cache_path(f"cooccurrence-{a}-{b}", ".npz")
+            if os.path.exists(path):
+                m = sparse.load_npz(path).tocsr()
+            else:
+                m = (incidence[a].T @ incidence[b]).tocsr()
+                if a == b:
+                    m.setdiag(0)
+                    m.eliminate_zeros()
+                with atomic_write(path) as f:
+                    sparse.save_npz(f, m)
+            self.matrices[(a, b)] = m
+        self.matrices[("accord", "note")] = self.matrices[("note", "accord")].T.tocsr()
+
+    def lookup(self, kind, name):
+        """Column index for `name`: exact match, else the most common entry containing it."""
+        name = norm_name(name)
+        if not name:
+            return None   # "" is a substring of every key
+        if name in self.index[kind]:
+            return self.index[kind][name]
+        matches = [j for key, j in self.index[kind].items() if name in key]
+        return max(matches, key=lambda j: self.counts[kind][j]) if matches else None
+
+    def _metrics(self, both, count_x, count_y):
+        lift = both * self.n / (count_x * count_y)
+        return {"count": both, "lift": lift, "pmi": np.log2(lift)}
+
+    def related(self, kind, j, with_kind, metric="count", min_count=MIN_COUNT, limit=20):
+        """Items of `with_kind` that co-occur with item j of `kind`, ranked by metric."""
+        row = self.matrices[(kind, with_kind)].getrow(j)
+        cols, both = row.indices, row.data.astype(np.float64)
+        keep = both >= min_count
+        cols, both = cols[keep], both[keep]
+        values = self._metrics(both, self.counts[kind][j], self.counts[with_kind][cols])
+        order = np.argsort(-values[metric], kind="stable")[:limit]
+        return [self._entry(values, r, name=self.labels[with_kind][cols[r]]) for r in order]
+
+    def top_pairs(self, kind, with_kind, metric="count", min_count=MIN_COUNT, limit=20):
+        """Strongest pairs overall; same-kind pairs are counted once."""
+        m = self.matrices[(kind, with_kind)]
+        if kind == with_kind:
+            m = sparse.triu(m, k=1)
+        m = m.tocoo()
+        both = m.data.astype(np.float64)
+        keep = both >= min_count
+        rows, cols, both = m.row[keep], m.col[keep], both[keep]
+        values = self._metrics(both, self.counts[kind][rows], self.counts[with_kind][cols])
+        order = np.argsort(-values[metric], kind="stable")[:limit]
+        return [self._entry(values, r, a=self.labels[kind][rows[r]], b=self.labels[with_kind][cols[r]])
+                for r in order]
+
+    @staticmethod
+    def _entry(values, r, **names):
+        return {**names, "count": int(values["count"][r]),
+                "lift": round(float(values["lift"][r]), 3), "pmi": round(float(values["pmi"][r]), 3)}
+
+
+def get_cooccurrence(catalog):
+    return catalog.derived("cooccurrence", Cooccurrence)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("item", nargs="?", help="note (or accord with --kind accord) to look up")
+    parser.add_argument("--kind", choices=KINDS, default="note")
+    parser.add_argument("--with", dest="with_kind", choices=KINDS)
+    parser.add_argument("--metric", choices=METRICS, default="count")
+    parser.add_argument("--min-count", type=int, default=MIN_COUNT)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    co = get_cooccurrence(get_catalog())
+    with_kind = args.with_kind or args.kind
+    if args.item:
+        j = co.lookup(args.kind, args.item)
+        if j is None:
+            raise SystemExit(f"❌ No {args.kind} matching {args.item!r}")
+        print(f"🔗 {co.labels[args.kind][j]} ({co.counts[args.kind][j]} perfumes) — {with_kind}s by {args.metric}")
+        rows = co.related(args.kind, j, with_kind, args.metric, args.min_count, args.limit)
+        for r in rows:
+            print(f"  {r['name']:<30} {r['count']:>7}  lift {r['lift']:>6.2f}  pmi {r['pmi']:>6.2f}")
+    else:
+        print(f"🔗 Top {args.kind}–{with_kind} pairs by {args.metric}")
+        for r in co.top_pairs(args.kind, with_kind, args.metric, args.min_count, args.limit):
+            print(f"  {r['a']:<24} {r['b']:<24} {r['count']:>7}  lift {r['lift']:>6.2f}  pmi {r['pmi']:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
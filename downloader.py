@@ -0,0 +1,279 @@
+"""
+Concurrent image downloader for perfume images and note icons.
+
+A thread pool shares one pooled keep-alive requests.Session. Each host has
+its own concurrency cap (PER_HOST), so the CDN sees a few parallel
+connections rather than a burst. Every file is:
+
+  • retried with exponential backoff on connection errors, 429 and 5xx
+    (Retry-After is honoured)
+  • streamed to a temp file next to its target and renamed into place, so
+    an interrupted run never leaves a truncated image behind
+  • validated: image/* (or octet-stream) Content-Type, an image
+    signature (JPEG, PNG, GIF, WebP, AVIF), and at most MAX_BYTES
+  • revalidated with a conditional GET when refresh=True: the ETag /
+    Last-Modified of each file is kept in <dir>/.validators.json, and a
+    304 costs one small request and no write
+
+Existing files are skipped without a request unless refresh=True.
+
+Usage:
+    python downloader.py                       # missing perfume images + note icons for the dataset
+    python downloader.py --refresh             # revalidate every file (conditional GET)
+    python downloader.py --workers 32 --per-host 8
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_fetcher import USER_AGENT
+
+JSON_FILE = "fragrantica_perfumes.json"
+IMAGE_DIR = "perfume_images"
+NOTES_DIR = "perfume_notes"
+VALIDATORS_FILE = ".validators.json"
+
+WORKERS = 16
+PER_HOST = 6             # concurrent requests per host
+RETRIES = 3
+BACKOFF = 1.0            # s, doubled per attempt
+TIMEOUT = 20             # s
+MAX_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Leading bytes of the image formats the CDN serves
+IMAGE_SIGNATURES = [b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a", b"RIFF"]
+
+
+def sanitize_filename(name: str) -> str:
+    """Convert perfume / note name to a safe filename"""
+    name = re.sub(r'[<>:"/\\|?*&]', '', name)
+    name = re.sub(r'\s+', '_', name.strip())
+    return name[:80]
+
+
+def _is_image(head: bytes) -> bool:
+    if head[:4] == b"RIFF":
+        return head[8:12] == b"WEBP"
+    if head[4:8] == b"ftyp":
+        return head[8:12] in (b"avif", b"avis")
+    return any(head.startswith(sig) for sig in IMAGE_SIGNATURES)
+
+
+class _RetryAfter(Exception):
+    def __init__(self, seconds):
+        super().__init__(seconds)
+        self.seconds = seconds
+
+
+class Downloader:
+    """Pooled, per-host-capped, retrying image downloader with conditional GETs."""
+
+    def __init__(self, workers=WORKERS, per_host=PER_HOST, retries=RETRIES):
+        self.workers = workers
+        self.per_host = per_host
+        self.retries = retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"User-Agent": USER_AGENT, "Accept": "image/avif,image/webp,image/*,*/*;q=0.8"})
+        self.host_slots = {}
+        self.validators = {}  # dir -> {filename: {url, etag, last_modified}}
+        self.lock = threading.Lock()
+
+    def _slot(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.host_slots:
+                self.host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self.host_slots[host]
+
+    def _dir_validators(self, directory):
+        with self.lock:
+            if directory not in self.validators:
+                path = os.path.join(directory, VALIDATORS_FILE)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        self.validators[directory] = json.load(f)
+                except (OSError, ValueError):
+                    self.validators[directory] = {}
+            return self.validators[directory]
+
+    def save_validators(self):
+        with self.lock:
+            for directory, entries in self.validators.items():
+                path = os.path.join(directory, VALIDATORS_FILE)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+                os.replace(tmp, path)
+
+    def fetch(self, url, path, refresh=False):
+        """
+        Download url to path. Returns one of:
+            'downloaded', 'not_modified', 'exists' (skipped, refresh=False), 'failed'
+        """
+        if not url:
+            return "failed"
+        exists = os.path.exists(path)
+        if exists and not refresh:
+            return "exists"
+
+        directory, filename = os.path.split(path)
+        directory = directory or "."
+        known = self._dir_validators(directory)
+        cached = known.get(filename) if exists else None
+        headers = {}
+        if cached and cached.get("url") == url:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                with self._slot(url):
+                    status = self._get(url, path, headers, known, filename)
+                if status != "retry":
+                    return status
+            except requests.RequestException:
+                pass
+            except _RetryAfter as e:
+                retry_after = e.seconds
+            if attempt < self.retries:
+                time.sleep(retry_after if retry_after is not None else BACKOFF * 2 ** attempt * random.uniform(0.8, 1.2))
+        return "failed"
+
+    def _get(self, url, path, headers, known, filename):
+        with self.session.get(url, headers=headers, timeout=TIMEOUT, stream=True) as resp:
+            if resp.status_code == 304:
+                return "not_modified"
+            if resp.status_code in RETRY_STATUS:
+                retry_after = resp.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    raise _RetryAfter(min(int(retry_after), 60))
+                return "retry"
+            if resp.status_code != 200:
+                return "failed"
+            content_type = resp.headers.get("Content-Type", "").lower()
+            if not (content_type.startswith("image/") or content_type.startswith("application/octet-stream")):
+                return "failed"
+            if int(resp.headers.get("Content-Length") or 0) > MAX_BYTES:
+                return "failed"
+
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+            size = 0
+            try:
+                with open(tmp, "wb") as f:
+                    for chunk in resp.iter_content(CHUNK_SIZE):
+                        if not size and not _is_image(chunk[:16]):
+                            return "failed"
+                        size += len(chunk)
+                        if size > MAX_BYTES:
+                            return "failed"
+                        f.write(chunk)
+                if not size:
+                    return "failed"
+                os.replace(tmp, path)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+            etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+            with self.lock:
+                if etag or last_modified:
+                    known[filename] = {"url": url, "etag": etag, "last_modified": last_modified}
+                else:
+                    known.pop(filename, None)
+            return "downloaded"
+
+    def download_many(self, jobs, refresh=False, on_done=None):
+        """
+        Download (url, path) jobs concurrently.
+        on_done(url, path, status) is called for each job, from one thread at a time.
+        Returns {path: status}.
+        """
+        jobs = list(dict((path, url) for url, path in jobs).items())
+        results = {}
+        done_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch, url, path, refresh): (url, path) for path, url in jobs}
+            for future in as_completed(futures):
+                url, path = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:  # one bad job (disk, decode, unexpected response) never stops the batch
+                    print(f"  ⚠️ {os.path.basename(path)}: {type(e).__name__}: {str(e)[:100]}")
+                    status = "failed"
+                results[path] = status
+                if on_done:
+                    with done_lock:
+                        on_done(url, path, status)
+        self.save_validators()
+        return results
+
+    def close(self):
+        self.session.close()
+
+
+def summarize(results):
+    counts = Counter(results.values())
+    return (f"✅ Downloaded: {counts['downloaded']} | 🔁 Not modified: {counts['not_modified']} | "
+            f"⏭️ Existing: {counts['exists']} | ⚠️ Failed: {counts['failed']}")
+
+
+def image_jobs(perfumes, image_dir=IMAGE_DIR):
+    """(url, path) of every perfume image, named <brand>_<name>.png as in scrape_all_brands.py"""
+    return [(p["image_url"], os.path.join(image_dir, sanitize_filename(f"{p.get('brand')}_{p['name']}") + ".png"))
+            for p in perfumes if p.get("image_url") and p.get("name")]
+
+
+def note_jobs(note_images, notes_dir=NOTES_DIR):
+    """(url, path) of note icons from {note name: icon URL}"""
+    return [(url, os.path.join(notes_dir, sanitize_filename(note) + ".png"))
+            for note, url in note_images.items() if url]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=JSON_FILE)
+    parser.add_argument("--refresh", action="store_true", help="revalidate existing files with conditional GETs")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--per-host", type=int, default=PER_HOST)
+    args = parser.parse_args()
+
+    with open(args.input, encoding="utf-8") as f:
+        perfumes = json.load(f)
+    notes = {}
+    for p in perfumes:
+        notes.update(p.get("note_images") or {})
+    images, icons = image_jobs(perfumes), note_jobs(notes)
+
+    print(f"🖼️  {len(images) + len(icons)} files ({len(images)} perfume images, {len(icons)} note icons), "
+          f"{args.workers} workers, ≤ {args.per_host} per host")
+    downloader = Downloader(workers=args.workers, per_host=args.per_host)
+    t0 = time.perf_counter()
+    try:
+        results = downloader.download_many(images + icons, refresh=args.refresh)
+    finally:
+        downloader.close()
+    print(summarize(results))
+    print(f"⏱️ {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
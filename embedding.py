@@ -0,0 +1,114 @@
+"""
+2D "scent space" layout of the catalog.
+
+The note + accord + vote feature matrix (features.py) is projected onto its
+top two principal components with a truncated SVD. Centering is applied
+implicitly through a LinearOperator, so the sparse matrix is never densified.
+The layout is computed once per catalog version and persisted in
+catalog_cache/ as the exact bytes /api/embedding serves:
+
+    uint32              header length H (little-endian, like everything below)
+    H bytes             UTF-8 JSON {"version", "n", "accords", "bounds"}
+    0-3 bytes           padding to a 4-byte boundary
+    uint32[n]  ids      perfume ids, least voted first so popular ones draw on top
+    uint16[n]  x        coordinates quantized to 0..65535 over "bounds"
+    uint16[n]  y
+    uint16[n]  accord   index into header "accords" of the perfume's first main accord
+                        (65535 = none)
+
+That is 10 bytes per perfume; names, images and everything else are fetched
+per card from /api/perfumes/{id} when the user hovers or clicks.
+
+Usage:
+    python embedding.py        # build for PERFUME_DATA_FILE
+"""
+import json
+import os
+import struct
+import time
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, svds
+
+from catalog import atomic_write, get_catalog
+from features import get_features, norm_name
+
+NO_ACCORD = 0xFFFF
+
+
+def pca_2d(X):
+    """Top-2 principal component scores of sparse X without densifying it."""
+    mu = np.asarray(X.mean(axis=0), np.float64).ravel()
+    n, d = X.shape
+    op = LinearOperator(
+        (n, d), dtype=np.float64,
+        matvec=lambda v: X @ np.ravel(v) - mu @ np.ravel(v),
+        rmatvec=lambda u: X.T @ np.ravel(u) - mu * np.ravel(u).sum(),
+    )
+    u, s, _ = svds(op, k=2, random_state=0)
+    order = np.argsort(-s)
+    return u[:, order] * s[order]
+
+
+def quantize(values):
+    lo, hi = float(values.min()), float(values.max())
+    scale = 65535 / (hi - lo) if hi > lo else 0
+    return np.round((values - lo) * scale).astype("<u2"), [lo, hi]
+
+
+def build_payload(catalog):
+    features = get_features(catalog)
+    coords = pca_2d(features.matrix.astype(np.float64))
+    x, x_bounds = quantize(coords[:, 0])
+    y, y_bounds = quantize(coords[:, 1])
+
+    accord_index = {a: i for i, a in enumerate(features.accords)}
+    accord = np.full(len(catalog), NO_ACCORD, "<u2")
+    for i, p in enumerate(catalog.perfumes):
+        first = next((a for a in (p.get("main_accords") or []) if a), None)
+        if first:
+            accord[i] = accord_index[norm_name(first)]
+
+    votes = np.array([p.get("votes") or 0 for p in catalog.perfumes])
+    ids = np.argsort(votes, kind="stable").astype("<u4")
+
+    header = json.dumps({
+        "version": catalog.version,
+        "n": len(catalog),
+        "accords": features.accords,
+        "bounds": {"x": x_bounds, "y": y_bounds},
+    }, separators=(",", ":")).encode("utf-8")
+    pad = -(4 + len(header)) % 4
+    return b"".join([
+        struct.pack("<I", len(header)), header, b" " * pad,
+        ids.tobytes(), x[ids].tobytes(), y[ids].tobytes(), accord[ids].tobytes(),
+    ])
+
+
+def load_payload(catalog):
+    path = catalog.cache_path("embedding", ".bin")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    payload = build_payload(catalog)
+    with atomic_write(path) as f:
+        f.write(payload)
+    return payload
+
+
+def get_embedding(catalog):
+    """Serialized layout for this catalog version (bytes), loaded or built on first use."""
+    return catalog.derived("embedding", load_payload)
+
+
+def main():
+    catalog = get_catalog()
+    t0 = time.perf_counter()
+    payload = load_payload(catalog)
+    print(f"✅ {len(catalog):,} perfumes (version {catalog.version}): "
+          f"{len(payload) / 1024:.0f} KB in {time.perf_counter() - t0:.1f}s")
+    print(f"💾 {catalog.cache_path('embedding', '.bin')}")
+
+
+if __name__ == "__main__":
+    main()
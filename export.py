@@ -0,0 +1,69 @@
+"""
+Streaming encoders for /api/export.
+
+Each encoder is a generator over perfume ids that yields UTF-8 chunks of
+CHUNK_RECORDS records. The response streams them with chunked transfer
+encoding, and the server only asks for the next chunk after the previous one
+has been sent, so a slow client holds back the encoder instead of piling up
+output. Memory stays at one chunk plus the id list, whatever the result size.
+
+    ndjson   one JSON object per line, every field except image_placeholder
+    csv      EXPORT_COLUMNS; lists joined with "; ", vote objects as JSON
+"""
+import csv
+import io
+import json
+
+CHUNK_RECORDS = 500
+EXPORT_EXCLUDE = {"image_placeholder"}
+EXPORT_COLUMNS = [
+    "id", "name", "brand", "release_year", "gender", "category", "rating", "votes",
+    "top_notes", "middle_notes", "base_notes", "main_accords",
+    "longevity", "sillage", "price_value", "season",
+    "description", "url", "image_url",
+]
+
+
+def ndjson_chunks(perfumes, ids):
+    lines = []
+    for i in ids:
+        p = perfumes[i]
+        lines.append(json.dumps({k: v for k, v in p.items() if k not in EXPORT_EXCLUDE}, ensure_ascii=False))
+        if len(lines) == CHUNK_RECORDS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_value(v):
+    if isinstance(v, list):
+        return "; ".join(str(x) for x in v if x)
+    if isinstance(v, dict):
+        return json.dumps(v, ensure_ascii=False)
+    return "" if v is None else v
+
+
+def csv_chunks(perfumes, ids):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    for i in ids:
+        p = perfumes[i]
+        writer.writerow([_csv_value(p.get(c)) for c in EXPORT_COLUMNS])
+        rows += 1
+        if rows == CHUNK_RECORDS:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+            rows = 0
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+# format → (media type, file extension, encoder)
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson", ndjson_chunks),
+    "csv": ("text/csv; charset=utf-8", "csv", csv_chunks),
+}
@@ -0,0 +1,118 @@
+"""
+Sparse perfume feature matrix shared by similarity, recommendations and analytics.
+
+Columns are grouped in three blocks:
+  note:<name>     TF-IDF over notes, weighted by pyramid tier
+  accord:<name>   TF-IDF over main_accords, weighted by accord rank
+  <group>:<key>   vote profiles (season, longevity, sillage) as shares within
+                  their group, centered on the catalog mean
+Each block is L2-normalized per row and scaled by sqrt(BLOCK_WEIGHTS[block]),
+so the dot product of two rows is the weighted sum of per-block cosines.
+"""
+import math
+
+import numpy as np
+from scipy import sparse
+
+NOTE_TIERS = {"top_notes": 0.8, "middle_notes": 1.0, "base_notes": 1.2}
+VOTE_GROUPS = {
+    "season": ["spring", "summer", "fall", "winter", "day", "night"],
+    "longevity": ["very_weak", "weak", "moderate", "long_lasting", "eternal"],
+    "sillage": ["intimate", "moderate", "strong", "enormous"],
+}
+BLOCK_WEIGHTS = {"note": 0.5, "accord": 0.35, "vote": 0.15}
+
+
+def norm_name(s):
+    return " ".join((s or "").lower().split())
+
+
+def _l2_rows(m):
+    """Row-normalize a CSR matrix (rows of zeros stay zero)."""
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(m).tocsr()
+
+
+def _tfidf(m):
+    """Scale columns of a weighted incidence matrix by smoothed IDF."""
+    n = m.shape[0]
+    df = np.bincount(m.indices, minlength=m.shape[1])
+    idf = np.log((1 + n) / (1 + df)) + 1
+    return m.dot(sparse.diags(idf.astype(np.float32))).tocsr()
+
+
+class FeatureSpace:
+    """Vocabularies, raw incidence matrices and the combined weighted matrix for one catalog."""
+
+    def __init__(self, perfumes):
+        n = len(perfumes)
+        self.n = n
+
+        # Notes: one column per distinct note, weight = strongest tier it appears in
+        self.notes = sorted({norm_name(x) for p in perfumes for f in NOTE_TIERS for x in (p.get(f) or []) if x})
+        note_col = {name: j for j, name in enumerate(self.notes)}
+        rows, cols, vals = [], [], []
+        for i, p in enumerate(perfumes):
+            weights = {}
+            for field, w in NOTE_TIERS.items():
+                for x in (p.get(field) or []):
+                    if x:
+                        j = note_col[norm_name(x)]
+                        weights[j] = max(weights.get(j, 0), w)
+            rows.extend([i] * len(weights))
+            cols.extend(weights)
+            vals.extend(weights.values())
+        self.note_weights = sparse.csr_matrix(
+            (np.array(vals, np.float32), (rows, cols)), shape=(n, len(self.notes)))
+
+        # Accords: ordered by strength on Fragrantica, so earlier accords weigh more
+        self.accords = sorted({norm_name(a) for p in perfumes for a in (p.get("main_accords") or []) if a})
+        accord_col = {name: j for j, name in enumerate(self.accords)}
+        rows, cols, vals = [], [], []
+        for i, p in enumerate(perfumes):
+            accords = list(dict.fromkeys(norm_name(a) for a in (p.get("main_accords") or []) if a))
+            for rank, a in enumerate(accords):
+                rows.append(i)
+                cols.append(accord_col[a])
+                vals.append(1.0 - 0.5 * rank / max(len(accords), 1))
+        self.accord_weights = sparse.csr_matrix(
+            (np.array(vals, np.float32), (rows, cols)), shape=(n, len(self.accords)))
+
+        # Vote profiles: shares within each group, centered on the catalog mean
+        self.vote_columns = [f"{g}:{k}" for g, keys in VOTE_GROUPS.items() for k in keys]
+        votes = np.zeros((n, len(self.vote_columns)), np.float32)
+        has_votes = np.zeros((n, len(VOTE_GROUPS)), bool)
+        start = 0
+        for g_idx, (group, keys) in enumerate(VOTE_GROUPS.items()):
+            for i, p in enumerate(perfumes):
+                v = p.get(group)
+                if isinstance(v, dict):
+                    counts = [v.get(k) or 0 for k in keys]
+                    total = sum(counts)
+                    if total:
+                        votes[i, start:start + len(keys)] = [c / total for c in counts]
+                        has_votes[i, g_idx] = True
+            block = votes[:, start:start + len(keys)]
+            if has_votes[:, g_idx].any():
+                block[has_votes[:, g_idx]] -= block[has_votes[:, g_idx]].mean(axis=0)
+            start += len(keys)
+        self.vote_profiles = votes
+
+        self.columns = ([f"note:{x}" for x in self.notes] + [f"accord:{a}" for a in self.accords]
+                        + self.vote_columns)
+        self.blocks = {
+            "note": (0, len(self.notes)),
+            "accord": (len(self.notes), len(self.notes) + len(self.accords)),
+            "vote": (len(self.notes) + len(self.accords), len(self.columns)),
+        }
+
+        self.matrix = sparse.hstack([
+            math.sqrt(BLOCK_WEIGHTS["note"]) * _l2_rows(_tfidf(self.note_weights)),
+            math.sqrt(BLOCK_WEIGHTS["accord"]) * _l2_rows(_tfidf(self.accord_weights)),
+            math.sqrt(BLOCK_WEIGHTS["vote"]) * _l2_rows(sparse.csr_matrix(self.vote_profiles)),
+        ], format="csr", dtype=np.float32)
+
+
+def get_features(catalog):
+    return catalog.derived("features", lambda c: FeatureSpace(c.perfumes))
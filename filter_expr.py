@@ -0,0 +1,267 @@
+"""
+Boolean filter expressions over notes and accords.
+
+Grammar (keywords are case-insensitive):
+
+    expr  := or ("," or)*                  comma: AND with the lowest precedence
+    or    := and (OR and)*
+    and   := unary (AND? unary)*
+    unary := NOT unary | "(" expr ")" | term
+    term  := [note: | accord:] name [IN tier]
+    tier  := top | head | middle | heart | base
+
+Names are bare words ("pink pepper") or quoted ("'iris in bloom'"); a word
+with a note:/accord: prefix starts a new term. Like the `note` and `accord`
+parameters, a name matches every note/accord containing it.
+
+    rose OR oud, NOT vanilla               (rose OR oud) AND NOT vanilla
+    vetiver in base AND (accord:citrus OR bergamot in top)
+
+Expressions compile to a plan over the posting lists in indexes.py. AND
+intersects its positive operands smallest-first and subtracts the negated
+ones, so evaluation cost follows the sizes of the posting lists involved
+(name lookups happen once, at compile time);
+only a NOT that is not under an AND needs the full id range. Compiled plans
+are cached per (catalog version, expression text).
+"""
+import re
+import threading
+from collections import OrderedDict
+
+from indexes import EMPTY, TIER_ALIASES, difference, get_index, intersect, union
+
+PLAN_CACHE_SIZE = 256
+KEYWORDS = {"and", "or", "not", "in"}
+FIELD_PREFIX = re.compile(r"(?i)(note|accord):")
+TOKEN = re.compile(r"""\s*(?:(?P<punct>[(),])|"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<word>[^\s(),"']+))""")
+
+
+class FilterSyntaxError(ValueError):
+    pass
+
+
+def tokenize(text):
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = TOKEN.match(text, pos)
+        if not m:
+            raise FilterSyntaxError(f"Unexpected character at position {pos}: {text[pos]!r}")
+        if m.group("punct"):
+            tokens.append(("punct", m.group("punct"), m.start("punct")))
+        elif m.group("word") is not None:
+            word = m.group("word")
+            kind = "kw" if word.lower() in KEYWORDS else "word"
+            tokens.append((kind, word.lower() if kind == "kw" else word, m.start("word")))
+        else:
+            quoted = m.group("dq") if m.group("dq") is not None else m.group("sq")
+            tokens.append(("word", quoted, m.start()))
+        pos = m.end()
+    return tokens
+
+
+# ── Plan nodes ──────────────────────────────────────────────────────────────
+
+class Term:
+    def __init__(self, kind, name, tier, ids):
+        self.kind, self.name, self.tier, self.ids = kind, name, tier, ids
+
+    def size(self):
+        return len(self.ids)
+
+    def evaluate(self, index):
+        return self.ids
+
+    def explain(self):
+        tier = f" in {self.tier}" if self.tier else ""
+        return f"{self.kind}:{self.name!r}{tier} [{len(self.ids)}]"
+
+
+class Not:
+    def __init__(self, child):
+        self.child = child
+
+    def size(self):
+        return None   # only known against a universe
+
+    def evaluate(self, index):
+        return difference(index.all_ids, self.child.evaluate(index))
+
+    def explain(self):
+        return f"NOT {self.child.explain()}"
+
+
+class And:
+    def __init__(self, children):
+        # Positive operands smallest first; negated ones are subtracted at the end
+        self.positive = sorted((c for c in children if not isinstance(c, Not)), key=_size_key)
+        self.negative = [c.child for c in children if isinstance(c, Not)]
+
+    def size(self):
+        sizes = [c.size() for c in self.positive]
+        return min(s for s in sizes if s is not None) if any(s is not None for s in sizes) else None
+
+    def evaluate(self, index):
+        ids = self.positive[0].evaluate(index) if self.positive else index.all_ids
+        for child in self.positive[1:]:
+            if not len(ids):
+                return EMPTY
+            ids = intersect(ids, child.evaluate(index))
+        for child in self.negative:
+            if not len(ids):
+                return EMPTY
+            ids = difference(ids, child.evaluate(index))
+        return ids
+
+    def explain(self):
+        parts = [c.explain() for c in self.positive] + [f"NOT {c.explain()}" for c in self.negative]
+        return "(" + " AND ".join(parts) + ")"
+
+
+class Or:
+    def __init__(self, children):
+        self.children = children
+
+    def size(self):
+        sizes = [c.size() for c in self.children]
+        return None if None in sizes else sum(sizes)
+
+    def evaluate(self, index):
+        return union([c.evaluate(index) for c in self.children], index.n)
+
+    def explain(self):
+        return "(" + " OR ".join(c.explain() for c in self.children) + ")"
+
+
+def _size_key(node):
+    size = node.size()
+    return float("inf") if size is None else size
+
+
+# ── Parser ──────────────────────────────────────────────────────────────────
+
+class Parser:
+    def __init__(self, text, index):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+        self.index = index
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None, len(self.text))
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def error(self, message):
+        raise FilterSyntaxError(f"{message} at position {self.peek()[2]}")
+
+    def parse(self):
+        if not self.tokens:
+            raise FilterSyntaxError("Empty filter expression")
+        node = self.parse_expr()
+        if self.peek()[0] is not None:
+            self.error(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def parse_expr(self):
+        children = [self.parse_or()]
+        while self.peek()[:2] == ("punct", ","):
+            self.take()
+            children.append(self.parse_or())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek()[:2] == ("kw", "or"):
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(children)
+
+    def parse_and(self):
+        children = [self.parse_unary()]
+        while True:
+            kind, value, _ = self.peek()
+            if (kind, value) == ("kw", "and"):
+                self.take()
+            elif not (kind == "word" or (kind, value) in (("kw", "not"), ("punct", "("))):
+                break
+            children.append(self.parse_unary())
+        return children[0] if len(children) == 1 else And(children)
+
+    def parse_unary(self):
+        kind, value, _ = self.peek()
+        if (kind, value) == ("kw", "not"):
+            self.take()
+            return Not(self.parse_unary())
+        if (kind, value) == ("punct", "("):
+            self.take()
+            node = self.parse_expr()
+            if self.peek()[:2] != ("punct", ")"):
+                self.error("Expected ')'")
+            self.take()
+            return node
+        if kind == "word":
+            return self.parse_term()
+        self.error("Expected a note or accord")
+
+    def parse_term(self):
+        words = [self.take()[1]]
+        while self.peek()[0] == "word" and not FIELD_PREFIX.match(self.peek()[1]):
+            words.append(self.take()[1])
+        field, sep, rest = words[0].partition(":")
+        kind = "note"
+        if sep and field.lower() in ("note", "accord"):
+            kind = field.lower()
+            words[0] = rest
+        name = " ".join(w for w in words if w)
+        if not name:
+            self.error("Missing name")
+
+        tier = None
+        if self.peek()[:2] == ("kw", "in"):
+            self.take()
+            if self.peek()[0] != "word":
+                self.error("Expected a tier (top, middle or base) after 'in'")
+            tier_token = self.take()
+            tier = TIER_ALIASES.get(tier_token[1].lower())
+            if tier is None:
+                raise FilterSyntaxError(
+                    f"Unknown tier {tier_token[1]!r} at position {tier_token[2]}; expected top, middle or base")
+            if kind == "accord":
+                raise FilterSyntaxError(f"Accords have no tier (position {tier_token[2]})")
+
+        if kind == "accord":
+            ids = self.index.lookup(self.index.accords, name)
+        else:
+            ids = self.index.lookup(self.index.notes[tier or "any"], name)
+        return Term(kind, name.lower(), tier, ids)
+
+
+# ── Plan cache ──────────────────────────────────────────────────────────────
+
+_plans = OrderedDict()
+_plans_lock = threading.Lock()   # sync endpoints compile from threadpool workers
+
+
+def compile_filter(catalog, text):
+    """Compiled plan for `text` against this catalog version (LRU-cached by expression text)."""
+    key = (catalog.version, text.strip())
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    plan = Parser(text, get_index(catalog)).parse()   # outside the lock; a racing compile is harmless
+    with _plans_lock:
+        _plans[key] = plan
+        if len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
+def evaluate_filter(catalog, text):
+    """Sorted array of perfume ids matching the expression."""
+    return compile_filter(catalog, text).evaluate(get_index(catalog))
@@ -0,0 +1,218 @@
+"""
+Generate synthetic perfume catalogs for scaling tests.
+
+Every record has the same schema as fragrantica_perfumes.json and is built by
+resampling the real dataset: brands, per-tier notes, accords, vote dicts,
+description lengths and image references follow the distributions of the
+898 scraped perfumes. Output is deterministic for a given seed, and a smaller
+catalog is always a prefix of a larger one generated with the same seed.
+
+Usage:
+    python generate_catalog.py                          # 10k, 100k, 1M
+    python generate_catalog.py --sizes 10000 --seed 7
+    PERFUME_DATA_FILE=synthetic_catalogs/fragrantica_perfumes_10k.json uvicorn app:app
+"""
+import argparse
+import json
+import os
+import random
+import re
+from collections import Counter
+
+SOURCE_FILE = "fragrantica_perfumes.json"
+OUT_DIR = "synthetic_catalogs"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+NOTE_FIELDS = ["top_notes", "middle_notes", "base_notes"]
+VOTE_FIELDS = ["longevity", "sillage", "price_value", "season"]
+# Fields copied verbatim from the sampled template so that image references
+# always point at files that exist in perfume_images/
+IMAGE_FIELDS = ["image_url", "image_local", "image_width", "image_height", "image_placeholder"]
+
+NOTE_SWAP_PROB = 0.5
+ACCORD_SWAP_PROB = 0.3
+FIRST_ID = 900000
+
+
+def size_label(n):
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f"{n // 1_000_000}m"
+    if n >= 1000 and n % 1000 == 0:
+        return f"{n // 1000}k"
+    return str(n)
+
+
+def slugify(s):
+    return re.sub(r"[^A-Za-z0-9]+", "-", s).strip("-")
+
+
+def join_notes(notes):
+    if len(notes) == 1:
+        return notes[0]
+    return ", ".join(notes[:-1]) + " and " + notes[-1]
+
+
+class WeightedPool:
+    """Frequency-weighted sampler over the values of a Counter."""
+
+    def __init__(self, counter):
+        items = sorted(counter.items())
+        self.values = [v for v, _ in items]
+        self.cum_weights = []
+        total = 0
+        for _, c in items:
+            total += c
+            self.cum_weights.append(total)
+
+    def sample(self, rng):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+class CatalogModel:
+    """Empirical distributions extracted from the real dataset"""
+
+    def __init__(self, perfumes):
+        self.templates = perfumes
+        self.brand_pool = WeightedPool(Counter(p.get("brand", "") for p in perfumes))
+        self.by_brand = {}
+        for p in perfumes:
+            self.by_brand.setdefault(p.get("brand", ""), []).append(p)
+
+        self.note_pools = {
+            field: WeightedPool(Counter(n for p in perfumes for n in (p.get(field) or []) if n))
+            for field in NOTE_FIELDS
+        }
+        self.accord_pool = WeightedPool(Counter(a for p in perfumes for a in (p.get("main_accords") or []) if a))
+
+        self.name_words = WeightedPool(Counter(
+            w for p in perfumes for w in (p.get("name") or "").split()
+            if w.isalpha() and w.lower() != (p.get("brand") or "").lower()
+        ))
+
+        self.note_image_urls = {}
+        for p in perfumes:
+            for note, url in (p.get("note_images") or {}).items():
+                self.note_image_urls.setdefault(note, url)
+
+    def _resample(self, rng, values, pool, swap_prob):
+        out = []
+        for v in values:
+            if rng.random() < swap_prob:
+                v = pool.sample(rng)
+            if v not in out:
+                out.append(v)
+        return out
+
+    def _vote_dict(self, rng, votes):
+        if not votes or not isinstance(votes, dict):
+            return votes
+        scale = rng.lognormvariate(0, 0.5)
+        return {k: max(0, int(round(v * scale * rng.lognormvariate(0, 0.25)))) for k, v in votes.items()}
+
+    def _name(self, rng, template):
+        words = [self.name_words.sample(rng) for _ in range(rng.choice([1, 1, 2, 2, 3]))]
+        base = (template.get("name") or "").split()
+        if base and rng.random() < 0.5:
+            words = base[:rng.randint(1, len(base))] + words
+        return " ".join(dict.fromkeys(words))
+
+    def _description(self, rng, p, template):
+        gender = (p.get("gender") or "").lower()
+        gender_phrase = {"unisex": "women and men", "men": "men", "women": "women"}.get(gender, "women and men")
+        accords = " ".join(a.title() for a in (p.get("main_accords") or [])[:2]) or "Floral"
+        lines = [f"{p['name']} by {p['brand']} is a {accords} fragrance for {gender_phrase}."]
+        if p.get("release_year"):
+            lines.append(f"{p['name']} was launched in {p['release_year']}.")
+        tiers = [("Top", p["top_notes"]), ("middle", p["middle_notes"]), ("base", p["base_notes"])]
+        parts = []
+        for label, notes in tiers:
+            if notes:
+                verb = "notes are" if len(notes) > 1 else "note is"
+                parts.append(f"{label} {verb} {join_notes(notes)}")
+        if parts:
+            lines.append("; ".join(parts) + ".")
+        header = " ".join(lines)
+
+        # Keep the template's free-text tail so description lengths follow the real distribution
+        template_desc = template.get("description") or ""
+        head, sep, tail = template_desc.partition("\n\n")
+        return header + (sep + tail if sep else "")
+
+    def generate(self, rng, index):
+        brand = self.brand_pool.sample(rng)
+        template = rng.choice(self.by_brand[brand])
+
+        p = {"url": None}
+        p["name"] = self._name(rng, template)
+        p["brand"] = brand
+        p["url"] = f"https://www.fragrantica.com/perfume/{slugify(brand)}/{slugify(p['name'])}-{FIRST_ID + index}.html"
+
+        year = template.get("release_year")
+        if year:
+            year = min(2026, max(1900, year + rng.randint(-3, 3)))
+        p["release_year"] = year
+        p["gender"] = template.get("gender")
+        for field in NOTE_FIELDS:
+            p[field] = self._resample(rng, template.get(field) or [], self.note_pools[field], NOTE_SWAP_PROB)
+
+        rating = template.get("rating")
+        if rating is not None:
+            rating = round(min(5.0, max(1.0, rng.gauss(rating, 0.15))), 2)
+        p["rating"] = rating
+        votes = template.get("votes")
+        if votes is not None:
+            votes = max(1, int(votes * rng.lognormvariate(0, 0.6)))
+        p["votes"] = votes
+
+        p["main_accords"] = self._resample(rng, template.get("main_accords") or [], self.accord_pool, ACCORD_SWAP_PROB)
+        p["description"] = self._description(rng, p, template)
+        p["category"] = template.get("category")
+        for field in IMAGE_FIELDS:
+            if field in template:
+                p[field] = template[field]
+        for field in VOTE_FIELDS:
+            p[field] = self._vote_dict(rng, template.get(field))
+
+        if "note_images" in template:
+            p["note_images"] = {
+                n: self.note_image_urls[n]
+                for field in NOTE_FIELDS for n in p[field]
+                if n in self.note_image_urls
+            }
+        return p
+
+
+def write_catalog(model, size, seed, path):
+    """Stream `size` records to `path` as a JSON array (one record per line)."""
+    rng = random.Random(seed)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i in range(size):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(model.generate(rng, i), ensure_ascii=False))
+        f.write("\n]\n")
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--source", default=SOURCE_FILE)
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    args = parser.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        model = CatalogModel(json.load(f))
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for size in sorted(args.sizes):
+        path = os.path.join(args.out_dir, f"fragrantica_perfumes_{size_label(size)}.json")
+        print(f"🧪 Generating {size:,} perfumes → {path}")
+        write_catalog(model, size, args.seed, path)
+        print(f"  ✅ {os.path.getsize(path) / 1e6:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
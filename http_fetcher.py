@@ -0,0 +1,171 @@
+"""
+HTTP-first fetch tier for the Fragrantica scrapers.
+
+Requests go over one pooled keep-alive requests.Session (compressed
+transfer, browser-like headers) and pages are parsed from the static HTML.
+Brand listing pages always take this tier: their links are in the markup.
+
+Perfume pages only take it for conditional refreshes. Their vote cards
+(longevity, sillage, price value, season) are rendered lazily by Vue, so a
+static page never has all of REQUIRED_FIELDS, and an unconditional GET
+would only spend a second rate-limiter token before the browser. The first
+fetch of a perfume page therefore goes straight to the browser, which
+records the document's ETag / Last-Modified from Chrome's network log.
+
+Conditional requests: every archived fetch records the response's ETag /
+Last-Modified (page_archive.py). The next request for that URL sends
+If-None-Match / If-Modified-Since, and a 304 is served from the archived
+page, including the browser payloads of the rendered copy — an unchanged
+page then costs one small request and no browser at all. A 200 means the
+page changed; it goes to the browser with the new validators.
+
+Every response is reported to the shared rate limiter (rate_limit.py):
+latency of healthy pages, and 429 / 503 / block pages as push-back.
+
+TierStats counts how each page was served (http, http 304, browser) and why
+the browser was needed; the scraper prints it at the end of a run.
+"""
+import threading
+import time
+from collections import Counter
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from perfume_parser import block_reason
+
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36')
+TIMEOUT = 20              # s
+POOL_SIZE = 8             # keep-alive connections per host
+# Fields a static page must have to skip the browser
+REQUIRED_FIELDS = ['name', 'brand', 'rating', 'longevity', 'sillage', 'price_value', 'season']
+
+try:
+    import brotli  # noqa: F401  (requests/urllib3 decode br only when it is installed)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class TierStats:
+    """Thread-safe counts of how pages were served and why the browser was needed."""
+
+    TIERS = [('http', 'HTTP'), ('http_304', 'HTTP 304'), ('browser', 'browser')]
+
+    def __init__(self):
+        self.tiers = Counter()
+        self.reasons = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, tier, reason=None):
+        with self.lock:
+            self.tiers[tier] += 1
+            if reason:
+                self.reasons[reason] += 1
+
+    def summary(self):
+        with self.lock:
+            total = sum(self.tiers.values())
+            if not total:
+                return None
+            parts = [f"{label} {self.tiers[key]} ({100 * self.tiers[key] / total:.1f}%)" for key, label in self.TIERS]
+            line = f"🌐 Fetch tiers: {total} pages — " + ", ".join(parts)
+            if self.reasons:
+                line += "\n   browser needed for: " + ", ".join(f"{r} {n}" for r, n in self.reasons.most_common())
+            return line
+
+
+class HttpFetcher:
+    """Pooled HTTP client with conditional requests against the page archive."""
+
+    def __init__(self, archive=None, rate_limiter=None, pool_size=POOL_SIZE):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': ACCEPT_ENCODING,
+        })
+        self.archive = archive
+        self.rate_limiter = rate_limiter
+        self.validators = archive.validators() if archive else {}
+        self.stats = TierStats()
+
+    def get(self, url):
+        """
+        (page, None) or (None, reason) for a network error, non-200 status or block page.
+            page = {'page_source', 'payloads', 'etag', 'last_modified', 'not_modified'}
+        A 304 returns the archived page and its payloads with not_modified=True;
+        if that copy can no longer be read, the page is fetched again without validators.
+        """
+        cached = self.validators.get(url)
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        t = time.monotonic()
+        try:
+            resp = self.session.get(url, headers=headers, timeout=TIMEOUT)
+        except requests.RequestException as e:
+            print(f"  ⚠️ HTTP error: {str(e)[:100]}")
+            self._record('error')
+            return None, 'http error'
+        latency = time.monotonic() - t
+
+        if resp.status_code == 304 and cached:
+            self._record('ok', latency)
+            try:
+                page = self.archive.get(cached['sha256'])
+                page_source = page['page_source']
+            except (OSError, EOFError, ValueError, KeyError):
+                # Archived copy pruned or unreadable: forget the validators, fetch unconditionally
+                print("  ⚠️ 304 but the archived page is missing, refetching")
+                self.validators.pop(url, None)
+                return self.get(url)
+            return {'page_source': page_source, 'payloads': page.get('payloads') or {},
+                    'etag': cached.get('etag'), 'last_modified': cached.get('last_modified'),
+                    'not_modified': True}, None
+        if resp.status_code != 200:
+            if resp.status_code in (429, 503):
+                retry_after = resp.headers.get('Retry-After', '')
+                self._record('blocked', retry_after=float(retry_after) if retry_after.isdigit() else None)
+            else:
+                self._record('error')
+            return None, f'http {resp.status_code}'
+
+        if 'charset' not in resp.headers.get('Content-Type', '').lower():
+            resp.encoding = 'utf-8'
+        page_source = resp.text
+        blocked = block_reason(page_source)
+        if blocked:
+            self._record(blocked)
+            return None, 'block page'
+        self._record('ok', latency)
+        return {'page_source': page_source, 'payloads': {},
+                'etag': resp.headers.get('ETag'), 'last_modified': resp.headers.get('Last-Modified'),
+                'not_modified': False}, None
+
+    def _record(self, outcome, latency=None, retry_after=None):
+        if self.rate_limiter:
+            self.rate_limiter.record(outcome, latency, kind='http', retry_after=retry_after)
+
+    def can_revalidate(self, url):
+        """True when url has archived validators, i.e. a conditional GET can return 304."""
+        return url in self.validators
+
+    def remember(self, url, digest, etag=None, last_modified=None):
+        """Validators for the next conditional request of url (archived as `digest`)."""
+        if etag or last_modified:
+            self.validators[url] = {'sha256': digest, 'etag': etag, 'last_modified': last_modified}
+
+    def close(self):
+        self.session.close()
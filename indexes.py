@@ -0,0 +1,152 @@
+"""
+Inverted indexes over one catalog version.
+
+Posting lists are sorted int32 arrays of perfume ids (list positions).
+Intersections and differences binary-search the smaller list in the larger
+one, so they cost O(small · log large) and never touch the rest of the
+catalog; large unions switch to a bitmap. Indexes:
+  notes[tier][name]   tier in top / middle / base, plus "any"
+  accords[name]
+  fields[field][key]  exact lower-cased brand / category / gender, and the
+                      dominant price / longevity / sillage / season votes
+  ranges[field]       rating / votes / year values sorted ascending with their
+                      ids; a range is two binary searches and one slice
+Note and accord names are normalized with features.norm_name.
+"""
+import numpy as np
+
+from features import norm_name
+
+TIERS = {"top": "top_notes", "middle": "middle_notes", "base": "base_notes"}
+TIER_ALIASES = {"top": "top", "head": "top", "middle": "middle", "heart": "middle", "base": "base"}
+EMPTY = np.empty(0, np.int32)
+RANGE_FIELDS = {"rating": "rating", "votes": "votes", "year": "release_year"}
+SEASON_GROUP = {"spring", "summer", "fall", "winter"}
+DAYTIME_GROUP = {"day", "night"}
+SEASON_THRESHOLD = 0.65   # seasons within 65% of the top one also count as dominant
+
+
+def dominant_vote(votes):
+    """Key with the most votes (first one on ties), or None."""
+    if not votes or not isinstance(votes, dict):
+        return None
+    return max(votes.items(), key=lambda x: x[1])[0]
+
+
+def dominant_seasons(votes):
+    """Dominant seasons (multi-season perfumes allowed) plus every daytime value with votes."""
+    if not votes or not isinstance(votes, dict):
+        return []
+    seasons = sorted(((k, v) for k, v in votes.items() if k in SEASON_GROUP), key=lambda x: x[1], reverse=True)
+    result = []
+    if seasons:
+        threshold = seasons[0][1] * SEASON_THRESHOLD
+        result = [k for k, v in seasons if v >= threshold]
+    return result + [k for k, v in votes.items() if k in DAYTIME_GROUP and v > 0]
+
+
+def _freeze(postings):
+    return {name: np.array(ids, np.int32) for name, ids in postings.items()}
+
+
+class CatalogIndex:
+    def __init__(self, perfumes):
+        self.n = len(perfumes)
+        self.all_ids = np.arange(self.n, dtype=np.int32)
+
+        notes = {tier: {} for tier in [*TIERS, "any"]}
+        accords = {}
+        fields = {f: {} for f in ("brand", "category", "gender", "price", "longevity", "sillage", "season")}
+        for i, p in enumerate(perfumes):
+            for f in ("brand", "category", "gender"):
+                fields[f].setdefault((p.get(f) or "").lower(), []).append(i)
+            for f, source in (("price", "price_value"), ("longevity", "longevity"), ("sillage", "sillage")):
+                key = dominant_vote(p.get(source))
+                if key is not None:
+                    fields[f].setdefault(key, []).append(i)
+            for key in dominant_seasons(p.get("season")):
+                fields["season"].setdefault(key, []).append(i)
+
+            seen = set()
+            for tier, field in TIERS.items():
+                for x in (p.get(field) or []):
+                    if not x:
+                        continue
+                    name = norm_name(x)
+                    postings = notes[tier].setdefault(name, [])
+                    if not postings or postings[-1] != i:
+                        postings.append(i)
+                    if name not in seen:
+                        seen.add(name)
+                        notes["any"].setdefault(name, []).append(i)
+            for a in dict.fromkeys(norm_name(a) for a in (p.get("main_accords") or []) if a):
+                accords.setdefault(a, []).append(i)
+
+        self.notes = {tier: _freeze(postings) for tier, postings in notes.items()}
+        self.accords = _freeze(accords)
+        self.fields = {f: _freeze(postings) for f, postings in fields.items()}
+
+        # Perfumes without a value never match a range
+        self.ranges = {}
+        for f, source in RANGE_FIELDS.items():
+            ids = np.array([i for i, p in enumerate(perfumes) if isinstance(p.get(source), (int, float))], np.int32)
+            values = np.array([perfumes[i][source] for i in ids], np.float64)
+            order = np.argsort(values, kind="stable")
+            self.ranges[f] = (values[order], ids[order])
+
+    def field(self, name, key):
+        return self.fields[name].get(key, EMPTY)
+
+    def range_bounds(self, name, lo=None, hi=None):
+        """(start, stop) positions in ranges[name] of values within [lo, hi]."""
+        values, _ = self.ranges[name]
+        start = 0 if lo is None else int(np.searchsorted(values, lo, side="left"))
+        stop = len(values) if hi is None else int(np.searchsorted(values, hi, side="right"))
+        return start, max(start, stop)
+
+    def range_ids(self, name, lo=None, hi=None):
+        """Sorted ids with lo <= value <= hi."""
+        start, stop = self.range_bounds(name, lo, hi)
+        return np.sort(self.ranges[name][1][start:stop])
+
+    def lookup(self, postings, name):
+        """Ids of every entry whose name contains `name` — the `note` / `accord` filter semantics."""
+        name = norm_name(name)
+        return union([ids for key, ids in postings.items() if name in key], self.n)
+
+
+def _member(a, b):
+    """Boolean mask of which entries of sorted `a` are in sorted `b` — O(|a| log |b|)."""
+    if not len(b):
+        return np.zeros(len(a), bool)
+    pos = np.searchsorted(b, a).clip(max=len(b) - 1)
+    return b[pos] == a
+
+
+def intersect(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return a[_member(a, b)]
+
+
+def difference(a, b):
+    return a[~_member(a, b)]
+
+
+def union(arrays, n):
+    """Sorted union; above n/16 total ids a bitmap over the catalog is cheaper than sorting."""
+    arrays = [a for a in arrays if len(a)]
+    if not arrays:
+        return EMPTY
+    if len(arrays) == 1:
+        return arrays[0]
+    if sum(len(a) for a in arrays) > n // 16:
+        mask = np.zeros(n, bool)
+        for a in arrays:
+            mask[a] = True
+        return np.flatnonzero(mask).astype(np.int32)
+    return np.unique(np.concatenate(arrays))
+
+
+def get_index(catalog):
+    return catalog.derived("index", lambda c: CatalogIndex(c.perfumes))
@@ -0,0 +1,302 @@
+"""
+Closed-loop load generator that replays realistic frontend sessions.
+
+Each virtual user behaves like static/app.js: `init()` loads stats, brands,
+notes and accords one after another and renders the first page, then the
+user pages, toggles chips, types searches, changes the sort and opens the
+Fragrance Map (`loadFragranceMap`), pausing for an exponential think time
+between actions. Every action re-issues `/api/perfumes` with the same query
+string `fetchAndRender()` would build.
+
+Latency percentiles are reported per time window. With --ramp the run is
+repeated at increasing concurrency to find the saturation point, i.e. the
+first stage where throughput stops growing or p95 breaks the SLO.
+
+Usage:
+    python loadtest.py --url http://127.0.0.1:5001 --users 16 --duration 60
+    python loadtest.py --url http://127.0.0.1:5001 --ramp 1 2 4 8 16 32 64 --stage-seconds 30
+    python loadtest.py --data synthetic_catalogs/fragrantica_perfumes_10k.json --users 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from urllib.parse import urlencode
+
+from bench_api import percentile
+
+SEASONS = ["spring", "summer", "fall", "winter", "day", "night"]
+LONGEVITIES = ["very_weak", "weak", "moderate", "long_lasting", "eternal"]
+SILLAGES = ["intimate", "moderate", "strong", "enormous"]
+PRICES = ["way_overpriced", "overpriced", "ok", "good_value", "great_value"]
+SORTS = ["rating-desc", "rating-asc", "votes-desc", "name-asc", "year-desc"]
+SEARCHES = ["dior", "noir", "oud", "rose", "bleu", "vanilla", "man", "intense"]
+
+# Relative weight of each user action after init()
+ACTIONS = {
+    "next_page": 30,
+    "toggle_season": 12,
+    "toggle_longevity": 8,
+    "toggle_sillage": 5,
+    "toggle_price": 5,
+    "add_note": 10,
+    "add_accord": 8,
+    "search": 8,
+    "sort": 6,
+    "clear": 4,
+    "open_map": 4,
+}
+SATURATION_GAIN = 0.10  # a stage adding <10% throughput counts as saturated
+
+
+class Recorder:
+    """Collects (timestamp, kind, latency, ok) samples for one run."""
+
+    def __init__(self):
+        self.samples = []
+        self.start = time.perf_counter()
+
+    def add(self, kind, latency, ok):
+        self.samples.append((time.perf_counter() - self.start, kind, latency, ok))
+
+    def window_report(self, window):
+        buckets = {}
+        for t, _, latency, ok in self.samples:
+            buckets.setdefault(int(t // window), []).append((latency, ok))
+        rows = []
+        for idx in sorted(buckets):
+            lats = sorted(l for l, _ in buckets[idx])
+            rows.append({
+                "t": idx * window,
+                "requests": len(lats),
+                "errors": sum(1 for _, ok in buckets[idx] if not ok),
+                "rps": round(len(lats) / window, 2),
+                "p50_ms": round(percentile(lats, 50) * 1000, 2),
+                "p95_ms": round(percentile(lats, 95) * 1000, 2),
+                "p99_ms": round(percentile(lats, 99) * 1000, 2),
+            })
+        return rows
+
+    def summary(self, elapsed):
+        lats = sorted(s[2] for s in self.samples)
+        by_kind = {}
+        for _, kind, latency, _ in self.samples:
+            by_kind.setdefault(kind, []).append(latency)
+        return {
+            "requests": len(lats),
+            "errors": sum(1 for s in self.samples if not s[3]),
+            "throughput_rps": round(len(lats) / elapsed, 2) if elapsed else 0,
+            "p50_ms": round(percentile(lats, 50) * 1000, 2) if lats else None,
+            "p95_ms": round(percentile(lats, 95) * 1000, 2) if lats else None,
+            "p99_ms": round(percentile(lats, 99) * 1000, 2) if lats else None,
+            "by_kind": {
+                k: {"requests": len(v), "p95_ms": round(percentile(sorted(v), 95) * 1000, 2)}
+                for k, v in sorted(by_kind.items())
+            },
+        }
+
+
+class Session:
+    """One virtual user's frontend state, mirroring `state` in static/app.js."""
+
+    def __init__(self, client, recorder, rng, think):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.think = think
+        self.notes_vocab = []
+        self.accords_vocab = []
+        self.reset()
+
+    def reset(self):
+        self.page = 1
+        self.search = ""
+        self.notes = []
+        self.seasons = []
+        self.accords = []
+        self.price = ""
+        self.longevities = []
+        self.sillages = []
+        self.sort, self.order = "rating", "desc"
+        self.total = 0
+        self.map_loaded = False
+
+    async def get(self, kind, path):
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.get(path)
+            ok = r.status_code == 200
+            body = r.json() if ok else None
+        except Exception:
+            ok, body = False, None
+        self.recorder.add(kind, time.perf_counter() - t0, ok)
+        return body
+
+    async def init(self):
+        await self.get("stats", "/api/stats")
+        await self.get("brands", "/api/brands")
+        self.notes_vocab = await self.get("notes", "/api/notes") or []
+        accords = await self.get("accords", "/api/accords") or []
+        self.accords_vocab = [a["name"] for a in accords]
+        await self.fetch_and_render()
+
+    async def fetch_and_render(self):
+        params = [("page", self.page), ("limit", 24), ("sort", self.sort), ("order", self.order)]
+        if self.search:
+            params.append(("search", self.search))
+        params += [("note", n) for n in self.notes]
+        params += [("season", s) for s in self.seasons]
+        params += [("accord", a) for a in self.accords]
+        if self.price:
+            params.append(("price", self.price))
+        params += [("longevity", l) for l in self.longevities]
+        params += [("sillage", s) for s in self.sillages]
+        data = await self.get("perfumes", "/api/perfumes?" + urlencode(params))
+        if data:
+            self.total = data["total"]
+
+    def toggle(self, values, value):
+        if value in values:
+            values.remove(value)
+        else:
+            values.append(value)
+        self.page = 1
+
+    async def act(self, action):
+        rng = self.rng
+        if action == "next_page":
+            last_page = max(1, -(-self.total // 24))
+            self.page = self.page + 1 if self.page < last_page else 1
+        elif action == "toggle_season":
+            self.toggle(self.seasons, rng.choice(SEASONS))
+        elif action == "toggle_longevity":
+            self.toggle(self.longevities, rng.choice(LONGEVITIES))
+        elif action == "toggle_sillage":
+            self.toggle(self.sillages, rng.choice(SILLAGES))
+        elif action == "toggle_price":
+            p = rng.choice(PRICES)
+            self.price = "" if self.price == p else p
+            self.page = 1
+        elif action == "add_note" and self.notes_vocab:
+            self.toggle(self.notes, rng.choice(self.notes_vocab))
+        elif action == "add_accord" and self.accords_vocab:
+            self.toggle(self.accords, rng.choice(self.accords_vocab))
+        elif action == "search":
+            self.search = "" if self.search else rng.choice(SEARCHES)
+            self.page = 1
+        elif action == "sort":
+            self.sort, self.order = rng.choice(SORTS).split("-")
+            self.page = 1
+        elif action == "clear":
+            self.reset()
+        elif action == "open_map":
+            if not self.map_loaded:
+                self.map_loaded = True
+                await self.get("map", "/api/perfumes?limit=1000&sort=rating&order=desc")
+            return
+        await self.fetch_and_render()
+
+    async def run(self, deadline, actions_per_session):
+        names = list(ACTIONS)
+        weights = list(ACTIONS.values())
+        while time.perf_counter() < deadline:
+            self.reset()
+            await self.init()
+            for _ in range(max(1, int(self.rng.expovariate(1 / actions_per_session)))):
+                if self.think:
+                    await asyncio.sleep(self.rng.expovariate(1 / self.think))
+                if time.perf_counter() >= deadline:
+                    return
+                await self.act(self.rng.choices(names, weights)[0])
+
+
+def make_client(args):
+    import httpx
+    if args.url:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        return httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits)
+    os.environ["PERFUME_DATA_FILE"] = args.data
+    from app import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest",
+                             timeout=args.timeout)
+
+
+async def run_stage(args, users, seconds):
+    recorder = Recorder()
+    deadline = time.perf_counter() + seconds
+    async with make_client(args) as client:
+        sessions = [Session(client, recorder, random.Random(args.seed * 1000 + i), args.think)
+                    for i in range(users)]
+        await asyncio.gather(*(s.run(deadline, args.actions) for s in sessions))
+    elapsed = time.perf_counter() - recorder.start
+    return recorder, elapsed
+
+
+def print_windows(rows):
+    print(f"  {'t(s)':>6} {'req':>6} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for r in rows:
+        print(f"  {r['t']:>6} {r['requests']:>6} {r['errors']:>4} {r['rps']:>8.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+
+
+def find_saturation(stages, slo_ms):
+    """First stage whose throughput gain is below SATURATION_GAIN or whose p95 breaks the SLO."""
+    for prev, cur in zip(stages, stages[1:]):
+        if cur["summary"]["p95_ms"] and cur["summary"]["p95_ms"] > slo_ms:
+            return prev["users"], f"p95 {cur['summary']['p95_ms']} ms > SLO {slo_ms} ms at {cur['users']} users"
+        gain = cur["summary"]["throughput_rps"] / max(prev["summary"]["throughput_rps"], 1e-9) - 1
+        if gain < SATURATION_GAIN:
+            return prev["users"], f"throughput +{gain:.0%} from {prev['users']} → {cur['users']} users"
+    return None, "not reached"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server")
+    parser.add_argument("--data", default="fragrantica_perfumes.json", help="catalog for in-process mode")
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds (single-stage run)")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between actions (s)")
+    parser.add_argument("--actions", type=float, default=8, help="mean actions per session after init")
+    parser.add_argument("--window", type=float, default=5, help="reporting window (s)")
+    parser.add_argument("--ramp", type=int, nargs="+", help="user counts for a saturation search")
+    parser.add_argument("--stage-seconds", type=float, default=30)
+    parser.add_argument("--slo-ms", type=float, default=500, help="p95 latency objective for --ramp")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the full report as JSON")
+    args = parser.parse_args()
+
+    target = args.url or f"in-process ({args.data})"
+    stages = []
+    for users in (args.ramp or [args.users]):
+        seconds = args.stage_seconds if args.ramp else args.duration
+        print(f"\n🚦 {users} users × {seconds:.0f}s against {target}")
+        recorder, elapsed = asyncio.run(run_stage(args, users, seconds))
+        windows = recorder.window_report(args.window)
+        summary = recorder.summary(elapsed)
+        print_windows(windows)
+        print(f"  → {summary['throughput_rps']} req/s, p50 {summary['p50_ms']} ms, "
+              f"p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, {summary['errors']} errors")
+        stages.append({"users": users, "seconds": seconds, "summary": summary, "windows": windows})
+
+    report = {"target": target, "think": args.think, "stages": stages}
+    if args.ramp:
+        knee, reason = find_saturation(stages, args.slo_ms)
+        report["saturation"] = {"users": knee, "reason": reason}
+        print("\n" + "=" * 60)
+        for s in stages:
+            print(f"  {s['users']:>4} users  {s['summary']['throughput_rps']:>8.1f} req/s  p95 {s['summary']['p95_ms']:>9.1f} ms")
+        print(f"📈 Saturation: {knee if knee else '—'} users ({reason})")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
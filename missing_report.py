@@ -4,7 +4,7 @@ Eksik/hatalı veri raporu - manuel düzeltme için.
 """
 import json, os, re
 
-JSON_FILE = "fragrantica_perfumes.json"
+JSON_FILE = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
 IMG_DIR   = "perfume_images"
 VOTE_FIELDS = ['longevity', 'sillage', 'price_value', 'main_accords', 'season']
 NOTE_FIELDS = ['top_notes', 'middle_notes', 'base_notes']
@@ -0,0 +1,132 @@
+"""
+Raw page archive for the Fragrantica scrapers.
+
+Every page the scraper fetches is stored as it was seen: the full
+page_source plus the payloads the injected scripts read from the live DOM
+(description text, note pyramid, vote cards). Pages are gzip-compressed
+JSON, named by the sha256 of their content, so an unchanged page fetched
+again costs no extra space:
+
+    page_archive/
+        objects/ab/ab12…ef.json.gz   {"url", "page_source", "payloads"}
+        index.jsonl                  {"url", "sha256", "fetched_at", "bytes", ...} per fetch, append-only
+
+Index entries may also carry the fetch tier ("http" / "browser") and the
+HTTP validators (etag, last_modified) that http_fetcher.py uses for
+conditional requests. The latest index entry per URL wins.
+reparse_archive.py re-runs extraction over the archive offline, so parser
+fixes reach the whole dataset without opening a browser.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+ARCHIVE_DIR = os.environ.get("PERFUME_ARCHIVE_DIR", "page_archive")
+COMPRESS_LEVEL = 6
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def drop_torn_tail(path):
+    """
+    Cut a JSONL file back to its last newline. A crash mid-append leaves a
+    last line without one, and the next record would be appended onto it,
+    losing both lines on replay.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - 4096)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            if pos == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(start + newline + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+class PageArchive:
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.lock = threading.Lock()
+        # A torn index tail is cut before this archive's first append, not on open:
+        # readers (reparse_archive.py) may open the archive while a scrape is writing it
+        self.tail_checked = False
+        os.makedirs(self.objects, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest + ".json.gz")
+
+    def put(self, url, page_source, payloads=None, **meta):
+        """Store one fetched page; `meta` (tier, etag, last_modified) goes into its index entry. Returns its sha256."""
+        body = json.dumps({"url": url, "page_source": page_source, "payloads": payloads or {}},
+                          ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0))
+            os.replace(tmp, path)
+        entry = {"url": url, "sha256": digest, "fetched_at": int(time.time()), "bytes": len(body)}
+        entry.update({k: v for k, v in meta.items() if v is not None})
+        with self.lock:
+            if not self.tail_checked:
+                drop_torn_tail(self.index_path)
+                self.tail_checked = True
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return digest
+
+    def get(self, digest):
+        """{"url", "page_source", "payloads"} for a stored page."""
+        with open(self.object_path(digest), "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def entries(self):
+        """{url: index entry} of the most recent fetch of every archived URL."""
+        out = {}
+        if not os.path.exists(self.index_path):
+            return out
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line after a crash
+                out[entry["url"]] = entry
+        return out
+
+    def latest(self):
+        """{url: sha256} of the most recent fetch of every archived URL."""
+        return {url: e["sha256"] for url, e in self.entries().items()}
+
+    def validators(self):
+        """{url: {sha256, etag, last_modified}} for latest fetches that recorded HTTP validators."""
+        return {url: {"sha256": e["sha256"], "etag": e.get("etag"), "last_modified": e.get("last_modified")}
+                for url, e in self.entries().items() if e.get("etag") or e.get("last_modified")}
+
+
+def get_archive(root=ARCHIVE_DIR):
+    """One shared PageArchive per directory (scraper threads share its index lock)."""
+    with _archives_lock:
+        if root not in _archives:
+            _archives[root] = PageArchive(root)
+        return _archives[root]
@@ -0,0 +1,331 @@
+"""
+Fragrantica perfume page parser — pure, no browser.
+
+parse_perfume_page() turns a page's raw HTML plus the payloads the scraper
+reads from the live DOM (selenium_scraper._collect_payloads) into a perfume
+record. It is used by the live scraper, by reparse_archive.py over the page
+archive, and by bench_parser.py over the fixtures/ corpus, which checks
+every record against its saved expected output and measures pages/second.
+
+    payloads = {
+        "description": "<innerText of [itemprop=description]>",
+        "pyramid": {"top": [...], "middle": [...], "base": [...], "all": [...], "images": {note: url}},
+        "votes": {"LONGEVITY": [label, count, label, count, ...], "SILLAGE": [...], ...},
+    }
+
+Any payload may be missing; the HTML fallbacks are used instead.
+"""
+import html as html_module
+import re
+from typing import Any, Dict, List, Optional
+
+
+def _ci(pattern, flags=0):
+    """Page-level pattern, compiled for _Html's lowercased UTF-8 bytes (keep escapes lowercase: \\s, not \\S)"""
+    return re.compile(pattern.lower().encode(), flags)
+
+
+# All patterns compiled once at import. Page-level patterns match
+# case-insensitively by running on a lowercased copy of the page (see _Html).
+IMG_ALT_RE = _ci(r'alt="perfume\s+([^"]+)"')
+H1_RE = _ci(r'<h1[^>]*>(.*?)</h1>', re.DOTALL)
+BRAND_RE = _ci(r'itemprop="name"[^>]*>\s*([^<]+?)\s*</span>')
+DESCRIPTION_RE = _ci(r'itemprop="description"[^>]*>(.*?)</(?:div|section|article)>', re.DOTALL)
+MAIN_ACCORDS_RE = _ci(r'(main accords)')
+RATING_RE = _ci(r'itemprop="ratingValue"[^>]*>([^<]+)<')
+RATING_COUNT_RE = _ci(r'itemprop="ratingCount"[^>]*>([^<]+)<')
+IMAGE_RE = _ci(r'itemprop="image"[^>]*src="([^"]+)"')
+IMAGE_FALLBACK_RE = _ci(r'src="([^"]*fimgs\.net[^"]*perfume[^"]*)"')
+
+# Text-level patterns (accords window, title, description)
+ACCORD_SPAN_RE = re.compile(r'<span[^>]*class="[^"]*truncate[^"]*"[^>]*>([^<]{2,40})</span>')
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+GENDER_SUFFIXES = [  # checked in order: "for women and men" contains "for men"
+    ('for women and men', 'Unisex', re.compile(r'\s*for women and men\s*', re.IGNORECASE)),
+    ('for women', 'Women', re.compile(r'\s*for women\s*', re.IGNORECASE)),
+    ('for men', 'Men', re.compile(r'\s*for men\s*', re.IGNORECASE)),
+]
+LAUNCHED_RE = re.compile(r'launched in (\d{4})', re.IGNORECASE)
+RELEASED_RE = re.compile(r'released in (\d{4})', re.IGNORECASE)
+TOP_NOTES_RE = re.compile(r'Top notes?\s+(?:are|is)\s+([^;.]+?)(?:;|\.)', re.IGNORECASE)
+MIDDLE_NOTES_RE = re.compile(r'middle notes?\s+(?:are|is)\s+([^;.]+?)(?:;|\.)', re.IGNORECASE)
+BASE_NOTES_RE = re.compile(r'base notes?\s+(?:are|is)\s+([^;.]+?)(?:\.|$)', re.IGNORECASE)
+NOTE_SPLIT_RE = re.compile(r',\s*(?:and\s+)?|\s+and\s+')
+
+PERFUME_LINK_RE = re.compile(r'href="([^"#?]*/perfume/[^"#?]*\.html)(?:[#?][^"]*)?"')
+SITE_URL = 'https://www.fragrantica.com'
+
+ACCORDS_WINDOW = 4000      # chars after the "main accords" heading searched for accord spans
+MAX_ACCORDS = 12
+MIN_DESCRIPTION = 30
+YEAR_RANGE = (1900, 2030)
+VOTE_FIELDS = [('LONGEVITY', 'longevity'), ('SILLAGE', 'sillage'), ('PRICE VALUE', 'price_value')]
+VOTE_SKIP_LINES = {'NO VOTE', 'SHOW VOTES', 'HIDE LABELS', 'SHOW ALL'}
+SEASONS = {'winter', 'spring', 'summer', 'fall', 'day', 'night'}
+BLOCK_MARKERS = ('429 Too Many Requests', "you've opened more pages")
+MIN_PAGE_SIZE = 5000
+
+
+def block_reason(page_source: str) -> Optional[str]:
+    """'blocked' for a 429 / 'too many pages' page, 'short' for a page that did not load, else None"""
+    if any(m in page_source for m in BLOCK_MARKERS):
+        return 'blocked'
+    if len(page_source) < MIN_PAGE_SIZE:
+        return 'short'
+    return None
+
+
+def is_block_page(page_source: str) -> bool:
+    """Cloudflare / 429 / 'too many pages' block page or a page that did not load"""
+    return block_reason(page_source) is not None
+
+
+def _parse_vote_count(s):
+    """'1.2k' -> 1200, '3,456' -> 3456; None if not a count"""
+    s = str(s).strip().lower().replace(',', '').replace(' ', '')
+    if s.endswith('k') and len(s) > 1:
+        try:
+            return int(float(s[:-1]) * 1000)
+        except (ValueError, TypeError):
+            return None
+    if s.endswith('m') and len(s) > 1:
+        try:
+            return int(float(s[:-1]) * 1000000)
+        except (ValueError, TypeError):
+            return None
+    try:
+        return int(float(s))
+    except (ValueError, TypeError):
+        return None
+
+
+def _vote_pairs(lines):
+    """Vote card lines (label, count, label, count...) -> {label: count}"""
+    result = {}
+    prev_label = None
+    for line in lines or []:
+        if line.upper() in VOTE_SKIP_LINES:
+            continue
+        val = _parse_vote_count(line)
+        if val and val > 0 and prev_label:
+            result[prev_label.lower().replace(' ', '_')] = val
+            prev_label = None
+        elif not (line[0].isdigit() or line[0] in '.'):
+            prev_label = line
+    return result or None
+
+
+def _split_notes(notes_text):
+    return [n.strip() for n in NOTE_SPLIT_RE.split(notes_text) if n.strip() and len(n.strip()) > 1]
+
+
+class _Html:
+    """
+    Case-insensitive search over a page without re.IGNORECASE scans.
+
+    The page is encoded to UTF-8 once and lowercased as bytes, which folds
+    ASCII only and keeps every offset; on non-ASCII text that is several
+    times cheaper than str.lower(), and patterns with a literal prefix then
+    run as plain substring searches. Every pattern is ASCII, so matches
+    start and end on character boundaries and groups are cut from the
+    original bytes and decoded.
+    """
+
+    def __init__(self, source):
+        self.data = source.encode('utf-8', 'surrogatepass')
+        self.lowered = self.data.lower()
+
+    def find(self, pattern):
+        """(group 1 text, its byte offset) of the first match, or (None, -1)"""
+        m = pattern.search(self.lowered)
+        if not m:
+            return None, -1
+        return self.data[m.start(1):m.end(1)].decode('utf-8', 'surrogatepass'), m.start(1)
+
+    def group(self, pattern):
+        return self.find(pattern)[0]
+
+    def window(self, start, chars):
+        """`chars` characters of the page from byte offset `start`"""
+        return self.data[start:start + 4 * chars].decode('utf-8', 'ignore')[:chars]
+
+
+def _title(page):
+    alt = page.group(IMG_ALT_RE)
+    if alt:
+        return html_module.unescape(alt.strip())
+    # Fallback: h1 tag (strip inner HTML tags)
+    h1 = page.group(H1_RE)
+    if h1 is not None:
+        return SPACE_RE.sub(' ', TAG_RE.sub(' ', h1).strip())
+    return None
+
+
+def parse_perfume_page(url: str, page_source: str, payloads: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Sayfa HTML'i + canlı DOM payload'larından parfüm kaydı üret (browser gerektirmez)
+
+    Args:
+        url: Parfüm sayfası URL'i
+        page_source: Ham HTML
+        payloads: 'description', 'pyramid', 'votes' - eksik olanlar için HTML fallback'leri kullanılır
+    """
+    payloads = payloads or {}
+    page = _Html(page_source)
+    perfume_data = {
+        'url': url,
+        'name': None,
+        'brand': None,
+        'release_year': None,
+        'gender': None,
+        'top_notes': [],
+        'middle_notes': [],
+        'base_notes': [],
+        'rating': None,
+        'votes': None,
+        'description': None,
+        'image_url': None,
+        'main_accords': [],
+        'note_images': {},
+        'longevity': None,
+        'sillage': None,
+        'price_value': None,
+        'season': None,
+    }
+
+    # Name + Gender from img alt="perfume Aventus Creed for men" (most reliable), else h1
+    full_title = _title(page)
+    if full_title:
+        clean_name = full_title
+        lowered = full_title.lower()
+        for phrase, gender, pattern in GENDER_SUFFIXES:
+            if phrase in lowered:
+                perfume_data['gender'] = gender
+                clean_name = pattern.sub('', full_title)
+                break
+        perfume_data['name'] = html_module.unescape(clean_name.strip())
+
+    # Brand from <span itemprop="name">
+    brand = page.group(BRAND_RE)
+    if brand:
+        perfume_data['brand'] = html_module.unescape(brand.strip())
+
+    # Description: live DOM innerText (full text), else the itemprop="description" block
+    desc_text = payloads.get('description') or ''
+    if not desc_text:
+        block = page.group(DESCRIPTION_RE)
+        if block is not None:
+            desc_text = html_module.unescape(TAG_RE.sub(' ', block)).strip()
+            desc_text = SPACE_RE.sub(' ', desc_text).strip()
+    if desc_text and len(desc_text) > MIN_DESCRIPTION:
+        perfume_data['description'] = html_module.unescape(desc_text)
+
+        # Release year from description
+        m = LAUNCHED_RE.search(desc_text) or RELEASED_RE.search(desc_text)
+        if m:
+            year = int(m.group(1))
+            if YEAR_RANGE[0] <= year <= YEAR_RANGE[1]:
+                perfume_data['release_year'] = year
+
+        # Notes from description text
+        for pattern, field in ((TOP_NOTES_RE, 'top_notes'), (MIDDLE_NOTES_RE, 'middle_notes'),
+                               (BASE_NOTES_RE, 'base_notes')):
+            m = pattern.search(desc_text)
+            if m:
+                perfume_data[field] = _split_notes(m.group(1))
+
+    # Fallback notes + note_images: pyramid payload
+    js_notes = payloads.get('pyramid')
+    if js_notes:
+        if not perfume_data['top_notes'] and not perfume_data['middle_notes'] and not perfume_data['base_notes']:
+            if js_notes.get('top') or js_notes.get('middle') or js_notes.get('base'):
+                perfume_data['top_notes'] = list(dict.fromkeys(js_notes.get('top') or []))
+                perfume_data['middle_notes'] = list(dict.fromkeys(js_notes.get('middle') or []))
+                perfume_data['base_notes'] = list(dict.fromkeys(js_notes.get('base') or []))
+            elif js_notes.get('all'):
+                perfume_data['top_notes'] = list(dict.fromkeys(js_notes['all']))
+        if js_notes.get('images'):
+            perfume_data['note_images'] = js_notes['images']
+
+    # Main accords: truncate spans right after the 'main accords' heading
+    _, idx = page.find(MAIN_ACCORDS_RE)
+    if idx > 0:
+        accords = ACCORD_SPAN_RE.findall(page.window(idx, ACCORDS_WINDOW))
+        if accords:
+            perfume_data['main_accords'] = list(dict.fromkeys(a.strip() for a in accords if a.strip()))[:MAX_ACCORDS]
+
+    # Vote cards
+    sections = payloads.get('votes') or {}
+    for section, field in VOTE_FIELDS:
+        parsed = _vote_pairs(sections.get(section))
+        if parsed:
+            perfume_data[field] = parsed
+
+    # Season / When to Wear
+    season_raw = _vote_pairs(sections.get('WHEN TO WEAR')) or _vote_pairs(sections.get('SEASON'))
+    if season_raw:
+        filtered = {k: v for k, v in season_raw.items() if k in SEASONS}
+        if filtered:
+            perfume_data['season'] = filtered
+
+    # Rating / votes
+    rating = page.group(RATING_RE)
+    if rating:
+        try:
+            perfume_data['rating'] = float(rating.strip())
+        except ValueError:
+            pass
+    votes = page.group(RATING_COUNT_RE)
+    if votes:
+        try:
+            perfume_data['votes'] = int(votes.strip().replace(',', '').replace('.', ''))
+        except ValueError:
+            pass
+
+    # Image
+    image_url = page.group(IMAGE_RE) or page.group(IMAGE_FALLBACK_RE)
+    if image_url:
+        perfume_data['image_url'] = image_url
+
+    # Clean brand name from perfume name
+    # ("Dior Homme Parfum" starts with the brand but that is part of the product line - left as is)
+    brand = perfume_data.get('brand')
+    name = perfume_data.get('name')
+    if brand and name and name.endswith(' ' + brand):
+        perfume_data['name'] = name[:-(len(brand) + 1)].strip()
+
+    return perfume_data
+
+
+def missing_fields(perfume_data: Dict[str, Any]) -> List[str]:
+    """Completeness check - eksik ana alanlar"""
+    missing = []
+    if not perfume_data.get('name'):
+        missing.append('name')
+    if not perfume_data.get('brand'):
+        missing.append('brand')
+    if not perfume_data.get('top_notes') and not perfume_data.get('middle_notes') and not perfume_data.get('base_notes'):
+        missing.append('notes')
+    if not perfume_data.get('description'):
+        missing.append('description')
+    if not perfume_data.get('rating'):
+        missing.append('rating')
+    return missing
+
+
+def parse_brand_perfume_urls(page_source: str, limit: int) -> List[str]:
+    """Perfume page URLs on a designer page, in page order, one per perfume"""
+    perfume_urls = []
+    seen_names = set()
+    for href in PERFUME_LINK_RE.findall(page_source):
+        href = html_module.unescape(href)
+        if href.startswith('/'):
+            href = SITE_URL + href
+        perfume_name = href.split('/')[-1]
+        if perfume_name not in seen_names:
+            seen_names.add(perfume_name)
+            perfume_urls.append(href)
+            if len(perfume_urls) >= limit:
+                break
+    return perfume_urls
@@ -0,0 +1,80 @@
+"""
+Presorted orderings for /api/perfumes.
+
+For each sort key and direction, the sorted permutation of perfume ids is
+computed once per catalog version (with Python's stable sort, so ties come
+out exactly as sorting the list would). A request then orders its
+candidate ids by filtering that permutation, or for small candidate sets by
+sorting them on their precomputed rank, and only the requested page is
+turned back into records.
+
+sort=score is a Bayesian average rating,
+    score = (votes · rating + m · C) / (votes + m)
+with C the catalog's mean rating and m the 25th percentile of vote counts,
+so a 4.6 with 40 votes no longer outranks a 4.3 with 98k votes.
+"""
+import numpy as np
+
+PRIOR_VOTES_PERCENTILE = 25
+SMALL_FRACTION = 64   # candidate sets under n/64 are argsorted by rank instead of masking the permutation
+
+
+class BayesianRating:
+    def __init__(self, perfumes):
+        rated = [(p["rating"], p.get("votes") or 0) for p in perfumes if p.get("rating")]
+        ratings = np.array([r for r, _ in rated], np.float64)
+        votes = np.array([v for _, v in rated], np.float64)
+        self.mean = float(ratings.mean()) if len(rated) else 0.0
+        self.prior_votes = float(np.percentile(votes, PRIOR_VOTES_PERCENTILE)) if len(rated) else 0.0
+        self.scores = np.array([self.score(p) for p in perfumes], np.float64)
+
+    def score(self, p):
+        rating, votes = p.get("rating"), p.get("votes") or 0
+        if not rating:
+            return 0.0
+        if votes + self.prior_votes <= 0:
+            return float(rating)   # no votes and no prior (most rated perfumes have 0 votes): nothing to shrink toward
+        return (votes * rating + self.prior_votes * self.mean) / (votes + self.prior_votes)
+
+
+SORT_KEYS = {
+    "rating": lambda p: p.get("rating") or 0,
+    "votes": lambda p: p.get("votes") or 0,
+    "name": lambda p: p.get("name") or "",
+    "brand": lambda p: p.get("brand") or "",
+    "year": lambda p: p.get("release_year") or 0,
+}
+
+
+def get_bayesian(catalog):
+    return catalog.derived("bayesian", lambda c: BayesianRating(c.perfumes))
+
+
+def _build_order(catalog, sort, reverse):
+    if sort == "score":
+        scores = get_bayesian(catalog).scores
+        key = scores.__getitem__
+    else:
+        key = lambda i, k=SORT_KEYS[sort], perfumes=catalog.perfumes: k(perfumes[i])
+    perm = np.array(sorted(range(len(catalog)), key=key, reverse=reverse), np.int32)
+    rank = np.empty(len(perm), np.int32)
+    rank[perm] = np.arange(len(perm), dtype=np.int32)
+    return perm, rank
+
+
+def get_order(catalog, sort, reverse):
+    """(permutation, rank) of all ids for this sort key and direction."""
+    return catalog.derived(f"order-{sort}-{'desc' if reverse else 'asc'}",
+                           lambda c: _build_order(c, sort, reverse))
+
+
+def ordered_ids(catalog, ids, sort, reverse):
+    """Candidate ids (sorted array, or None for all) in sort order."""
+    perm, rank = get_order(catalog, sort, reverse)
+    if ids is None:
+        return perm
+    if len(ids) < len(perm) // SMALL_FRACTION:
+        return ids[np.argsort(rank[ids], kind="stable")]
+    mask = np.zeros(len(perm), bool)
+    mask[ids] = True
+    return perm[mask[perm]]
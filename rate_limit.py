@@ -0,0 +1,196 @@
+"""
+Host-wide request pacing for the Fragrantica scrapers.
+
+One TokenBucket is shared by every browser worker, so the total request
+rate against the site stays the same whether one driver or eight are
+running; the workers only overlap page rendering and extraction.
+
+    limiter = TokenBucket(rate=0.1, burst=1)   # one page every 10 s, pool-wide
+    limiter.acquire()                          # blocks until a token is free
+
+AdaptiveRateLimiter is a TokenBucket whose rate is tuned from what the
+workers observe (AIMD, as in TCP congestion control). Each page reports its
+outcome with record(). The rate creeps up additively on every healthy page
+and is cut multiplicatively on trouble:
+
+    blocked   429 / "you've opened more pages"   rate × 0.5, then a pause that
+                                                 doubles per repeated block
+    short     page below MIN_PAGE_SIZE           rate × 0.7, shorter pause
+    slow      latency EWMA > 2.5 × its baseline  rate × 0.85
+    error     network / driver failure           no change
+
+After a cut, further cuts are held off for one request interval, so pages
+already in flight when the site pushed back don't cut the rate again. Rate
+changes and pauses are printed, counted in metrics(), and appended as JSON
+lines to log_path if one is given.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+DEFAULT_RATE = 0.1    # pages per second across all workers
+DEFAULT_BURST = 1
+JITTER = 0.3          # ± fraction added to each wait so requests don't tick like a metronome
+
+# AIMD controller
+MIN_RATE = 0.02       # never slower than one page every 50 s
+MAX_RATE = 0.4
+INCREASE = 0.004      # pages/s added per healthy page
+DECREASE = {'blocked': 0.5, 'short': 0.7, 'slow': 0.85}
+PAUSE = {'blocked': 30.0, 'short': 10.0}   # s, doubled per consecutive cut, capped at MAX_PAUSE
+MAX_PAUSE = 300.0
+SLOW_FACTOR = 2.5     # latency EWMA over this × baseline counts as slow
+EWMA_ALPHA = 0.2
+MIN_SAMPLES = 5       # latency samples before "slow" can trigger
+LOG_EVERY = 25        # healthy pages between state lines
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, jitter=JITTER):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.jitter = jitter
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def record(self, outcome, latency=None, kind='page', retry_after=None):
+        """Outcome of a request; a fixed-rate bucket ignores it (see AdaptiveRateLimiter)."""
+
+    def acquire(self):
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            wait *= 1 + random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(wait, 0.01))
+            waited += wait
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """TokenBucket whose rate follows the site's health (AIMD), shared by all workers."""
+
+    def __init__(self, rate=DEFAULT_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE, burst=DEFAULT_BURST,
+                 jitter=JITTER, log_path=None):
+        super().__init__(rate=min(max(rate, min_rate), max_rate), burst=burst, jitter=jitter)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.log_path = log_path
+        self.paused_until = 0.0
+        self.hold_until = 0.0
+        self.consecutive_cuts = 0
+        self.latency = {}     # kind -> [ewma, baseline, samples]
+        self.counts = Counter()
+        self.paused_total = 0.0
+        self.rate_low = self.rate_high = self.rate
+
+    def acquire(self):
+        """Wait out any pause, then take a token. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                pause = self.paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            time.sleep(pause)
+            waited += pause
+        return waited + super().acquire()
+
+    def _latency_state(self, kind, latency):
+        """Update the latency EWMA of `kind`; True when it is well above its baseline."""
+        state = self.latency.setdefault(kind, [latency, latency, 0])
+        state[0] += EWMA_ALPHA * (latency - state[0])
+        state[1] = min(state[1] * 1.01, state[0])   # baseline drops at once, rises slowly
+        state[2] += 1
+        return state[2] >= MIN_SAMPLES and state[0] > SLOW_FACTOR * state[1]
+
+    def _set_rate(self, now, rate):
+        self._refill(now)   # time so far accrues at the old rate
+        self.rate = min(max(rate, self.min_rate), self.max_rate)
+        self.rate_low = min(self.rate_low, self.rate)
+        self.rate_high = max(self.rate_high, self.rate)
+
+    def record(self, outcome, latency=None, kind='page', retry_after=None):
+        """
+        Report one request: outcome is 'ok', 'blocked', 'short' or 'error';
+        latency (s) of an 'ok' request feeds the slow-site signal of its kind
+        ('browser', 'http', ...); retry_after (s) overrides the pause of a block.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.counts[outcome] += 1
+            if outcome == 'ok' and latency is not None and self._latency_state(kind, latency):
+                outcome = 'slow'
+                self.counts['slow'] += 1
+
+            event = None
+            if outcome == 'ok':
+                self.consecutive_cuts = 0
+                self._set_rate(now, self.rate + INCREASE)
+                if self.counts['ok'] % LOG_EVERY == 0:
+                    event = {'event': 'state'}
+            elif outcome in DECREASE and now >= self.hold_until:
+                old = self.rate
+                self._set_rate(now, self.rate * DECREASE[outcome])
+                pause = 0.0
+                if outcome in PAUSE:
+                    self.consecutive_cuts += 1
+                    pause = retry_after if retry_after is not None else \
+                        min(PAUSE[outcome] * 2 ** (self.consecutive_cuts - 1), MAX_PAUSE)
+                    self.paused_until = max(self.paused_until, now + pause)
+                    self.paused_total += pause
+                    self.tokens = 0.0
+                self.hold_until = max(self.paused_until, now) + 1 / self.rate
+                event = {'event': outcome, 'from': round(old, 4), 'pause': round(pause, 1)}
+            if event is None:
+                return
+            event.update({'t': round(time.time(), 1), 'rate': round(self.rate, 4),
+                          'latency': {k: round(v[0], 2) for k, v in self.latency.items()},
+                          'counts': dict(self.counts)})
+
+        self._log(event)
+
+    def _log(self, event):
+        if event['event'] == 'state':
+            print(f"📈 Rate {event['rate']:.3f} pages/s after {event['counts'].get('ok', 0)} ok pages "
+                  f"(latency {self._latency_text(event)})")
+        else:
+            pause = f", pausing {event['pause']:.0f}s" if event['pause'] else ""
+            print(f"🐢 Rate {event['from']:.3f} → {event['rate']:.3f} pages/s ({event['event']}{pause})")
+        if self.log_path:
+            with self.lock, open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event) + "\n")
+
+    @staticmethod
+    def _latency_text(event):
+        return ", ".join(f"{k} {v:.1f}s" for k, v in event['latency'].items()) or "n/a"
+
+    def metrics(self):
+        """Controller state: current / lowest / highest rate, outcome counts, pause time, latency EWMAs."""
+        with self.lock:
+            return {'rate': round(self.rate, 4), 'rate_low': round(self.rate_low, 4),
+                    'rate_high': round(self.rate_high, 4), 'counts': dict(self.counts),
+                    'paused_s': round(self.paused_total, 1),
+                    'latency': {k: round(v[0], 2) for k, v in self.latency.items()}}
+
+    def summary(self):
+        m = self.metrics()
+        counts = ", ".join(f"{k} {v}" for k, v in sorted(m['counts'].items())) or "no requests"
+        return (f"🚦 Rate {m['rate']:.3f} pages/s (range {m['rate_low']:.3f}–{m['rate_high']:.3f}), "
+                f"{counts}, paused {m['paused_s']:.0f}s")
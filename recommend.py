@@ -0,0 +1,146 @@
+"""
+Weighted "build from notes I like" recommendations.
+
+A query is a set of weighted preferences, e.g.
+    note=bergamot:2  note=vetiver  note=oud:-1  season=summer  longevity=long_lasting
+Each term resolves to one or more columns of the feature matrix (features.py)
+and every perfume is scored in one pass as a sparse column slice times the
+weight vector, so cost grows with the number of perfumes carrying the
+requested notes rather than with catalog size × terms.
+
+Term scales:
+  note / accord               TF-IDF weight within the perfume (0..1, L2-normalized
+                              per perfume, so a perfume built around the note scores higher)
+  season / longevity / sillage
+                              vote share above or below the catalog average (-1..1)
+"""
+import math
+
+import numpy as np
+from scipy import sparse
+
+from features import BLOCK_WEIGHTS, VOTE_GROUPS, get_features, norm_name
+
+DEFAULT_WEIGHT = 1.0
+
+
+class QueryError(ValueError):
+    pass
+
+
+def parse_term(term):
+    """'bergamot:2' → ('bergamot', 2.0); 'bergamot' → ('bergamot', 1.0)"""
+    name, sep, weight = term.rpartition(":")
+    if not sep:
+        return norm_name(term), DEFAULT_WEIGHT
+    try:
+        value = float(weight)
+    except ValueError:
+        raise QueryError(f"Invalid weight in {term!r}")
+    if not math.isfinite(value):
+        raise QueryError(f"Weight must be a finite number in {term!r}")
+    return norm_name(name), value
+
+
+def _match(vocab, name):
+    """Every vocabulary entry containing `name`, so bergamot also matches calabrian bergamot (like the note filter)."""
+    return [j for key, j in vocab.items() if name in key]
+
+
+class Recommender:
+    """Column-major view of one catalog's feature matrix for fast column slicing."""
+
+    def __init__(self, features):
+        self.features = features
+        # Undo the block weights baked into the matrix so note/accord values read as 0..1 TF-IDF
+        scale = np.ones(len(features.columns), np.float32)
+        for kind in ("note", "accord"):
+            start, stop = features.blocks[kind]
+            scale[start:stop] = 1 / np.sqrt(BLOCK_WEIGHTS[kind])
+        self.csc = (features.matrix @ sparse.diags(scale)).tocsc()
+        note_start, _ = features.blocks["note"]
+        accord_start, _ = features.blocks["accord"]
+        self.vocab = {
+            "note": {x: note_start + j for j, x in enumerate(features.notes)},
+            "accord": {a: accord_start + j for j, a in enumerate(features.accords)},
+        }
+        self.vote_col = {c: j for j, c in enumerate(features.vote_columns)}
+
+    def resolve(self, notes=(), accords=(), votes=None):
+        """Turn raw query terms into {column: weight}, plus the terms that matched nothing."""
+        weights, unmatched = {}, []
+        for kind, terms in (("note", notes), ("accord", accords)):
+            for term in terms:
+                name, w = parse_term(term)
+                cols = _match(self.vocab[kind], name) if name else []
+                if not cols:
+                    unmatched.append(f"{kind}:{name}")
+                for j in cols:
+                    weights[("matrix", j)] = weights.get(("matrix", j), 0) + w
+        for group, terms in (votes or {}).items():
+            for term in terms:
+                key, w = parse_term(term)
+                key = key.replace(" ", "_")
+                if key not in VOTE_GROUPS[group]:
+                    raise QueryError(f"Unknown {group} value {key!r}; expected one of {VOTE_GROUPS[group]}")
+                col = self.vote_col[f"{group}:{key}"]
+                weights[("vote", col)] = weights.get(("vote", col), 0) + w
+        return weights, unmatched
+
+    def column_label(self, source, j):
+        return self.features.columns[j] if source == "matrix" else self.features.vote_columns[j]
+
+    def score(self, weights, exclude_notes=(), exclude_accords=()):
+        """(scores, per-column value matrices) for every perfume; excluded perfumes get -inf."""
+        n = self.features.n
+        scores = np.zeros(n, np.float32)
+        parts = {}
+        matrix_cols = [j for (src, j) in weights if src == "matrix"]
+        if matrix_cols:
+            sub = self.csc[:, matrix_cols]
+            w = np.array([weights[("matrix", j)] for j in matrix_cols], np.float32)
+            scores += sub @ w
+            parts["matrix"] = (matrix_cols, sub, w)
+        vote_cols = [j for (src, j) in weights if src == "vote"]
+        if vote_cols:
+            sub = self.features.vote_profiles[:, vote_cols]
+            w = np.array([weights[("vote", j)] for j in vote_cols], np.float32)
+            scores += sub @ w
+            parts["vote"] = (vote_cols, sub, w)
+
+        for kind, terms in (("note", exclude_notes), ("accord", exclude_accords)):
+            cols = [j for t in terms for j in _match(self.vocab[kind], norm_name(t))]
+            if cols:
+                hit = np.diff(self.csc[:, cols].tocsr().indptr) > 0
+                scores[hit] = -np.inf
+        return scores, parts
+
+    def recommend(self, weights, limit=24, exclude_notes=(), exclude_accords=()):
+        """Top `limit` perfume indices with positive scores, and their per-column contributions."""
+        scores, parts = self.score(weights, exclude_notes, exclude_accords)
+        candidates = int(np.count_nonzero(scores > 0))
+        k = min(limit, candidates)
+        if k == 0:
+            return [], candidates
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        contribs = {}
+        for src, (cols, sub, w) in parts.items():
+            rows = sub[top]
+            rows = rows.toarray() if sparse.issparse(rows) else rows
+            contribs[src] = (cols, rows * w)
+        for r, i in enumerate(top):
+            c = {}
+            for src, (cols, values) in contribs.items():
+                for j, v in zip(cols, values[r]):
+                    if v:
+                        label = self.column_label(src, j)
+                        c[label] = round(c.get(label, 0) + float(v), 4)
+            results.append((int(i), float(scores[i]), c))
+        return results, candidates
+
+
+def get_recommender(catalog):
+    return catalog.derived("recommender", lambda c: Recommender(get_features(c)))
@@ -0,0 +1,120 @@
+"""
+Re-run extraction over the raw page archive — offline, on every core.
+
+The latest archived fetch of every URL (page_archive.py) is parsed again
+with the current parser, and the results are merged into the dataset for
+perfumes with the same url. No browser, no network: after a parser fix this
+replaces re-scraping with fix_descriptions.py / retry_missing_votes.py /
+update_vote_data.py for every page that has been archived.
+
+A field is only replaced by a non-empty parsed value, so a page that lacks
+a section never erases data. category, image paths and other fields the
+parser does not produce are left alone.
+
+The dataset read is --input (default: PERFUME_DATA_FILE, else
+fragrantica_perfumes.json), and results are written back to that same file
+(atomically) unless --output names another one, so reparsing a synthetic or
+alternate catalog never touches the real dataset.
+
+Usage:
+    python reparse_archive.py                               # refresh every parsed field
+    python reparse_archive.py --input other.json --output other.reparsed.json
+    python reparse_archive.py --fields description release_year
+    python reparse_archive.py --only-missing                # fill empty fields only
+    python reparse_archive.py --dry-run --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from page_archive import ARCHIVE_DIR, get_archive
+from perfume_parser import parse_perfume_page
+
+JSON_FILE = os.environ.get("PERFUME_DATA_FILE", "fragrantica_perfumes.json")
+PARSED_FIELDS = [
+    "name", "brand", "release_year", "gender", "top_notes", "middle_notes", "base_notes",
+    "rating", "votes", "description", "image_url", "main_accords", "note_images",
+    "longevity", "sillage", "price_value", "season",
+]
+
+
+def _parse_one(job):
+    root, url, digest = job
+    page = get_archive(root).get(digest)
+    return url, parse_perfume_page(url, page["page_source"], page.get("payloads"))
+
+
+def reparse(root, urls=None, workers=None):
+    """{url: parsed record} for the latest archived page of each URL (all, or only `urls`)."""
+    latest = get_archive(root).latest()
+    jobs = [(root, url, digest) for url, digest in latest.items() if urls is None or url in urls]
+    if not jobs:
+        return {}
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(_parse_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def merge(perfumes, parsed, fields, only_missing=False):
+    """Apply parsed values in place; returns Counter of updated fields."""
+    changed = Counter()
+    for p in perfumes:
+        fresh = parsed.get(p.get("url"))
+        if not fresh:
+            continue
+        for field in fields:
+            new, old = fresh.get(field), p.get(field)
+            if not new or new == old or (only_missing and old):
+                continue
+            p[field] = new
+            changed[field] += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=JSON_FILE, help=f"dataset to update (default: {JSON_FILE})")
+    parser.add_argument("--output", help="where to write the result (default: back to --input, never elsewhere)")
+    parser.add_argument("--archive", default=ARCHIVE_DIR)
+    parser.add_argument("--fields", nargs="+", choices=PARSED_FIELDS, default=PARSED_FIELDS)
+    parser.add_argument("--only-missing", action="store_true", help="only fill fields that are empty")
+    parser.add_argument("--workers", type=int, help="parser processes (default: all cores)")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.input, encoding="utf-8") as f:
+        perfumes = json.load(f)
+    urls = {p.get("url") for p in perfumes if p.get("url")}
+
+    print(f"📦 {len(perfumes)} perfumes, archive: {args.archive}")
+    t0 = time.perf_counter()
+    parsed = reparse(args.archive, urls, args.workers)
+    elapsed = time.perf_counter() - t0
+    print(f"⚙️  Parsed {len(parsed)} archived pages in {elapsed:.1f}s "
+          f"({len(parsed) / max(elapsed, 1e-9):.0f} pages/s)")
+    print(f"⚠️ Not in archive: {len(urls) - len(parsed)}")
+
+    changed = merge(perfumes, parsed, args.fields, args.only_missing)
+    if not changed:
+        print("✅ Nothing to update")
+        return
+    print("\n🔄 Updated fields:")
+    for field, count in changed.most_common():
+        print(f"  • {field}: {count}")
+
+    if args.dry_run:
+        print("\n(dry run, nothing written)")
+        return
+    out = args.output or args.input
+    tmp = f"{out}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(perfumes, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, out)
+    print(f"\n💾 Saved {len(perfumes)} perfumes to '{out}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,61 +1,105 @@
 """
 Scrape top 15 most popular perfumes from Designer and Niche brands
 Output: fragrantica_perfumes.json + perfume_images/ folder
+
+Brand listing pages are read first with one browser; the perfume pages are
+then scraped by a pool of --workers browsers sharing one URL queue and one
+rate limiter across the whole pool. The limiter starts at --rate pages/second
+and adapts (rate_limit.AdaptiveRateLimiter): it speeds up while pages come
+back healthy, and slows down and pauses on 429s, block pages, short pages and
+rising latency, between --min-rate and --max-rate. --fixed-rate keeps --rate
+constant.
+
+Runs are resumable. Every brand listing and every perfume result (or
+failure) is appended to a checkpoint journal (scrape_journal.py,
+--journal) as soon as it completes. After a crash or Ctrl-C, the same
+command skips finished work and retries only failed pages, up to
+--max-attempts failures per page. The final JSON is streamed from the
+journal in brand and popularity order; --fresh sets the old journal aside
+and starts over.
+
+Brand listings are fetched over plain HTTP (http_fetcher.py): one pooled
+session. Perfume pages already in the page archive are refreshed with a
+conditional GET, and a 304 is served from the archived rendered copy. New
+or changed perfume pages open in a browser, since their vote cards are only
+rendered client-side. --no-http sends every page to the browsers.
+
+Browsers run a lean profile: images, media, fonts and ad/tracker hosts are
+blocked (--block picks the groups, a bare --block blocks nothing), and each
+Chrome is recycled after RECYCLE_PAGES pages or RECYCLE_RSS_MB of memory.
+
+Usage:
+    python scrape_all_brands.py                       # 3 browsers, starting at one page every 10 s
+    python scrape_all_brands.py                       # again after a crash: resumes from the journal
+    python scrape_all_brands.py --fresh               # new run, old journal kept aside
+    python scrape_all_brands.py --workers 4 --rate 0.15 --max-rate 0.25
+    python scrape_all_brands.py --fixed-rate --rate 0.1
+    python scrape_all_brands.py --rate-log bench_results/rate.jsonl
+    python scrape_all_brands.py --no-http
+    python scrape_all_brands.py --block images fonts  # keep media and third-party requests
 """
 
-from selenium_scraper import SeleniumPerfumeScraper
-import json
+from selenium_scraper import BLOCK_PATTERNS, DEFAULT_BLOCK, SeleniumPerfumeScraper, scrape_parallel
+from rate_limit import AdaptiveRateLimiter, TokenBucket, DEFAULT_RATE, MAX_RATE, MIN_RATE
+from http_fetcher import HttpFetcher
+from downloader import Downloader, sanitize_filename, summarize
+from page_archive import get_archive
+from scrape_journal import JOURNAL_FILE, MAX_ATTEMPTS, ScrapeJournal, write_json_array
+import argparse
+import heapq
 import os
-import re
 import time
 from tqdm import tqdm
 
+DEFAULT_WORKERS = 3
+IMAGE_DIR = "perfume_images"
 
-def sanitize_filename(name: str) -> str:
-    """Convert perfume name to a safe filename"""
-    name = re.sub(r'[<>:"/\\|?*&]', '', name)
-    name = re.sub(r'\s+', '_', name.strip())
-    return name[:80]
 
+def image_path(perfume, image_dir=IMAGE_DIR):
+    """Local .png path of a perfume image: <brand>_<name>.png"""
+    return os.path.join(image_dir, sanitize_filename(f"{perfume.get('brand')}_{perfume['name']}") + ".png")
 
-def download_all_images(scraper, perfumes, image_dir="perfume_images"):
-    """Download all perfume images to a folder as .png"""
-    os.makedirs(image_dir, exist_ok=True)
-    
-    downloaded = 0
-    skipped = 0
-    
-    print(f"\n🖼️  Downloading {len(perfumes)} perfume images...")
+
+def download_all_images(perfumes, image_dir=IMAGE_DIR):
+    """Download all perfume images to a folder as .png (concurrently, see downloader.py); {path: status}"""
+    jobs = [(p['image_url'], image_path(p, image_dir)) for p in perfumes if p.get('image_url') and p.get('name')]
     
-    for p in tqdm(perfumes, desc="Downloading images", unit="img"):
-        image_url = p.get('image_url')
-        name = p.get('name')
-        brand = p.get('brand')
-        
-        if not image_url or not name:
-            skipped += 1
-            continue
-        
-        filename = sanitize_filename(f"{brand}_{name}") + ".png"
-        filepath = os.path.join(image_dir, filename)
-        
-        # Skip if already downloaded
-        if os.path.exists(filepath):
-            p['image_local'] = filepath
-            downloaded += 1
-            continue
-        
-        if scraper.download_image(image_url, filepath):
-            p['image_local'] = filepath
-            downloaded += 1
-        else:
-            skipped += 1
+    print(f"\n🖼️  Downloading {len(jobs)} perfume images...")
+    pbar = tqdm(total=len(jobs), desc="Downloading images", unit="img")
+    downloader = Downloader()
+    try:
+        results = downloader.download_many(jobs, on_done=lambda url, path, status: pbar.update(1))
+    finally:
+        downloader.close()
+        pbar.close()
     
-    print(f"✅ Downloaded: {downloaded} | ⚠️ Skipped: {skipped}")
-    return downloaded
+    print(summarize(results))
+    return results
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="parallel browsers")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="starting page requests per second across all browsers")
+    parser.add_argument("--min-rate", type=float, default=MIN_RATE)
+    parser.add_argument("--max-rate", type=float, default=MAX_RATE)
+    parser.add_argument("--fixed-rate", action="store_true", help="don't adapt the rate")
+    parser.add_argument("--rate-log", help="append rate changes as JSON lines to this file")
+    parser.add_argument("--no-http", action="store_true", help="always render pages in a browser")
+    parser.add_argument("--block", nargs="*", choices=list(BLOCK_PATTERNS), default=list(DEFAULT_BLOCK),
+                        help="resource groups the browsers block (default: all)")
+    parser.add_argument("--journal", default=JOURNAL_FILE, help="checkpoint journal; an existing one is resumed")
+    parser.add_argument("--fresh", action="store_true", help="set an existing journal aside and start over")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                        help="failures (across runs) before a perfume page is given up")
+    args = parser.parse_args()
+    
+    if args.fresh and os.path.exists(args.journal):
+        aside = f"{args.journal}.{time.strftime('%Y%m%d-%H%M%S')}"
+        os.replace(args.journal, aside)
+        print(f"🗂️  Previous journal moved to '{aside}'")
+    
     # Designer Brands
     designer_brands = [
         "Dior",
@@ -124,50 +168,105 @@ def main():
     print(f"📋 Total: {len(all_brands)} brands")
     print(f"🎯 Per brand: {perfumes_per_brand} perfumes")
     print(f"📊 Target: ~{len(all_brands) * perfumes_per_brand} perfumes")
+    print(f"🧵 Workers: {args.workers} | Rate: {args.rate:g} pages/s "
+          f"({'fixed' if args.fixed_rate else f'adaptive {args.min_rate:g}–{args.max_rate:g}'})")
     print("=" * 60)
     
-    scraper = SeleniumPerfumeScraper(headless=True)
+    if args.fixed_rate:
+        limiter = TokenBucket(rate=args.rate)
+    else:
+        limiter = AdaptiveRateLimiter(rate=args.rate, min_rate=args.min_rate, max_rate=args.max_rate,
+                                      log_path=args.rate_log)
+    http = None if args.no_http else HttpFetcher(archive=get_archive(), rate_limiter=limiter,
+                                                 pool_size=args.workers)
+    scraper = SeleniumPerfumeScraper(headless=True, rate_limiter=limiter, http=http, block=args.block)
+    
+    journal = ScrapeJournal(args.journal)
+    if journal.done or journal.brands:
+        print(f"♻️  Resuming from '{args.journal}': {len(journal.brands)} brands listed, "
+              f"{len(journal.done)} perfumes done, {len(journal.failures)} failed URLs")
     
-    all_perfumes = []
     successful_brands = []
     failed_brands = []
     
     try:
-        # Brand progress bar
-        brand_pbar = tqdm(all_brands, desc="Brands", unit="brand", position=0)
-        
-        for brand_name in brand_pbar:
-            brand_pbar.set_postfix_str(brand_name)
-            
-            try:
-                brand_perfumes = scraper.scrape_brand(brand_name, perfumes_per_brand)
-                
-                if brand_perfumes:
-                    category = "designer" if brand_name in designer_brands else "niche"
-                    for p in brand_perfumes:
-                        p['category'] = category
-                    
-                    all_perfumes.extend(brand_perfumes)
-                    successful_brands.append(brand_name)
-                else:
-                    failed_brands.append(brand_name)
-                
-                brand_pbar.set_description(f"Brands ({len(all_perfumes)} perfumes)")
-                
-                # Intermediate save every 5 brands
-                idx = all_brands.index(brand_name) + 1
-                if idx % 5 == 0 and all_perfumes:
-                    with open("fragrantica_perfumes_partial.json", 'w', encoding='utf-8') as f:
-                        json.dump(all_perfumes, f, ensure_ascii=False, indent=2)
-                
-            except Exception as e:
+        # === PHASE 1: brand pages → perfume URLs (brands already in the journal are skipped) ===
+        url_brand = {}
+        for brand_name in tqdm(all_brands, desc="Brand pages", unit="brand"):
+            urls = journal.brands.get(brand_name)
+            if urls is None:
+                try:
+                    urls = scraper.get_brand_perfume_urls(brand_name, perfumes_per_brand)
+                except Exception as e:
+                    urls = []
+                    tqdm.write(f"❌ {brand_name} error: {str(e)[:150]}")
+                journal.record_brand(brand_name, urls)
+            for url in urls:
+                url_brand.setdefault(url, brand_name)
+            if not urls:
                 failed_brands.append(brand_name)
-                tqdm.write(f"❌ {brand_name} error: {str(e)[:150]}")
+        # Free the listing browser before the pool starts its own
+        scraper.close()
+        
+        # === PHASE 2: perfume pages, N browsers in parallel (finished pages are skipped) ===
+        todo = journal.pending(url_brand, args.max_attempts)
+        print(f"\n🚀 Scraping {len(todo)} perfumes with {args.workers} browsers "
+              f"({limiter.rate:.3g} pages/s overall now; {len(url_brand) - len(todo)} already in the journal)")
+        pbar = tqdm(total=len(todo), desc="Perfumes", unit="perfume")
         
-        brand_pbar.close()
+        def on_result(url, data):
+            if data:
+                brand_name = url_brand[url]
+                data['category'] = "designer" if brand_name in designer_brands else "niche"
+            journal.record_page(url, data)
+            pbar.update(1)
+        
+        try:
+            scrape_parallel(todo, workers=args.workers, rate_limiter=limiter, on_result=on_result,
+                            http=http, block=args.block)
+        finally:
+            pbar.close()
+        
+        scraped_brands = {url_brand[url] for url in journal.done if url in url_brand}
+        for brand_name in all_brands:
+            if brand_name in scraped_brands:
+                successful_brands.append(brand_name)
+            elif brand_name not in failed_brands:
+                failed_brands.append(brand_name)
+        given_up = journal.given_up(url_brand, args.max_attempts)
         
         # === DOWNLOAD IMAGES ===
-        download_all_images(scraper, all_perfumes)
+        image_results = download_all_images(journal.results(url_brand))
+        
+        # === ASSEMBLE: stream the journal into the final JSON (includes image_local paths),
+        # in brand and popularity order (url_brand), not in the order workers finished ===
+        stats = {'total': 0, 'designer': 0, 'niche': 0, 'complete': 0}
+        rated = []  # (rating, name, brand) of the 10 best so far
+        
+        def assemble():
+            for p in journal.results(url_brand):
+                if p.get('image_url') and p.get('name'):
+                    path = image_path(p)
+                    if image_results.get(path, 'failed') != 'failed':
+                        p['image_local'] = path
+                stats['total'] += 1
+                if p.get('category') in ('designer', 'niche'):
+                    stats[p['category']] += 1
+                if p.get('name') and p.get('description') and \
+                        (p.get('top_notes') or p.get('middle_notes') or p.get('base_notes')):
+                    stats['complete'] += 1
+                if p.get('rating'):
+                    heapq.heappush(rated, (p['rating'], p.get('name', 'N/A'), p.get('brand')))
+                    if len(rated) > 10:
+                        heapq.heappop(rated)
+                yield p
+        
+        filename = "fragrantica_perfumes.json"
+        written = write_json_array(assemble(), filename + ".new")
+        if written:
+            os.replace(filename + ".new", filename)
+        else:
+            os.remove(filename + ".new")
         
         # === SUMMARY ===
         print("\n" + "=" * 60)
@@ -175,49 +274,42 @@ def main():
         print("=" * 60)
         print(f"✅ Successful Brands: {len(successful_brands)}/{len(all_brands)}")
         print(f"❌ Failed Brands: {len(failed_brands)}/{len(all_brands)}")
-        print(f"📦 Total Perfumes: {len(all_perfumes)}")
+        print(f"📦 Total Perfumes: {stats['total']}")
         
         if failed_brands:
             print(f"\n⚠️ Failed Brands:")
             for brand in failed_brands:
                 print(f"  - {brand}")
+        if given_up:
+            print(f"\n⚠️ {len(given_up)} perfume pages failed {args.max_attempts} times and were given up "
+                  f"(raise --max-attempts to retry them)")
         
         # Category stats
-        designer_perfumes = [p for p in all_perfumes if p.get('category') == 'designer']
-        niche_perfumes = [p for p in all_perfumes if p.get('category') == 'niche']
-        
         print(f"\n📊 Category Distribution:")
-        print(f"  - Designer: {len(designer_perfumes)} perfumes")
-        print(f"  - Niche: {len(niche_perfumes)} perfumes")
+        print(f"  - Designer: {stats['designer']} perfumes")
+        print(f"  - Niche: {stats['niche']} perfumes")
         
         # Completeness stats
-        complete = [p for p in all_perfumes if p.get('name') and p.get('description') and 
-                    (p.get('top_notes') or p.get('middle_notes') or p.get('base_notes'))]
-        print(f"\n📊 Data Completeness: {len(complete)}/{len(all_perfumes)} ({100*len(complete)/max(len(all_perfumes),1):.1f}%)")
+        print(f"\n📊 Data Completeness: {stats['complete']}/{stats['total']} ({100*stats['complete']/max(stats['total'],1):.1f}%)")
         
         # Top rated
-        rated = [p for p in all_perfumes if p.get('rating')]
         if rated:
-            top_rated = sorted(rated, key=lambda x: x.get('rating', 0), reverse=True)[:10]
             print("\n🏆 Top 10 Rated Perfumes:")
-            for j, p in enumerate(top_rated, 1):
-                print(f"  {j}. {p.get('name', 'N/A')} ({p.get('brand')}) - {p.get('rating')}/5")
-        
-        # Save final JSON (includes image_local paths)
-        if all_perfumes:
-            filename = "fragrantica_perfumes.json"
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(all_perfumes, f, ensure_ascii=False, indent=2)
-            print(f"\n💾 {len(all_perfumes)} perfumes saved to '{filename}'")
+            for j, (rating, name, brand) in enumerate(sorted(rated, reverse=True), 1):
+                print(f"  {j}. {name} ({brand}) - {rating}/5")
         
-        # Cleanup partial file
-        if os.path.exists("fragrantica_perfumes_partial.json"):
-            os.remove("fragrantica_perfumes_partial.json")
+        if written:
+            print(f"\n💾 {written} perfumes saved to '{filename}' (journal: '{args.journal}')")
         
         print("\n✅ Scraping completed!")
         
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Interrupted - progress is in '{args.journal}', run the same command to resume")
     finally:
+        journal.close()
         scraper.close()
+        if http:
+            http.close()
         print("🔒 Browser closed")
 
 
@@ -0,0 +1,152 @@
+"""
+Append-only checkpoint journal for resumable scrape runs.
+
+Every step of a run is one JSON line, written and fsync'ed as soon as it
+happens:
+
+    {"type": "brand", "brand": "Dior", "urls": [...], "t": ...}        listing page read
+    {"type": "page", "url": ..., "state": "done", "data": {...}, "t": ...}
+    {"type": "page", "url": ..., "state": "failed", "attempt": 2, "t": ...}
+
+A crash or Ctrl-C loses at most the pages still in flight. On restart the
+journal is replayed: brands already listed are not fetched again, finished
+pages are skipped, and failed pages are retried until they have failed
+MAX_ATTEMPTS times. Only url -> state (and the byte offset of each finished
+record) is kept in memory. Records stay on disk, and results() streams them
+back for the final dataset - in a given URL order, since parallel workers
+finish pages in no particular order - which write_json_array() writes
+without holding the whole list.
+
+    journal = ScrapeJournal("scrape_journal.jsonl")
+    journal.record_page(url, data)          # data=None for a failure
+    for perfume in journal.results(urls): ...
+"""
+import json
+import os
+import threading
+import time
+
+from page_archive import drop_torn_tail
+
+JOURNAL_FILE = "scrape_journal.jsonl"
+MAX_ATTEMPTS = 3   # failures (across runs) before a URL is given up
+
+
+class ScrapeJournal:
+    """Durable per-URL scrape state, replayed from and appended to one JSONL file."""
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.brands = {}     # brand -> [urls]
+        self.done = set()
+        self.offsets = {}    # url -> byte offset of its first "done" record
+        self.failures = {}   # url -> failed attempts
+        drop_torn_tail(path)   # a crash mid-append must not swallow the next record
+        self._replay()
+        self.file = open(path, "ab")
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                entry = self._parse(line)
+                start, offset = offset, offset + len(line)
+                if not entry:
+                    continue
+                if entry.get("type") == "brand":
+                    self.brands[entry["brand"]] = entry["urls"]
+                elif entry.get("type") == "page":
+                    if entry["state"] == "done":
+                        self.done.add(entry["url"])
+                        self.offsets.setdefault(entry["url"], start)
+                    else:
+                        self.failures[entry["url"]] = self.failures.get(entry["url"], 0) + 1
+
+    @staticmethod
+    def _parse(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None  # torn last line after a crash
+
+    def _append(self, entry):
+        """Write one record; returns its byte offset."""
+        entry["t"] = int(time.time())
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.lock:
+            offset = self.file.tell()
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        return offset
+
+    def record_brand(self, brand, urls):
+        """Perfume URLs found on a brand page (not recorded when empty, so the brand is retried)."""
+        if urls:
+            self.brands[brand] = list(urls)
+            self._append({"type": "brand", "brand": brand, "urls": list(urls)})
+
+    def record_page(self, url, data):
+        """Result of one page: data dict when it succeeded, None when it failed."""
+        if data:
+            offset = self._append({"type": "page", "url": url, "state": "done", "data": data})
+            with self.lock:
+                self.done.add(url)
+                self.offsets.setdefault(url, offset)
+        else:
+            with self.lock:
+                self.failures[url] = self.failures.get(url, 0) + 1
+                attempt = self.failures[url]
+            self._append({"type": "page", "url": url, "state": "failed", "attempt": attempt})
+
+    def pending(self, urls, max_attempts=MAX_ATTEMPTS):
+        """URLs still to scrape: not done and failed fewer than max_attempts times."""
+        return [u for u in urls if u not in self.done and self.failures.get(u, 0) < max_attempts]
+
+    def given_up(self, urls, max_attempts=MAX_ATTEMPTS):
+        return [u for u in urls if u not in self.done and self.failures.get(u, 0) >= max_attempts]
+
+    def results(self, order=()):
+        """
+        Stream the data of every finished page (first record per URL): URLs in
+        `order` first, in that order, then any other finished pages in
+        completion order. Each record is read back from its byte offset.
+        """
+        self.file.flush()
+        with self.lock:
+            offsets = dict(self.offsets)
+        seen = set()
+        with open(self.path, "rb") as f:
+            for url in list(order) + sorted(offsets, key=offsets.get):
+                if url in seen or url not in offsets:
+                    continue
+                seen.add(url)
+                f.seek(offsets[url])
+                yield self._parse(f.readline())["data"]
+
+    def close(self):
+        self.file.close()
+
+
+def write_json_array(items, filename):
+    """
+    Write an iterable as a JSON array, one item at a time, in the same layout
+    as json.dump(..., ensure_ascii=False, indent=2). The file is replaced
+    atomically once complete. Returns the number of items.
+    """
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    count = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for item in items:
+            body = json.dumps(item, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            f.write(("[\n  " if not count else ",\n  ") + body)
+            count += 1
+        f.write("\n]" if count else "[]")
+    os.replace(tmp, filename)
+    return count
@@ -9,35 +9,250 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import time
-import random
 import json
 import re
 import os
-import requests
-import html as html_module
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+from typing import Callable, List, Dict, Any, Optional, Sequence
+
+from perfume_parser import block_reason, missing_fields, parse_brand_perfume_urls, parse_perfume_page
+from page_archive import ARCHIVE_DIR, PageArchive, get_archive
+from http_fetcher import REQUIRED_FIELDS, HttpFetcher
+from downloader import Downloader
+from rate_limit import AdaptiveRateLimiter, TokenBucket
+
+# Readiness waits: return as soon as the lazy Vue sections are rendered, never later than the caps
+READY_TIMEOUT = 15      # s, per page, for pyramid + accords + vote cards
+SECTION_TIMEOUT = 5     # s, per vote section still empty after the page wait
+POLL_INTERVAL = 0.1     # s
+SCROLL_STEPS = 20
+STEP_QUIET_MS = 120     # a scroll step is done once the DOM has been still this long...
+STEP_CAP_MS = 350       # ...or after this long at most
+
+# Lean profile: requests the extractor never reads are blocked inside Chrome
+# (CDP Network.setBlockedURLs). Scripts, stylesheets and XHR from
+# fragrantica.com are never blocked - the Vue vote widgets render from them -
+# and neither is the Cloudflare challenge. A blocked <img> keeps its src and
+# alt, so PYRAMID_JS and the image_url patterns still read them.
+BLOCK_PATTERNS = {
+    'images': ['*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico'],
+    'media': ['*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'],
+    'fonts': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+    'third_party': [
+        '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+        '*googlesyndication.com*', '*adservice.google.*', '*fundingchoicesmessages.google.com*',
+        '*amazon-adsystem.com*', '*facebook.net*', '*connect.facebook.*', '*criteo.*',
+        '*taboola.com*', '*outbrain.com*', '*adnxs.com*', '*pubmatic.com*', '*rubiconproject.com*',
+        '*scorecardresearch.com*', '*quantserve.com*', '*hotjar.com*', '*cloudflareinsights.com*',
+    ],
+}
+DEFAULT_BLOCK = ('images', 'media', 'fonts', 'third_party')
+
+# Chrome is restarted after this many pages, or once its process tree
+# (browser + renderers + chromedriver) holds this much resident memory
+RECYCLE_PAGES = 150
+RECYCLE_RSS_MB = 1500
+
+# True once every lazy section the extractor reads has rendered
+PAGE_READY_JS = """
+    var pyramid = document.getElementById('pyramid');
+    var pyramidReady = !pyramid || pyramid.querySelector('img') !== null;
+    var accordsReady = document.body.innerText.toLowerCase().indexOf('main accords') >= 0;
+    var wanted = {'LONGEVITY': 0, 'SILLAGE': 0, 'PRICE VALUE': 0};
+    var found = 0;
+    var els = document.querySelectorAll('[class*="uppercase" i],[class*="tw-rating-card-label" i]');
+    for (var i = 0; i < els.length && found < 3; i++) {
+        var t = els[i].textContent.trim().toUpperCase();
+        if (els[i].children.length || !(t in wanted) || wanted[t]) continue;
+        var box = els[i];
+        for (var j = 0; j < 8 && box; j++) {
+            box = box.parentElement;
+            if (box && (box.innerText || '').split('\\n').length > 2) break;
+        }
+        if (box && /\\d/.test(box.innerText || '')) { wanted[t] = 1; found++; }
+    }
+    return pyramidReady && accordsReady && found === 3;
+"""
+
+# Vote cards: section heading -> text lines of its card, for every heading
+# in arguments[0], from one traversal of the heading candidates. Headings are
+# leaf span/div/p elements with an 'uppercase' or 'tw-rating-card-label'
+# class, which keeps review text mentioning the same words out. A card's
+# lines run from its heading to the next requested heading.
+# With arguments[1], the first card without counts is scrolled into view.
+VOTE_SECTIONS_JS = """
+    var wanted = arguments[0], scroll = arguments[1];
+    var out = {}, pending = null;
+    var els = document.querySelectorAll('[class*="uppercase" i],[class*="tw-rating-card-label" i]');
+    for (var i = 0; i < els.length; i++) {
+        var el = els[i];
+        if (el.children.length || ['SPAN', 'DIV', 'P'].indexOf(el.tagName) < 0) continue;
+        var title = el.textContent.trim().toUpperCase();
+        if (wanted.indexOf(title) < 0 || out.hasOwnProperty(title)) continue;
+        var text = null, box = el;
+        for (var j = 0; j < 8; j++) {
+            box = box.parentElement;
+            if (!box) break;
+            var t = box.innerText || '';
+            if (t.split('\\n').length > 2) { text = t; break; }
+        }
+        var lines = [], started = false, closed = false;
+        (text || '').split('\\n').forEach(function(raw) {
+            var line = raw.trim();
+            if (!line || closed) return;
+            var up = line.toUpperCase();
+            if (up === title) { started = true; return; }
+            if (!started) return;
+            if (wanted.indexOf(up) >= 0) { closed = true; return; }
+            lines.push(line);
+        });
+        out[title] = lines;
+        if (!pending && !/\\d/.test(text || '')) pending = el;
+    }
+    if (scroll && pending) pending.scrollIntoView({behavior: 'instant', block: 'center'});
+    return out;
+"""
+VOTE_SECTIONS = ['LONGEVITY', 'SILLAGE', 'PRICE VALUE', 'SEASON', 'WHEN TO WEAR', 'GENDER', 'AGE']
+REQUIRED_VOTE_SECTIONS = ['LONGEVITY', 'SILLAGE', 'PRICE VALUE']
+
+DESCRIPTION_JS = """
+    var el = document.querySelector('[itemprop="description"]');
+    return el ? el.innerText.trim() : '';
+"""
+
+# Note pyramid: tiers by heading, plus note name -> icon URL
+PYRAMID_JS = """
+    var pyramid = document.getElementById('pyramid');
+    if (!pyramid) return {top: [], middle: [], base: [], all: [], images: {}};
+    var output = {top: [], middle: [], base: [], all: [], images: {}};
+    pyramid.querySelectorAll('img').forEach(function(img) {
+        if (img.alt && img.alt.trim()) output.all.push(img.alt.trim());
+    });
+    var currentSection = null;
+    pyramid.querySelectorAll('*').forEach(function(el) {
+        if (el.children.length === 0) {
+            var txt = (el.textContent || '').trim().toUpperCase();
+            if (txt === 'TOP NOTES' || txt === 'TOP NOTE') currentSection = 'top';
+            else if (txt === 'MIDDLE NOTES' || txt === 'MIDDLE NOTE' || txt === 'HEART NOTES') currentSection = 'middle';
+            else if (txt === 'BASE NOTES' || txt === 'BASE NOTE') currentSection = 'base';
+        }
+        if (el.tagName === 'IMG' && el.alt && currentSection) {
+            output[currentSection].push(el.alt.trim());
+        }
+        if (el.tagName === 'IMG' && el.alt && el.src && el.src.indexOf('fimgs.net') !== -1) {
+            output.images[el.alt.trim()] = el.src;
+        }
+    });
+    return output;
+"""
+
+# Resolves once no DOM mutation has happened for `quiet` ms, or after `cap` ms
+DOM_QUIET_JS = """
+    var quiet = arguments[0], cap = arguments[1], done = arguments[arguments.length - 1];
+    var start = Date.now(), finished = false, timer;
+    var obs = new MutationObserver(function() { clearTimeout(timer); timer = setTimeout(finish, quiet); });
+    function finish() {
+        if (finished) return;
+        finished = true;
+        obs.disconnect();
+        clearTimeout(timer);
+        clearTimeout(hard);
+        done(Date.now() - start);
+    }
+    var hard = setTimeout(finish, cap);
+    obs.observe(document.body, {childList: true, subtree: true, characterData: true});
+    timer = setTimeout(finish, quiet);
+"""
+
+
+def _has_count(lines):
+    return bool(lines) and any(re.search(r'\d', line) for line in lines)
+
+
+def document_validators(events: List[Dict[str, Any]], url: str) -> Dict[str, Optional[str]]:
+    """ETag / Last-Modified of the page's own 200 response among CDP Network messages ({} if none)"""
+    page = url.split('#')[0]
+    for message in reversed(events):
+        params = message.get('params') or {}
+        response = params.get('response') or {}
+        if (message.get('method') == 'Network.responseReceived' and params.get('type') == 'Document'
+                and response.get('status') == 200 and response.get('url', '').split('#')[0] == page):
+            headers = {k.lower(): v for k, v in (response.get('headers') or {}).items()}
+            return {'etag': headers.get('etag'), 'last_modified': headers.get('last-modified')}
+    return {}
+
+
+def process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of pid and all its descendants in MB, from /proc (None where there is no /proc)"""
+    children = {}
+    try:
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return None
+
+    total_kb, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        stack.extend(children.get(p, []))
+        try:
+            with open(f'/proc/{p}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            pass
+    return total_kb / 1024
 
 
 class SeleniumPerfumeScraper:
     """Selenium ile parfüm scraper"""
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, rate_limiter: Optional[TokenBucket] = None,
+                 archive_dir: Optional[str] = ARCHIVE_DIR, http: Optional[HttpFetcher] = None,
+                 block: Sequence[str] = DEFAULT_BLOCK, recycle_pages: Optional[int] = RECYCLE_PAGES,
+                 recycle_rss_mb: Optional[float] = RECYCLE_RSS_MB):
         """
         Args:
             headless: Browser'ı görünmez modda çalıştır (True önerilir)
+            rate_limiter: Paylaşılan limiter - her sayfa isteği ondan token alır ve sonucunu ona
+                          bildirir (paralel worker'lar aynı limiter'ı paylaşır). None ise
+                          scraper'a özel bir AdaptiveRateLimiter (rate_limit.py)
+            archive_dir: Ham sayfaların arşivleneceği klasör (page_archive.py); None ise arşivleme yok
+            http: HttpFetcher verilirse marka listeleri düz HTTP ile çekilir; parfüm sayfaları
+                  arşivde validator'ları varsa koşullu GET ile yenilenir (304 → arşiv kopyası),
+                  yoksa doğrudan browser açılır (http_fetcher.py)
+            block: Browser'da engellenecek kaynak grupları (BLOCK_PATTERNS anahtarları); () ise hiçbiri
+            recycle_pages / recycle_rss_mb: Chrome bu kadar sayfadan / bu kadar RSS'ten sonra
+                  yeniden başlatılır; None ise o sınır kapalı
         """
         self.headless = headless
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.http = http
+        self.block = tuple(block)
+        self.recycle_pages = recycle_pages
+        self.recycle_rss_mb = recycle_rss_mb
+        self.driver_pages = 0  # mevcut Chrome'un işlediği sayfa sayısı
+        self.downloader: Optional[Downloader] = None  # download_image için, ilk kullanımda açılır
+        self.archive: Optional[PageArchive] = get_archive(archive_dir) if archive_dir else None
         self.driver = None
+        self.page_times = []  # (toplam süre, hazır olma bekleme süresi) - sayfa başına, saniye
+        self.page_network = []  # son browser sayfasının CDP Network mesajları (performance log)
     
-    def _init_driver(self):
-        """Chrome driver'ı başlat - stealth modu ile bot tespitini atlatır"""
-        if self.driver:
-            return
-        
-        print("🌐 Starting Chrome driver...")
-        
+    def _chrome_options(self) -> Options:
+        """Chrome ayarları - stealth + yalın profil"""
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument('--headless=new')
@@ -46,12 +261,27 @@ class SeleniumPerfumeScraper:
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
         chrome_options.add_argument('--disable-extensions')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--disable-background-networking')
+        chrome_options.add_argument('--disable-component-update')
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
         chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         chrome_options.add_argument('user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36')
         chrome_options.page_load_strategy = 'eager'
+        # Performance log: the page's own response headers, so a browser fetch also
+        # records the ETag / Last-Modified for the next run's conditional request
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        return chrome_options
+
+    def _init_driver(self):
+        """Chrome driver'ı başlat - stealth modu ile bot tespitini atlatır"""
+        if self.driver:
+            return
+        
+        print("🌐 Starting Chrome driver...")
         
+        chrome_options = self._chrome_options()
         try:
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -59,6 +289,7 @@ class SeleniumPerfumeScraper:
             # Fallback: let selenium-manager handle driver automatically
             self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.set_page_load_timeout(60)
+        self.driver.set_script_timeout(READY_TIMEOUT + 5)
         
         # Patch navigator.webdriver to undefined
         self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
@@ -69,15 +300,155 @@ class SeleniumPerfumeScraper:
                 Object.defineProperty(navigator, 'languages', {get: () => ['en-US','en']});
             '''
         })
-        print("✅ Driver ready")
+
+        # Resource policy: drop images, media, fonts and ad/tracker hosts before they download
+        blocked = [pattern for group in self.block for pattern in BLOCK_PATTERNS[group]]
+        if blocked:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked})
+        self.driver_pages = 0
+        print(f"✅ Driver ready (blocking: {', '.join(self.block) or 'nothing'})")
+
+    def _drain_network_log(self) -> List[Dict[str, Any]]:
+        """Chrome performance log'undaki CDP mesajları (son çağrıdan bu yana)"""
+        try:
+            return [json.loads(entry['message'])['message'] for entry in self.driver.get_log('performance')]
+        except Exception:
+            return []
+
+    def browser_rss_mb(self) -> Optional[float]:
+        """Chrome process ağacının RSS'i (MB) - driver yoksa veya ölçülemiyorsa None"""
+        try:
+            return process_tree_rss_mb(self.driver.service.process.pid)
+        except Exception:
+            return None
+
+    def _maybe_recycle(self):
+        """Sayfa sayısı veya bellek sınırı aşıldıysa Chrome'u kapat (sonraki sayfa yenisini açar)"""
+        self.driver_pages += 1
+        reason = None
+        if self.recycle_pages and self.driver_pages >= self.recycle_pages:
+            reason = f"{self.driver_pages} pages"
+        elif self.recycle_rss_mb:
+            rss = self.browser_rss_mb()
+            if rss and rss >= self.recycle_rss_mb:
+                reason = f"RSS {rss:.0f} MB"
+        if reason:
+            print(f"♻️ Recycling Chrome ({reason})")
+            self.close()
     
+    def _throttle(self):
+        """Bir sonraki istek için rate limiter'dan token bekle (engelleme sonrası duraklama dahil)"""
+        self.rate_limiter.acquire()
+
+    def _wait_until(self, check, timeout: float):
+        """check(driver) truthy dönene kadar bekle; değeri döndür (timeout'ta None)"""
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=POLL_INTERVAL).until(check)
+        except TimeoutException:
+            return None
+
+    def _wait_dom_quiet(self, quiet_ms: int, cap_ms: int):
+        """DOM quiet_ms boyunca değişmeyene kadar bekle (en fazla cap_ms)"""
+        try:
+            self.driver.execute_async_script(DOM_QUIET_JS, quiet_ms, cap_ms)
+        except Exception:
+            pass
+
+    def _collect_payloads(self) -> Dict[str, Any]:
+        """Canlı DOM'dan okunan veriler: tam description, nota piramidi, oy kartları"""
+        payloads = {}
+        try:
+            payloads['description'] = self.driver.execute_script(DESCRIPTION_JS) or ''
+        except Exception:
+            pass
+        try:
+            payloads['pyramid'] = self.driver.execute_script(PYRAMID_JS)
+        except Exception:
+            pass
+
+        # Vote data: every vote card in one DOM pass / one round trip.
+        # Polled until the main cards carry counts; each poll scrolls the
+        # first still-empty card into view so its lazy render triggers.
+        def votes_rendered(d):
+            payload = d.execute_script(VOTE_SECTIONS_JS, VOTE_SECTIONS, True)
+            if payload and all(_has_count(payload.get(h)) for h in REQUIRED_VOTE_SECTIONS):
+                return payload
+            return None
+
+        sections = self._wait_until(votes_rendered, SECTION_TIMEOUT)
+        if sections is None:
+            try:
+                sections = self.driver.execute_script(VOTE_SECTIONS_JS, VOTE_SECTIONS, False) or {}
+            except Exception:
+                sections = {}
+        payloads['votes'] = sections
+        return payloads
+
+    def _archive_page(self, url: str, page_source: str, payloads: Optional[Dict[str, Any]] = None,
+                      tier: str = 'browser', etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Sayfayı arşive yaz; HTTP validator'larını bir sonraki koşullu istek için hatırla"""
+        if not self.archive:
+            return
+        try:
+            digest = self.archive.put(url, page_source, payloads, tier=tier, etag=etag, last_modified=last_modified)
+        except OSError as e:
+            print(f"  ⚠️ Archive write failed: {e}")
+            return
+        if self.http:
+            self.http.remember(url, digest, etag, last_modified)
+
     def extract_perfume_details(self, url: str, retry: int = 2) -> Optional[Dict[str, Any]]:
+        """Extract perfume details: a conditional GET when the page has archived validators, else the browser"""
+        if not self.http:
+            return self._extract_with_browser(url, retry)
+        if not self.http.can_revalidate(url):
+            # Static perfume pages lack the Vue-rendered vote cards: an unconditional
+            # GET would only spend a second token before the browser
+            self.http.stats.record('browser', 'first fetch')
+            return self._extract_with_browser(url, retry)
+
+        print(f"📡 Fetching: {url}")
+        t_page = time.time()
+        page, reason = self.http.get(url)
+        validators = {}
+        if page:
+            validators = {'etag': page['etag'], 'last_modified': page['last_modified']}
+            perfume_data = parse_perfume_page(url, page['page_source'], page['payloads'])
+            missing = [field for field in REQUIRED_FIELDS if not perfume_data.get(field)]
+            if not missing:
+                if page['not_modified']:
+                    self.http.stats.record('http_304')
+                else:
+                    self.http.stats.record('http')
+                    self._archive_page(url, page['page_source'], tier='http', **validators)
+                page_time = time.time() - t_page
+                self.page_times.append((page_time, 0.0))
+                tier = 'HTTP 304' if page['not_modified'] else 'HTTP'
+                print(f"✅ {perfume_data.get('name', 'N/A')} - {perfume_data.get('brand', 'N/A')} "
+                      f"[{tier}] ⏱️ {page_time:.1f}s")
+                return perfume_data
+            reason = f"missing {', '.join(missing)}"
+
+        print(f"  ↪️ Browser needed: {reason}")
+        self.http.stats.record('browser', reason)
+        return self._extract_with_browser(url, retry, validators)
+
+    def _extract_with_browser(self, url: str, retry: int = 2,
+                              validators: Optional[Dict[str, Optional[str]]] = None) -> Optional[Dict[str, Any]]:
         """Extract perfume details using page_source (raw HTML) for reliability"""
         self._init_driver()
         
+        reported = False  # outcome already given to the rate limiter
+        self.page_network = []
+        self._drain_network_log()  # events from before this page
         try:
             print(f"📡 Scraping: {url}")
+            t_page = time.time()
+            self._throttle()
+            t_load = time.time()
             self.driver.get(url)
+            load_time = time.time() - t_load
             
             # Wait for page to load
             try:
@@ -86,379 +457,88 @@ class SeleniumPerfumeScraper:
                 )
             except Exception:
                 print("  ⚠️ Page loading slowly, waiting...")
-            
-            time.sleep(3)
 
-            # Scroll slowly to trigger Vue lazy renders
+            # Scroll down to trigger Vue lazy renders, then wait until pyramid,
+            # accords and vote cards are actually rendered (capped at READY_TIMEOUT).
+            # Readiness is checked before every step, so a page that renders
+            # early costs no further scroll steps or quiet-waits.
+            t_ready = time.time()
             try:
-                for step in range(1, 21):
+                ready = self.driver.execute_script(PAGE_READY_JS)
+                for step in range(1, SCROLL_STEPS + 1):
+                    if ready:
+                        break
                     self.driver.execute_script(
-                        f"window.scrollTo(0, document.body.scrollHeight * {step / 20});"
+                        f"window.scrollTo(0, document.body.scrollHeight * {step / SCROLL_STEPS});"
                     )
-                    time.sleep(0.35)
-                time.sleep(1.5)
-                # Scroll to each vote section to ensure lazy load triggers
-                for section_id in ['#voting', '#demographics', '#pyramid']:
-                    self.driver.execute_script(f"""
-                        var el = document.querySelector('{section_id}');
-                        if (!el) el = document.getElementById('{section_id.lstrip("#")}');
-                        if (el) el.scrollIntoView({{behavior: 'instant', block: 'center'}});
-                    """)
-                    time.sleep(1.2)
-                # Final scroll back to top then bottom to ensure full render
-                self.driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(0.5)
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1.5)
+                    self._wait_dom_quiet(STEP_QUIET_MS, STEP_CAP_MS)
+                    ready = self.driver.execute_script(PAGE_READY_JS)
+                if not ready:
+                    # Scroll to each vote section to ensure lazy load triggers
+                    for section_id in ['#voting', '#demographics', '#pyramid']:
+                        self.driver.execute_script(f"""
+                            var el = document.querySelector('{section_id}');
+                            if (!el) el = document.getElementById('{section_id.lstrip("#")}');
+                            if (el) el.scrollIntoView({{behavior: 'instant', block: 'center'}});
+                        """)
+                    remaining = READY_TIMEOUT - (time.time() - t_ready)
+                    if not self._wait_until(lambda d: d.execute_script(PAGE_READY_JS), max(remaining, 0.5)):
+                        print(f"  ⚠️ Sections not fully rendered after {READY_TIMEOUT}s, continuing")
             except Exception:
                 pass
+            ready_time = time.time() - t_ready
 
             # Get raw HTML - this is always reliable
             page_source = self.driver.page_source
             
             # Check for Cloudflare / 429 block page
-            if len(page_source) < 5000 or '429 Too Many Requests' in page_source or 'you\'ve opened more pages' in page_source:
+            blocked = block_reason(page_source)
+            if blocked:
+                self.rate_limiter.record(blocked, kind='browser')
+                reported = True
+                if blocked == 'blocked':
+                    raise Exception("Blocked by the site (429 / too many pages)")
                 raise Exception("Page source too short, page may not have loaded")
+            self.rate_limiter.record('ok', load_time, kind='browser')
+            reported = True
             
-            perfume_data = {
-                'url': url,
-                'name': None,
-                'brand': None,
-                'release_year': None,
-                'gender': None,
-                'top_notes': [],
-                'middle_notes': [],
-                'base_notes': [],
-                'rating': None,
-                'votes': None,
-                'description': None,
-                'image_url': None,
-                'main_accords': [],
-                'note_images': {},
-                'longevity': None,
-                'sillage': None,
-                'price_value': None,
-                'season': None,
-            }
-            
-            # === ALL EXTRACTION FROM page_source (raw HTML) ===
-            
-            # Name + Gender from img alt="perfume Aventus Creed for men"
-            # This is the most reliable source
-            img_alt_match = re.search(r'alt="perfume\s+([^"]+)"', page_source, re.IGNORECASE)
-            if img_alt_match:
-                full_title = html_module.unescape(img_alt_match.group(1).strip())
-            else:
-                # Fallback: h1 tag (strip inner HTML tags)
-                h1_match = re.search(r'<h1[^>]*>(.*?)</h1>', page_source, re.DOTALL | re.IGNORECASE)
-                if h1_match:
-                    full_title = re.sub(r'<[^>]+>', ' ', h1_match.group(1)).strip()
-                    full_title = re.sub(r'\s+', ' ', full_title)
-                else:
-                    full_title = None
-            
-            if full_title:
-                if 'for women and men' in full_title.lower():
-                    perfume_data['gender'] = 'Unisex'
-                    clean_name = re.sub(r'\s*for women and men\s*', '', full_title, flags=re.IGNORECASE)
-                elif 'for women' in full_title.lower():
-                    perfume_data['gender'] = 'Women'
-                    clean_name = re.sub(r'\s*for women\s*', '', full_title, flags=re.IGNORECASE)
-                elif 'for men' in full_title.lower():
-                    perfume_data['gender'] = 'Men'
-                    clean_name = re.sub(r'\s*for men\s*', '', full_title, flags=re.IGNORECASE)
-                else:
-                    clean_name = full_title
-                
-                perfume_data['name'] = html_module.unescape(clean_name.strip())
-            
-            # Brand from <span itemprop="name">
-            brand_match = re.search(r'itemprop="name"[^>]*>\s*([^<]+?)\s*</span>', page_source, re.IGNORECASE)
-            if brand_match:
-                perfume_data['brand'] = html_module.unescape(brand_match.group(1).strip())
-            
-            # Description from itemprop="description" - via JS for full text
-            desc_text = ''
-            try:
-                desc_text = self.driver.execute_script("""
-                    var el = document.querySelector('[itemprop="description"]');
-                    return el ? el.innerText.trim() : '';
-                """)
-            except Exception:
-                pass
-            if not desc_text:
-                # Fallback: regex but greedy, strip all tags, no char limit
-                desc_match = re.search(r'itemprop="description"[^>]*>(.*?)</(?:div|section|article)>', page_source, re.DOTALL | re.IGNORECASE)
-                if desc_match:
-                    desc_text = html_module.unescape(re.sub(r'<[^>]+>', ' ', desc_match.group(1))).strip()
-                    desc_text = re.sub(r'\s+', ' ', desc_text).strip()
-            if desc_text and len(desc_text) > 30:
-                perfume_data['description'] = html_module.unescape(desc_text)
-
-                # Release year from description
-                year_match = re.search(r'launched in (\d{4})', desc_text, re.IGNORECASE)
-                if not year_match:
-                    year_match = re.search(r'released in (\d{4})', desc_text, re.IGNORECASE)
-                if year_match:
-                    year = int(year_match.group(1))
-                    if 1900 <= year <= 2030:
-                        perfume_data['release_year'] = year
-
-                # Notes from description text
-                top_match = re.search(r'Top notes?\s+(?:are|is)\s+([^;.]+?)(?:;|\.)', desc_text, re.IGNORECASE)
-                if top_match:
-                    notes_text = top_match.group(1)
-                    notes = re.split(r',\s*(?:and\s+)?|\s+and\s+', notes_text)
-                    perfume_data['top_notes'] = [n.strip() for n in notes if n.strip() and len(n.strip()) > 1]
-
-                middle_match = re.search(r'middle notes?\s+(?:are|is)\s+([^;.]+?)(?:;|\.)', desc_text, re.IGNORECASE)
-                if middle_match:
-                    notes_text = middle_match.group(1)
-                    notes = re.split(r',\s*(?:and\s+)?|\s+and\s+', notes_text)
-                    perfume_data['middle_notes'] = [n.strip() for n in notes if n.strip() and len(n.strip()) > 1]
-
-                base_match = re.search(r'base notes?\s+(?:are|is)\s+([^;.]+?)(?:\.|$)', desc_text, re.IGNORECASE)
-                if base_match:
-                    notes_text = base_match.group(1)
-                    notes = re.split(r',\s*(?:and\s+)?|\s+and\s+', notes_text)
-                    perfume_data['base_notes'] = [n.strip() for n in notes if n.strip() and len(n.strip()) > 1]
-            
-            # Fallback notes + note_images: extract from pyramid via JS
-            try:
-                js_notes = self.driver.execute_script("""
-                    var pyramid = document.getElementById('pyramid');
-                    if (!pyramid) return {top: [], middle: [], base: [], all: [], images: {}};
-                    var output = {top: [], middle: [], base: [], all: [], images: {}};
-                    pyramid.querySelectorAll('img').forEach(function(img) {
-                        if (img.alt && img.alt.trim()) output.all.push(img.alt.trim());
-                    });
-                    var currentSection = null;
-                    pyramid.querySelectorAll('*').forEach(function(el) {
-                        if (el.children.length === 0) {
-                            var txt = (el.textContent || '').trim().toUpperCase();
-                            if (txt === 'TOP NOTES' || txt === 'TOP NOTE') currentSection = 'top';
-                            else if (txt === 'MIDDLE NOTES' || txt === 'MIDDLE NOTE' || txt === 'HEART NOTES') currentSection = 'middle';
-                            else if (txt === 'BASE NOTES' || txt === 'BASE NOTE') currentSection = 'base';
-                        }
-                        if (el.tagName === 'IMG' && el.alt && currentSection) {
-                            output[currentSection].push(el.alt.trim());
-                        }
-                        if (el.tagName === 'IMG' && el.alt && el.src && el.src.indexOf('fimgs.net') !== -1) {
-                            output.images[el.alt.trim()] = el.src;
-                        }
-                    });
-                    return output;
-                """)
-                if js_notes:
-                    if not perfume_data['top_notes'] and not perfume_data['middle_notes'] and not perfume_data['base_notes']:
-                        if js_notes.get('top') or js_notes.get('middle') or js_notes.get('base'):
-                            perfume_data['top_notes'] = list(dict.fromkeys(js_notes['top']))
-                            perfume_data['middle_notes'] = list(dict.fromkeys(js_notes['middle']))
-                            perfume_data['base_notes'] = list(dict.fromkeys(js_notes['base']))
-                        elif js_notes.get('all'):
-                            perfume_data['top_notes'] = list(dict.fromkeys(js_notes['all']))
-                    if js_notes.get('images'):
-                        perfume_data['note_images'] = js_notes['images']
-            except Exception:
-                pass
-
-            # Main accords: find 'main accords' heading then extract truncate spans
-            try:
-                idx = page_source.lower().find('main accords')
-                if idx > 0:
-                    chunk = page_source[idx:idx+4000]
-                    accords = re.findall(
-                        r'<span[^>]*class="[^"]*truncate[^"]*"[^>]*>([^<]{2,40})</span>',
-                        chunk
-                    )
-                    if accords:
-                        perfume_data['main_accords'] = list(dict.fromkeys(a.strip() for a in accords if a.strip()))[:12]
-            except Exception:
-                pass
-            
-            # Vote data via JS DOM - scroll to each section first
-            def _parse_vote_count(s):
-                s = str(s).strip().lower().replace(',', '').replace(' ', '')
-                if s.endswith('k') and len(s) > 1:
-                    try:
-                        return int(float(s[:-1]) * 1000)
-                    except (ValueError, TypeError):
-                        return None
-                if s.endswith('m') and len(s) > 1:
-                    try:
-                        return int(float(s[:-1]) * 1000000)
-                    except (ValueError, TypeError):
-                        return None
-                try:
-                    return int(float(s))
-                except (ValueError, TypeError):
-                    return None
-
-            def _extract_section_by_heading(heading_text):
-                """Find heading span (UPPERCASE), scroll to it, get box innerText, parse label/count pairs."""
-                try:
-                    ht_upper = heading_text.upper()
-                    # Target spans with 'uppercase' or 'tw-rating-card-label' CSS class
-                    # to avoid matching review text that also contains the same word
-                    self.driver.execute_script(f"""
-                        var els = document.querySelectorAll('span,div,p');
-                        for (var i=0; i<els.length; i++) {{
-                            var cl = (els[i].className||'').toLowerCase();
-                            var isVoteHeading = cl.indexOf('uppercase') >= 0 || cl.indexOf('tw-rating-card-label') >= 0;
-                            if (els[i].children.length === 0 &&
-                                els[i].textContent.trim().toUpperCase() === '{ht_upper}' &&
-                                isVoteHeading) {{
-                                els[i].scrollIntoView({{behavior:'instant',block:'center'}});
-                                break;
-                            }}
-                        }}
-                    """)
-                    time.sleep(2.5)
-                    inner = self.driver.execute_script(f"""
-                        var heading = null;
-                        var els = document.querySelectorAll('span,div,p');
-                        for (var i=0; i<els.length; i++) {{
-                            var cl = (els[i].className||'').toLowerCase();
-                            var isVoteHeading = cl.indexOf('uppercase') >= 0 || cl.indexOf('tw-rating-card-label') >= 0;
-                            if (els[i].children.length === 0 &&
-                                els[i].textContent.trim().toUpperCase() === '{ht_upper}' &&
-                                isVoteHeading) {{
-                                heading = els[i];
-                                break;
-                            }}
-                        }}
-                        if (!heading) return null;
-                        var box = heading;
-                        for (var j=0; j<8; j++) {{
-                            box = box.parentElement;
-                            if (!box) break;
-                            var t = (box.innerText||'');
-                            if (t.split('\\n').length > 2) return t;
-                        }}
-                        return null;
-                    """)
-                    if not inner:
-                        return None
-                    # Known section headings - stop parsing when we hit a different one
-                    section_headings = {'LONGEVITY', 'SILLAGE', 'PRICE VALUE', 'SEASON',
-                                        'WHEN TO WEAR', 'GENDER', 'AGE'}
-                    lines = [l.strip() for l in inner.split('\n') if l.strip()]
-                    # Find the start of our heading, then stop at the next different heading
-                    ht_upper = heading_text.upper()
-                    started = False
-                    filtered = []
-                    for line in lines:
-                        lu = line.upper()
-                        if lu == ht_upper:
-                            started = True
-                            continue  # skip the heading itself
-                        if started and lu in section_headings and lu != ht_upper:
-                            break  # stop at next section
-                        if started:
-                            filtered.append(line)
-                    skip_vals = {'NO VOTE', 'SHOW VOTES', 'HIDE LABELS', 'SHOW ALL'}
-                    result = {}
-                    prev_label = None
-                    for line in filtered:
-                        if line.upper() in skip_vals:
-                            continue
-                        val = _parse_vote_count(line)
-                        if val and val > 0 and prev_label:
-                            result[prev_label.lower().replace(' ', '_')] = val
-                            prev_label = None
-                        elif not (line[0].isdigit() or line[0] in '.'):
-                            prev_label = line
-                    return result if result else None
-                except Exception:
-                    return None
-
-            for section, field in [('LONGEVITY', 'longevity'), ('SILLAGE', 'sillage'), ('PRICE VALUE', 'price_value')]:
-                parsed = _extract_section_by_heading(section)
-                if parsed:
-                    perfume_data[field] = parsed
-
-            # Season / When to Wear - same approach
-            try:
-                season_raw = _extract_section_by_heading('WHEN TO WEAR')
-                if not season_raw:
-                    season_raw = _extract_section_by_heading('SEASON')
-                if season_raw:
-                    seasons_valid = {'winter', 'spring', 'summer', 'fall', 'day', 'night'}
-                    filtered = {k: v for k, v in season_raw.items() if k in seasons_valid}
-                    if filtered:
-                        perfume_data['season'] = filtered
-            except Exception:
-                pass
+            payloads = self._collect_payloads()
+            self.page_network = self._drain_network_log()
+            # Rendered copy is archived with the HTTP validators (from the conditional GET, else
+            # from the browser's own document response), so a later 304 serves it with its payloads
+            if not validators:
+                validators = document_validators(self.page_network, self.driver.current_url)
+            self._archive_page(url, page_source, payloads, tier='browser', **(validators or {}))
 
-
-            # Rating
-            rating_match = re.search(r'itemprop="ratingValue"[^>]*>([^<]+)<', page_source, re.IGNORECASE)
-            if rating_match:
-                try:
-                    perfume_data['rating'] = float(rating_match.group(1).strip())
-                except ValueError:
-                    pass
-            
-            # Votes
-            votes_match = re.search(r'itemprop="ratingCount"[^>]*>([^<]+)<', page_source, re.IGNORECASE)
-            if votes_match:
-                try:
-                    perfume_data['votes'] = int(votes_match.group(1).strip().replace(',', '').replace('.', ''))
-                except ValueError:
-                    pass
-            
+            perfume_data = parse_perfume_page(url, page_source, payloads)
+            missing = missing_fields(perfume_data)
             
-            # Image
-            img_match = re.search(r'itemprop="image"[^>]*src="([^"]+)"', page_source, re.IGNORECASE)
-            if not img_match:
-                img_match = re.search(r'src="([^"]*fimgs\.net[^"]*perfume[^"]*)"', page_source, re.IGNORECASE)
-            if img_match:
-                perfume_data['image_url'] = img_match.group(1)
-            
-            # Completeness check
-            missing_fields = []
-            if not perfume_data.get('name'):
-                missing_fields.append('name')
-            if not perfume_data.get('brand'):
-                missing_fields.append('brand')
-            if not perfume_data.get('top_notes') and not perfume_data.get('middle_notes') and not perfume_data.get('base_notes'):
-                missing_fields.append('notes')
-            if not perfume_data.get('description'):
-                missing_fields.append('description')
-            if not perfume_data.get('rating'):
-                missing_fields.append('rating')
-            
-            # Clean brand name from perfume name
-            brand = perfume_data.get('brand', '')
-            name = perfume_data.get('name', '')
-            if brand and name and name.endswith(' ' + brand):
-                perfume_data['name'] = name[:-(len(brand) + 1)].strip()
-            elif brand and name and name.startswith(brand + ' '):
-                # e.g. "Dior Homme Intense 2011 Dior" -> already handled above
-                # but "Dior Homme Parfum" starts with brand - don't strip if it's part of product line
-                pass
-            
-            if missing_fields:
-                print(f"⚠️ {perfume_data.get('name', 'Unknown')} - Missing: {', '.join(missing_fields)}")
+            page_time = time.time() - t_page
+            self.page_times.append((page_time, ready_time))
+            timing = f"⏱️ {page_time:.1f}s (render wait {ready_time:.1f}s)"
+            if missing:
+                print(f"⚠️ {perfume_data.get('name', 'Unknown')} - Missing: {', '.join(missing)} {timing}")
             else:
-                print(f"✅ {perfume_data.get('name', 'N/A')} - {perfume_data.get('brand', 'N/A')} [Complete]")
+                print(f"✅ {perfume_data.get('name', 'N/A')} - {perfume_data.get('brand', 'N/A')} [Complete] {timing}")
             
+            self._maybe_recycle()
             return perfume_data
             
         except Exception as e:
             error_msg = str(e)
+            if not reported:
+                self.rate_limiter.record('error', kind='browser')
             if retry > 0:
-                # Longer wait on retry - likely rate limited
-                wait_time = 30 if 'too short' in error_msg else 5
-                print(f"⚠️ Error, retrying ({retry} left, waiting {wait_time}s): {error_msg[:100]}")
-                time.sleep(wait_time)
+                # No fixed wait: after a block the limiter has already cut the rate and
+                # pauses the next request, so the retry is paced like any other page
+                print(f"⚠️ Error, retrying ({retry} left): {error_msg[:100]}")
                 # Restart driver on retry
                 try:
                     self.driver.quit()
                 except:
                     pass
                 self.driver = None
-                return self.extract_perfume_details(url, retry - 1)
+                return self._extract_with_browser(url, retry - 1, validators)
             
             print(f"❌ Error: {error_msg[:200]}")
             return None
@@ -474,8 +554,6 @@ class SeleniumPerfumeScraper:
         Returns:
             Parfüm URL'leri listesi (popülerlik sırasına göre)
         """
-        self._init_driver()
-        
         # Marka adını URL formatına çevir
         brand_url_overrides = {
             'Bath & Body Works': 'Bath-Body-Works',
@@ -488,17 +566,25 @@ class SeleniumPerfumeScraper:
         print(f"🔍 Searching for MOST POPULAR perfumes from {brand_name}...")
         print(f"📡 Brand page: {brand_url}")
         
+        # Listing links are in the static HTML - the browser is only a fallback
+        if self.http:
+            page, reason = self.http.get(brand_url)
+            perfume_urls = parse_brand_perfume_urls(page['page_source'], limit) if page else []
+            if perfume_urls:
+                print(f"✅ Found {len(perfume_urls)} popular perfume URLs [HTTP]")
+                return perfume_urls
+            print(f"  ↪️ Browser needed: {reason or 'no perfume links'}")
+        
+        self._init_driver()
         try:
+            self._throttle()
             self.driver.get(brand_url)
             
-            # Popüler parfümler yüklensin
-            time.sleep(5)
-            
             # Popüler parfüm kartlarını bul - daha spesifik selector
-            # Önce popüler bölümü bekle
+            # Önce popüler bölümü ve parfüm linkleri yüklensin (sabit bekleme yok)
             try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.cell"))
+                WebDriverWait(self.driver, 15, poll_frequency=POLL_INTERVAL).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div.cell a[href*='/perfume/']"))
                 )
             except Exception:
                 print("  ⚠️ Loading popular section...")
@@ -564,11 +650,10 @@ class SeleniumPerfumeScraper:
         for i, url in enumerate(urls, 1):
             print(f"\n[{i}/{len(urls)}]")
             
-            # If we hit too many consecutive failures, we're likely rate-limited
+            # Too many consecutive failures: start a fresh driver (the rate
+            # limiter has already slowed down and paused for any blocks)
             if consecutive_failures >= 3:
-                print(f"⏳ Rate limit detected, cooling down 120s...")
-                time.sleep(120)
-                # Restart driver after cooldown
+                print(f"🔄 {consecutive_failures} failures in a row, restarting driver")
                 try:
                     self.driver.quit()
                 except:
@@ -582,11 +667,12 @@ class SeleniumPerfumeScraper:
                 consecutive_failures = 0
             else:
                 consecutive_failures += 1
-            
-            # Random delay between pages - mimics human behaviour
-            if i < len(urls):
-                time.sleep(random.uniform(8, 15))
         
+        print_page_times(self.page_times)
+        if isinstance(self.rate_limiter, AdaptiveRateLimiter):
+            print(self.rate_limiter.summary())
+        if self.http and self.http.stats.summary():
+            print(self.http.stats.summary())
         return perfumes
     
     def save_to_json(self, perfumes: List[Dict[str, Any]], filename: str = "parfumler_selenium.json"):
@@ -599,28 +685,111 @@ class SeleniumPerfumeScraper:
             print(f"❌ Save error: {str(e)}")
     
     def download_image(self, image_url: str, save_path: str) -> bool:
-        """Download perfume image and save as .png"""
-        try:
-            if not image_url:
-                return False
-            response = requests.get(image_url, timeout=15, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
-            })
-            if response.status_code == 200:
-                with open(save_path, 'wb') as f:
-                    f.write(response.content)
-                return True
-        except Exception:
-            pass
-        return False
+        """Download perfume image and save as .png (pooled, retried, validated - downloader.py)"""
+        if self.downloader is None:
+            self.downloader = Downloader()
+        return self.downloader.fetch(image_url, save_path, refresh=True) in ('downloaded', 'not_modified')
     
     def close(self):
         """Driver'ı kapat"""
         if self.driver:
             self.driver.quit()
+            self.driver = None
             print("\n🔒 Browser closed")
 
 
+def print_page_times(page_times):
+    """Sayfa başına süre özeti (extract_perfume_details ölçümleri)"""
+    if not page_times:
+        return
+    totals = sorted(t for t, _ in page_times)
+    waits = [w for _, w in page_times]
+    print(f"⏱️ {len(totals)} pages: mean {sum(totals) / len(totals):.1f}s, "
+          f"median {totals[len(totals) // 2]:.1f}s, max {totals[-1]:.1f}s "
+          f"(render wait mean {sum(waits) / len(waits):.1f}s)")
+
+
+def scrape_parallel(urls: List[str], workers: int = 3, rate_limiter: Optional[TokenBucket] = None,
+                    on_result: Optional[Callable[[str, Optional[Dict[str, Any]]], None]] = None,
+                    headless: bool = True, http: Optional[HttpFetcher] = None,
+                    block: Sequence[str] = DEFAULT_BLOCK) -> List[Dict[str, Any]]:
+    """
+    URL'leri N paralel browser ile çek
+
+    Her worker kendi Chrome driver'ına sahip bir thread; hepsi ortak bir URL
+    kuyruğundan iş alır ve aynı limiter'dan token bekler, böylece siteye
+    giden toplam istek hızı worker sayısından bağımsız kalır. (Chrome ayrı bir
+    process olduğu için thread'ler yeterli - Python tarafı çoğunlukla bekliyor.)
+
+    Args:
+        urls: Parfüm sayfası URL'leri
+        workers: Aynı anda açık browser sayısı
+        rate_limiter: Paylaşılan limiter (None ise varsayılan hızla başlayan bir AdaptiveRateLimiter);
+                      her worker sayfa sonuçlarını ona bildirir, hız tüm havuz için ayarlanır
+        on_result: Her sayfa bittiğinde (url, data) ile çağrılır - data başarısızsa None.
+                   Çağrılar bir lock altında yapılır, callback thread-safe olmak zorunda değil.
+        headless: Browser'ı görünmez modda çalıştır
+        http: Paylaşılan HttpFetcher - sayfalar önce HTTP ile denenir, driver sadece
+              gerektiğinde açılır (tek session, keep-alive bağlantı havuzu)
+        block: Browser'larda engellenecek kaynak grupları (BLOCK_PATTERNS)
+
+    Returns:
+        Başarılı parfüm verileri (URL sırasıyla)
+    """
+    limiter = rate_limiter or AdaptiveRateLimiter()
+    jobs = queue.Queue()
+    for i, url in enumerate(urls):
+        jobs.put((i, url))
+    results = {}
+    done = [0]
+    page_times = []
+    lock = threading.Lock()
+
+    def worker(n):
+        scraper = SeleniumPerfumeScraper(headless=headless, rate_limiter=limiter, http=http, block=block)
+        consecutive_failures = 0
+        try:
+            while True:
+                try:
+                    i, url = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                # Too many consecutive failures on this driver: start a fresh one
+                # (pacing and pauses after blocks are the shared limiter's job)
+                if consecutive_failures >= 3:
+                    print(f"🔄 [worker {n}] {consecutive_failures} failures in a row, restarting driver")
+                    scraper.close()
+                    consecutive_failures = 0
+
+                data = scraper.extract_perfume_details(url)
+                consecutive_failures = 0 if data else consecutive_failures + 1
+                with lock:
+                    done[0] += 1
+                    if data:
+                        results[i] = data
+                    print(f"[{done[0]}/{len(urls)}] worker {n} finished {url.split('/')[-1]}")
+                    if on_result:
+                        on_result(url, data)
+        finally:
+            with lock:
+                page_times.extend(scraper.page_times)
+            scraper.close()
+
+    threads = [threading.Thread(target=worker, args=(n,), name=f"scraper-{n}", daemon=True)
+               for n in range(1, max(1, min(workers, len(urls))) + 1)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print_page_times(page_times)
+    if isinstance(limiter, AdaptiveRateLimiter):
+        print(limiter.summary())
+    if http and http.stats.summary():
+        print(http.stats.summary())
+    return [results[i] for i in sorted(results)]
+
+
 def main():
     """Marka bazlı parfüm scraping"""
     
@@ -0,0 +1,132 @@
+"""
+Precomputed nearest neighbors over the perfume feature matrix.
+
+Two builders produce the same (neighbors, scores) arrays of shape (n, k):
+  brute   exact cosine top-k, by multiplying row blocks against the full matrix
+  svd     approximate: shortlist k×oversample candidates by dense dot products
+          in a 128-dim truncated-SVD projection (BLAS instead of sparse
+          products), then rerank the shortlist by exact cosine, so every
+          returned score is exact but some true neighbors may be missed
+
+Tables are built once per catalog version and persisted to catalog_cache/,
+so the API serves /api/perfumes/{id}/similar with an O(1) row lookup.
+
+Usage:
+    python similarity.py                 # build for PERFUME_DATA_FILE
+    python similarity.py --mode svd -k 24
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from scipy.sparse.linalg import svds
+
+from catalog import atomic_write, get_catalog
+from features import get_features
+
+K = 12
+BRUTE_MAX = 20_000   # above this, builds triggered by a request use svd
+BLOCK_ROWS = 256
+
+
+def _top_k(scores, k):
+    """Indices and values of the k largest entries per row, sorted descending."""
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-vals, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+
+def knn_brute(X, k=K, rows=None, block=BLOCK_ROWS):
+    """Exact top-k for `rows` (default: every row), multiplying row blocks against the full matrix."""
+    rows = np.arange(X.shape[0]) if rows is None else np.asarray(rows)
+    k = max(0, min(k, X.shape[0] - 1))   # a perfume is never its own neighbor
+    XT = X.T.tocsc()
+    neighbors = np.empty((len(rows), k), np.int32)
+    scores = np.empty((len(rows), k), np.float32)
+    for start in range(0, len(rows), block):
+        chunk = rows[start:start + block]
+        S = (X[chunk] @ XT).toarray()
+        S[np.arange(len(chunk)), chunk] = -np.inf
+        neighbors[start:start + len(chunk)], scores[start:start + len(chunk)] = _top_k(S, k)
+    return neighbors, scores
+
+
+def _exact_scores(X, rows, candidates):
+    """Exact dot products between each row in `rows` and its candidate columns."""
+    b, m = candidates.shape
+    left = X[np.repeat(rows, m)]
+    right = X[candidates.ravel()]
+    return np.asarray(left.multiply(right).sum(axis=1), np.float32).reshape(b, m)
+
+
+def knn_svd(X, k=K, dims=128, oversample=10, block=BLOCK_ROWS):
+    """Approximate top-k: shortlist by dot product in a truncated-SVD space, rerank exactly."""
+    n = X.shape[0]
+    k = max(0, min(k, n - 1))
+    dims = min(dims, min(X.shape) - 1)
+    _, _, vt = svds(X, k=dims, random_state=0)
+    Z = np.ascontiguousarray((X @ vt.T).astype(np.float32))
+    m = min(k * oversample, n - 1)
+
+    neighbors = np.empty((n, k), np.int32)
+    scores = np.empty((n, k), np.float32)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        rows = np.arange(start, stop)
+        S = Z[start:stop] @ Z.T
+        S[np.arange(stop - start), rows] = -np.inf
+        candidates, _ = _top_k(S, m)
+        exact = _exact_scores(X, rows, candidates)
+        top, vals = _top_k(exact, k)
+        neighbors[start:stop] = np.take_along_axis(candidates, top, axis=1)
+        scores[start:stop] = vals
+    return neighbors, scores
+
+
+BUILDERS = {"brute": knn_brute, "svd": knn_svd}
+
+
+def build_neighbors(catalog, mode=None, k=K):
+    mode = mode or ("brute" if len(catalog) <= BRUTE_MAX else "svd")
+    X = get_features(catalog).matrix
+    neighbors, scores = BUILDERS[mode](X, k)
+    with atomic_write(catalog.cache_path(f"neighbors-k{k}", ".npz")) as f:
+        np.savez(f, neighbors=neighbors, scores=scores, mode=mode)
+    return neighbors, scores
+
+
+def load_neighbors(catalog, k=K):
+    path = catalog.cache_path(f"neighbors-k{k}", ".npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return data["neighbors"], data["scores"]
+    return build_neighbors(catalog, k=k)
+
+
+def get_neighbors(catalog):
+    """(neighbors, scores) for this catalog version, loaded or built on first use."""
+    return catalog.derived("neighbors", load_neighbors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=list(BUILDERS))
+    parser.add_argument("-k", type=int, default=K)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    t0 = time.perf_counter()
+    get_features(catalog)
+    t1 = time.perf_counter()
+    build_neighbors(catalog, args.mode, args.k)
+    t2 = time.perf_counter()
+    print(f"✅ {len(catalog):,} perfumes (version {catalog.version}): "
+          f"features {t1 - t0:.1f}s, neighbors {t2 - t1:.1f}s")
+    print(f"💾 {catalog.cache_path(f'neighbors-k{args.k}', '.npz')}")
+
+
+if __name__ == "__main__":
+    main()
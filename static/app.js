@@ -57,6 +57,7 @@ const state = {
   debounceTimer: null,
   currentView: 'explore',
   mapLoaded: false,
+  spaceLoaded: false,
 };
 
 /* ── DOM refs ────────────────────────────────────────────────────── */
@@ -93,11 +94,21 @@ function showView(view) {
   document.getElementById('mapView').classList.toggle('active', view === 'map');
   document.getElementById('navExplore').classList.toggle('active', view === 'explore');
   document.getElementById('navMap').classList.toggle('active', view === 'map');
+  document.getElementById('spaceView').classList.toggle('active', view === 'space');
+  document.getElementById('navSpace').classList.toggle('active', view === 'space');
 
   if (view === 'map' && !state.mapLoaded) {
     state.mapLoaded = true;
     loadFragranceMap();
   }
+  if (view === 'space') {
+    if (!state.spaceLoaded) {
+      state.spaceLoaded = true;
+      loadScentSpace();
+    } else {
+      drawSpace();
+    }
+  }
 }
 
 /* ── Init ────────────────────────────────────────────────────────── */
@@ -125,6 +136,7 @@ async function loadStats() {
     document.getElementById('statPerfumes').textContent = s.total_perfumes.toLocaleString();
     document.getElementById('statBrands').textContent = s.total_brands;
     document.getElementById('statNotes').textContent = s.total_notes;
+    if (s.note_images === 'sprites') loadNoteSprites();
   } catch (e) { /* silent */ }
 }
 
@@ -229,13 +241,11 @@ function buildCard(p, index) {
   ];
   const topNotes = allNotes.slice(0, 3);
   const stars = ratingToStars(p.rating);
-  const imgSrc = p.image_path || p.image_url || '';
   const dotColor = glow ? ACCORD_COLORS[glow] : null;
 
   card.innerHTML = `
     <div class="card-image-wrap">
-      <img class="card-image" src="${esc(imgSrc)}" alt="${esc(p.name)}" loading="lazy"
-           onerror="this.style.opacity='0'" />
+      ${pictureHtml(p, 'card-image', CARD_IMG_SIZES)}
       ${p.category ? `<span class="card-category">${esc(p.category)}</span>` : ''}
       ${dotColor ? `<span class="card-accord-dot" style="background:${dotColor}" title="${(p.main_accords||[])[0]||''}"></span>` : ''}
       ${p.gender ? `<span class="card-gender">${esc(p.gender)}</span>` : ''}
@@ -310,13 +320,53 @@ function openModal(p) {
         <hr class="modal-divider" />
         <div class="modal-section-title">About</div>
         <p class="modal-description">${esc(p.description)}</p>` : ''}
+      <div class="modal-similar" id="modalSimilar"></div>
       ${p.url ? `<a class="modal-link" href="${p.url}" target="_blank" rel="noopener">View on Fragrantica →</a>` : ''}
     </div>`;
 
+  preloadNoteSprites(allNotes);
+  loadSimilar(p);
   modalOverlay.classList.add('open');
   document.body.style.overflow = 'hidden';
 }
 
+/* ── Similar fragrances (precomputed neighbors) ──────────────────── */
+let similarFor = null;
+
+async function loadSimilar(p) {
+  if (p.id == null) return;
+  similarFor = p.id;
+  let items;
+  try {
+    items = await api(`/api/perfumes/${p.id}/similar?limit=6`);
+  } catch (e) {
+    console.error(e);
+    return;
+  }
+  const box = document.getElementById('modalSimilar');
+  if (similarFor !== p.id || !box || !items.length) return;  // modal moved on meanwhile
+
+  box.innerHTML = `
+    <hr class="modal-divider" />
+    <div class="modal-section-title">Similar Fragrances</div>
+    <div class="accord-perfume-list">
+      ${items.map((s, i) => `<div class="accord-perfume-row" data-idx="${i}">
+        ${pictureHtml(s, 'accord-perfume-img', '40px', '')}
+        <div class="accord-perfume-info">
+          <div class="accord-perfume-name">${esc(s.name)}</div>
+          <div class="accord-perfume-brand">${esc(s.brand || '')}</div>
+        </div>
+        <span class="accord-perfume-rating">${Math.round(s.similarity * 100)}%</span>
+      </div>`).join('')}
+    </div>`;
+  box.querySelectorAll('.accord-perfume-row').forEach((row, i) => {
+    row.addEventListener('click', () => {
+      openModal(items[i]);
+      modal.scrollTop = 0;
+    });
+  });
+}
+
 /* ── Vote icon helpers ───────────────────────────────────────────── */
 // Returns {key, pct}[] sorted desc for a vote object
 function voteRanked(obj) {
@@ -522,10 +572,9 @@ async function loadFragranceMap() {
         </div>
         <div class="accord-perfume-list">
           ${top5.map((p, i) => {
-            const img = p.image_path || p.image_url || '';
             return `<div class="accord-perfume-row" data-idx="${i}">
               <span class="accord-perfume-rank">${i + 1}</span>
-              <img class="accord-perfume-img" src="${esc(img)}" alt="" onerror="this.style.opacity='0'" loading="lazy" />
+              ${pictureHtml(p, 'accord-perfume-img', '40px', '')}
               <div class="accord-perfume-info">
                 <div class="accord-perfume-name">${esc(p.name)}</div>
                 <div class="accord-perfume-brand">${esc(p.brand || '')}</div>
@@ -549,6 +598,217 @@ async function loadFragranceMap() {
   }
 }
 
+/* ── Scent Space ─────────────────────────────────────────────────── */
+// Layout comes from /api/embedding as typed arrays (see embedding.py);
+// card details are fetched per perfume only on hover / click.
+const SPACE_RANGE = 65535;   // coordinates are quantized to uint16
+const SPACE_CELL  = 8;       // hover hit-test grid, in CSS pixels
+const space = { points: null, cx: SPACE_RANGE / 2, cy: SPACE_RANGE / 2, scale: 0, cells: new Map(),
+                hover: -1, drag: null, details: new Map() };
+
+async function loadScentSpace() {
+  const spaceSpinner = document.getElementById('spaceSpinner');
+  try {
+    const res = await fetch('/api/embedding');
+    if (!res.ok) throw new Error(`API error: ${res.status}`);
+    space.points = parseEmbedding(await res.arrayBuffer());
+    bindSpaceEvents();
+    fitSpace();
+    drawSpace();
+  } catch (e) {
+    document.getElementById('spaceFrame').innerHTML =
+      '<p style="color:var(--text-3);padding:32px">Could not load scent space.</p>';
+    console.error(e);
+  }
+  spaceSpinner.style.display = 'none';
+}
+
+function parseEmbedding(buf) {
+  const headerLen = new DataView(buf).getUint32(0, true);
+  const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buf, 4, headerLen)));
+  const n = header.n;
+  let off = Math.ceil((4 + headerLen) / 4) * 4;
+  const ids    = new Uint32Array(buf, off, n); off += 4 * n;
+  const x      = new Uint16Array(buf, off, n); off += 2 * n;
+  const y      = new Uint16Array(buf, off, n); off += 2 * n;
+  const accord = new Uint16Array(buf, off, n);
+  const colors = header.accords.map(a => ACCORD_COLORS[getGlow({ main_accords: [a] })] || '#999');
+  return { n, ids, x, y, accord, colors };
+}
+
+function spaceCanvas() {
+  return document.getElementById('spaceCanvas');
+}
+
+function fitSpace() {
+  const canvas = spaceCanvas();
+  space.cx = space.cy = SPACE_RANGE / 2;
+  space.scale = Math.min(canvas.clientWidth, canvas.clientHeight) * 0.92 / SPACE_RANGE;
+}
+
+function drawSpace() {
+  const pts = space.points;
+  const canvas = spaceCanvas();
+  if (!pts || !canvas.clientWidth) return;
+  const dpr = window.devicePixelRatio || 1;
+  const w = canvas.clientWidth, h = canvas.clientHeight;
+  if (canvas.width !== Math.round(w * dpr) || canvas.height !== Math.round(h * dpr)) {
+    canvas.width = Math.round(w * dpr);
+    canvas.height = Math.round(h * dpr);
+  }
+  const ctx = canvas.getContext('2d');
+  ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+  ctx.clearRect(0, 0, w, h);
+
+  // Dots grow a little as you zoom in; sparse catalogs get bigger dots
+  const size = Math.min(8, Math.max(2, space.scale * SPACE_RANGE / Math.sqrt(pts.n) / 6));
+  const half = size / 2;
+  space.cells.clear();
+  ctx.globalAlpha = 0.8;
+  let lastColor = null;
+  for (let i = 0; i < pts.n; i++) {
+    const sx = (pts.x[i] - space.cx) * space.scale + w / 2;
+    const sy = (pts.y[i] - space.cy) * space.scale + h / 2;
+    if (sx < -size || sy < -size || sx > w + size || sy > h + size) continue;
+    const color = pts.accord[i] === 0xFFFF ? '#999' : pts.colors[pts.accord[i]];
+    if (color !== lastColor) { ctx.fillStyle = color; lastColor = color; }
+    ctx.fillRect(sx - half, sy - half, size, size);
+    // later points are drawn on top, so they win the cell
+    space.cells.set(Math.floor(sx / SPACE_CELL) * 65536 + Math.floor(sy / SPACE_CELL), i);
+  }
+  ctx.globalAlpha = 1;
+  if (space.hover >= 0) {
+    const sx = (pts.x[space.hover] - space.cx) * space.scale + w / 2;
+    const sy = (pts.y[space.hover] - space.cy) * space.scale + h / 2;
+    ctx.strokeStyle = getComputedStyle(document.body).getPropertyValue('--text') || '#000';
+    ctx.lineWidth = 1.5;
+    ctx.strokeRect(sx - half - 3, sy - half - 3, size + 6, size + 6);
+  }
+}
+
+function pointAt(mx, my) {
+  const pts = space.points;
+  const canvas = spaceCanvas();
+  const w = canvas.clientWidth, h = canvas.clientHeight;
+  const cx = Math.floor(mx / SPACE_CELL), cy = Math.floor(my / SPACE_CELL);
+  let best = -1, bestDist = (SPACE_CELL * 1.5) ** 2;
+  for (let dx = -1; dx <= 1; dx++) {
+    for (let dy = -1; dy <= 1; dy++) {
+      const i = space.cells.get((cx + dx) * 65536 + (cy + dy));
+      if (i === undefined) continue;
+      const sx = (pts.x[i] - space.cx) * space.scale + w / 2;
+      const sy = (pts.y[i] - space.cy) * space.scale + h / 2;
+      const d = (sx - mx) ** 2 + (sy - my) ** 2;
+      if (d < bestDist) { best = i; bestDist = d; }
+    }
+  }
+  return best;
+}
+
+function perfumeDetails(id) {
+  if (!space.details.has(id)) {
+    space.details.set(id, api(`/api/perfumes/${id}`).catch(e => {
+      space.details.delete(id);
+      throw e;
+    }));
+  }
+  return space.details.get(id);
+}
+
+async function showSpaceTooltip(i, mx, my) {
+  const tooltip = document.getElementById('spaceTooltip');
+  if (i < 0) {
+    tooltip.classList.remove('show');
+    return;
+  }
+  const id = space.points.ids[i];
+  let p;
+  try {
+    p = await perfumeDetails(id);
+  } catch (e) {
+    console.error(e);
+    return;
+  }
+  if (space.hover !== i) return;  // pointer moved on while loading
+  tooltip.innerHTML = `
+    ${pictureHtml(p, 'accord-perfume-img', '40px', '')}
+    <div class="accord-perfume-info">
+      <div class="accord-perfume-name">${esc(p.name)}</div>
+      <div class="accord-perfume-brand">${esc(p.brand || '')}</div>
+    </div>`;
+  const frame = document.getElementById('spaceFrame');
+  tooltip.style.left = `${Math.min(mx + 14, frame.clientWidth - 270)}px`;
+  tooltip.style.top  = `${Math.min(my + 14, frame.clientHeight - 70)}px`;
+  tooltip.classList.add('show');
+}
+
+function bindSpaceEvents() {
+  const canvas = spaceCanvas();
+
+  canvas.addEventListener('wheel', e => {
+    e.preventDefault();
+    const rect = canvas.getBoundingClientRect();
+    const mx = e.clientX - rect.left - rect.width / 2;
+    const my = e.clientY - rect.top - rect.height / 2;
+    // keep the point under the cursor fixed while zooming
+    const wx = space.cx + mx / space.scale, wy = space.cy + my / space.scale;
+    space.scale *= Math.exp(-e.deltaY * 0.0015);
+    space.cx = wx - mx / space.scale;
+    space.cy = wy - my / space.scale;
+    drawSpace();
+  }, { passive: false });
+
+  canvas.addEventListener('mousedown', e => {
+    space.drag = { x: e.clientX, y: e.clientY, cx: space.cx, cy: space.cy, moved: false };
+    canvas.classList.add('dragging');
+  });
+
+  window.addEventListener('mouseup', () => {
+    canvas.classList.remove('dragging');
+    setTimeout(() => { space.drag = null; }, 0);
+  });
+
+  canvas.addEventListener('mousemove', e => {
+    const rect = canvas.getBoundingClientRect();
+    const mx = e.clientX - rect.left, my = e.clientY - rect.top;
+    if (space.drag && e.buttons) {
+      const dx = e.clientX - space.drag.x, dy = e.clientY - space.drag.y;
+      if (Math.abs(dx) + Math.abs(dy) > 3) space.drag.moved = true;
+      space.cx = space.drag.cx - dx / space.scale;
+      space.cy = space.drag.cy - dy / space.scale;
+      space.hover = -1;
+      showSpaceTooltip(-1);
+      drawSpace();
+      return;
+    }
+    const i = pointAt(mx, my);
+    if (i !== space.hover) {
+      space.hover = i;
+      drawSpace();
+      showSpaceTooltip(i, mx, my);
+    }
+  });
+
+  canvas.addEventListener('mouseleave', () => {
+    space.hover = -1;
+    showSpaceTooltip(-1);
+    drawSpace();
+  });
+
+  canvas.addEventListener('click', async () => {
+    if ((space.drag && space.drag.moved) || space.hover < 0) return;
+    try {
+      openModal(await perfumeDetails(space.points.ids[space.hover]));
+    } catch (e) {
+      console.error(e);
+    }
+  });
+
+  window.addEventListener('resize', () => {
+    if (state.currentView === 'space') drawSpace();
+  });
+}
+
 /* ── Pagination ──────────────────────────────────────────────────── */
 function renderPagination(total) {
   const totalPages = Math.ceil(total / state.limit);
@@ -601,6 +861,25 @@ function pageRange(current, total) {
 }
 
 /* ── Helpers ─────────────────────────────────────────────────────── */
+const CARD_IMG_SIZES = '(max-width: 640px) 45vw, 320px';
+
+// <picture> with AVIF/WebP srcsets from the thumbnail manifest, falling back to the original image.
+// The precomputed placeholder paints behind the image until it arrives.
+function pictureHtml(p, className, sizes, alt = p.name) {
+  const srcset = p.image_srcset || {};
+  const sources = ['avif', 'webp']
+    .filter(fmt => srcset[fmt])
+    .map(fmt => `<source type="image/${fmt}" srcset="${esc(srcset[fmt])}" sizes="${sizes}" />`)
+    .join('');
+  const lqip = p.image_placeholder
+    ? ` style="background-image:url('${p.image_placeholder}')"` : '';
+  const dims = p.image_width && p.image_height
+    ? ` width="${p.image_width}" height="${p.image_height}"` : '';
+  const img = `<img class="${className}${lqip ? ' lqip' : ''}" src="${esc(p.image_path || p.image_url || '')}" alt="${esc(alt || '')}"${dims}${lqip}
+           loading="lazy" onerror="this.style.opacity='0'" />`;
+  return sources ? `<picture>${sources}${img}</picture>` : img;
+}
+
 function ratingToStars(rating) {
   if (!rating) return '';
   const pct = (rating - 1) / 4;
@@ -825,6 +1104,44 @@ function renderSelectedChips(type) {
   });
 }
 
+/* ── Note sprites ────────────────────────────────────────────────── */
+// {cell, atlases, notes} when the server runs with NOTE_IMAGES_MODE=sprites
+// (reported by /api/stats); otherwise tooltips use one PNG per note
+let noteSprites = null;
+const NOTE_ICON_SIZE = 72;
+
+async function loadNoteSprites() {
+  try {
+    noteSprites = await api('/note_images/sprites.json');
+  } catch (e) { /* per-note PNGs */ }
+}
+
+// Must match canonical_note() in build_note_sprites.py
+function canonicalNote(name) {
+  return name.replace(/[<>:"/\\|?*&]/g, '').replace(/[\s_]+/g, ' ').trim().toLowerCase();
+}
+
+function noteSpriteHtml(name) {
+  const entry = noteSprites && noteSprites.notes[canonicalNote(name)];
+  if (!entry) return '';
+  const [a, x, y] = entry;
+  const atlas = noteSprites.atlases[a];
+  const scale = NOTE_ICON_SIZE / noteSprites.cell;
+  return `<div class="note-tooltip-img" style="background:url('/note_images/${atlas.file}') ` +
+    `-${x * scale}px -${y * scale}px / ${atlas.width * scale}px ${atlas.height * scale}px no-repeat"></div>`;
+}
+
+// Warm the atlases a modal's notes live in, so its tooltips cost no further requests
+function preloadNoteSprites(notes) {
+  if (!noteSprites) return;
+  const atlases = new Set();
+  notes.forEach(n => {
+    const entry = noteSprites.notes[canonicalNote(n)];
+    if (entry) atlases.add(entry[0]);
+  });
+  atlases.forEach(a => { new Image().src = `/note_images/${noteSprites.atlases[a].file}`; });
+}
+
 /* ── Note Tooltips ───────────────────────────────────────────────── */
 let noteTooltip = null;
 
@@ -856,9 +1173,12 @@ function showNoteTooltip(tag, e) {
   const imgUrl = tag.getAttribute('data-note-img');
   const noteName = tag.textContent.trim();
   
+  const imgHtml = noteSprites
+    ? noteSpriteHtml(noteName)
+    : `<img class="note-tooltip-img" src="${imgUrl}" alt="${noteName}" 
+         onerror="this.style.display='none'" />`;
   noteTooltip.innerHTML = `
-    <img class="note-tooltip-img" src="${imgUrl}" alt="${noteName}" 
-         onerror="this.style.display='none'" />
+    ${imgHtml}
     <div class="note-tooltip-name">${noteName}</div>
   `;
   
@@ -0,0 +1,36 @@
+"""
+Crash recovery of the page_archive.PageArchive index.
+
+Usage:
+    python -m pytest test_page_archive.py
+"""
+from page_archive import PageArchive
+
+
+def test_torn_index_tail_is_dropped_before_appending(tmp_path):
+    root = str(tmp_path / "archive")
+    archive = PageArchive(root)
+    first = archive.put("https://x/a.html", "<html>a</html>", etag='"a1"')
+    with open(archive.index_path, "a", encoding="utf-8") as f:
+        f.write('{"url": "https://x/b.html", "sha2')   # crash mid-write
+
+    archive = PageArchive(root)
+    second = archive.put("https://x/b.html", "<html>b</html>", etag='"b1"')
+
+    assert archive.latest() == {"https://x/a.html": first, "https://x/b.html": second}
+    assert archive.validators()["https://x/b.html"]["etag"] == '"b1"'
+    assert archive.get(second)["page_source"] == "<html>b</html>"
+
+
+def test_opening_does_not_touch_the_index(tmp_path):
+    root = str(tmp_path / "archive")
+    archive = PageArchive(root)
+    archive.put("https://x/a.html", "<html>a</html>")
+    with open(archive.index_path, "a", encoding="utf-8") as f:
+        f.write('{"url": "https://x/b.html"')   # another process still writing
+    with open(archive.index_path, "rb") as f:
+        before = f.read()
+
+    assert list(PageArchive(root).latest()) == ["https://x/a.html"]
+    with open(archive.index_path, "rb") as f:
+        assert f.read() == before
@@ -0,0 +1,74 @@
+"""
+Crash recovery of scrape_journal.ScrapeJournal.
+
+Usage:
+    python -m pytest test_scrape_journal.py
+"""
+import json
+
+from scrape_journal import ScrapeJournal
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_torn_last_line_is_dropped_before_appending(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = ScrapeJournal(path)
+    journal.record_page("https://x/a.html", {"name": "A"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "page", "url": "https://x/b.html", "sta')   # crash mid-write
+
+    journal = ScrapeJournal(path)
+    assert journal.pending(["https://x/a.html", "https://x/b.html"]) == ["https://x/b.html"]
+    journal.record_page("https://x/b.html", {"name": "B"})
+    journal.close()
+
+    assert [e["url"] for e in _lines(path)] == ["https://x/a.html", "https://x/b.html"]
+    assert [p["name"] for p in ScrapeJournal(path).results()] == ["A", "B"]
+
+
+def test_torn_only_line_empties_the_journal(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"type": "brand", "brand": "Di')
+
+    journal = ScrapeJournal(path)
+    assert journal.brands == {}
+    journal.record_brand("Dior", ["https://x/a.html"])
+    journal.close()
+
+    assert _lines(path)[0]["brand"] == "Dior"
+    assert ScrapeJournal(path).brands == {"Dior": ["https://x/a.html"]}
+
+
+def test_intact_journal_is_left_alone(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = ScrapeJournal(path)
+    journal.record_page("https://x/a.html", None)
+    journal.close()
+    with open(path, "rb") as f:
+        before = f.read()
+
+    ScrapeJournal(path).close()
+
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+def test_results_follow_the_given_order(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = ScrapeJournal(path)
+    for url in ["https://x/c.html", "https://x/a.html", "https://x/d.html", "https://x/b.html"]:
+        journal.record_page(url, {"name": url[-6]})   # parallel workers finish in any order
+    journal.record_page("https://x/a.html", {"name": "a again"})
+    journal.close()
+
+    journal = ScrapeJournal(path)
+    journal.record_page("https://x/e.html", {"name": "é"})
+    order = ["https://x/a.html", "https://x/b.html", "https://x/e.html", "https://x/missing.html",
+             "https://x/c.html"]
+    assert [p["name"] for p in journal.results(order)] == ["a", "b", "é", "c", "d"]
@@ -3,10 +3,10 @@ Also scrapes new brands (Nishane) if not already in JSON.
 """
 import json
 import os
-import re
 import time
 import random
 from selenium_scraper import SeleniumPerfumeScraper
+from downloader import Downloader, note_jobs, sanitize_filename, summarize
 
 JSON_FILE = 'fragrantica_perfumes.json'
 VOTE_FIELDS = ['longevity', 'sillage', 'price_value', 'season', 'main_accords']
@@ -29,11 +29,6 @@ PERFUMES_PER_BRAND = 15
 IMAGE_DIR = 'perfume_images'
 NOTES_DIR = 'perfume_notes'
 
-def sanitize_filename(name):
-    name = re.sub(r'[<>:"/\\|?*&]', '', name)
-    name = re.sub(r'\s+', '_', name.strip())
-    return name[:80]
-
 def needs_update(perfume):
     return not all(perfume.get(f) for f in VOTE_FIELDS)
 
@@ -92,13 +87,19 @@ def main():
     updated = 0
     failed = 0
 
+    pending_notes = {}  # note name -> icon URL, downloaded together at the end
+
     def download_note_images(note_images_dict):
-        """Download note images to NOTES_DIR, skip already existing."""
-        for note_name, img_url in note_images_dict.items():
-            fname = sanitize_filename(note_name) + '.png'
-            fpath = os.path.join(NOTES_DIR, fname)
-            if not os.path.exists(fpath) and img_url:
-                scraper.download_image(img_url, fpath)
+        """Download note images to NOTES_DIR concurrently, skip already existing."""
+        jobs = note_jobs(note_images_dict, NOTES_DIR)
+        if not jobs:
+            return
+        print(f"\n🖼️  Downloading {len(jobs)} note icons...")
+        downloader = Downloader()
+        try:
+            print(summarize(downloader.download_many(jobs)))
+        finally:
+            downloader.close()
 
     try:
         for i, perfume in enumerate(to_update):
@@ -116,10 +117,8 @@ def main():
                         if val:
                             perfume[field] = val
                             changed = True
-                    # Download note images (always, independent of vote fields)
-                    note_imgs = result.get('note_images', {})
-                    if note_imgs:
-                        download_note_images(note_imgs)
+                    # Note images are queued (always, independent of vote fields)
+                    pending_notes.update(result.get('note_images') or {})
                     if changed:
                         updated += 1
                         print(f"  ✅ Updated: {[f for f in VOTE_FIELDS if perfume.get(f)]}")
@@ -146,10 +145,15 @@ def main():
         print("\n⚠️  Interrupted by user")
     finally:
         scraper.close()
+        # Vote updates are saved before the icon batch, so a failure or Ctrl-C there loses no data
         with open(JSON_FILE, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
         print(f"\n✅ Done. Updated: {updated}, Failed: {failed}")
         print(f"💾 Saved to {JSON_FILE}")
+        try:
+            download_note_images(pending_notes)
+        except (Exception, KeyboardInterrupt) as e:
+            print(f"⚠️  Note icon download stopped ({type(e).__name__}), vote data already saved")
 
 if __name__ == '__main__':
     main()